@@ -0,0 +1,156 @@
+"""
+Read-only access to a day's persisted orders for reprints and lookups.
+
+The journal and its fixed-width offset index (see journal.py) are both opened with `mmap`,
+so finding order N is one index read plus one record read, whatever the size of the day's file,
+and only the pages touched are loaded into memory. A record found through the index must carry the order number
+asked for; if it does not (an index left wrong by a crash), the journal is scanned for it instead.
+A journal that is empty or holds only its header (nothing checked out yet) is an archive without orders.
+
+Run with: python archive.py <order_number> [YYYYMMDD]
+"""
+import json
+import mmap
+import os
+import sys
+import zlib
+from datetime import datetime
+
+from catalog import MenuCatalog
+from config import get_data_dir
+from journal import (
+    INDEX_ENTRY, INDEX_MAGIC, JOURNAL_MAGIC, RECORD_HEADER, index_path, iter_records, journal_path, locked, scan_journal, write_index
+)
+from menu_source import MenuSource
+from receipt import RECEIPT_RENDERER, write_receipt
+
+
+class OrderArchive:
+    """Memory-mapped view of one day's journal, indexed by order number (1 to `len(archive)`)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._journal_file = open(path, "rb")
+        self._scanned = None    # { order number: (offset, end) }, built on the first index mismatch
+        if os.fstat(self._journal_file.fileno()).st_size <= len(JOURNAL_MAGIC):
+            # Nothing to map (mmap refuses empty files): created, or crashed while writing its header
+            if not JOURNAL_MAGIC.startswith(self._journal_file.read()):
+                self.close()
+                raise ValueError(f"{path} is not an order journal")
+            self._count = 0
+            return
+        self._journal = mmap.mmap(self._journal_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._journal[:len(JOURNAL_MAGIC)] != JOURNAL_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not an order journal")
+        # Under the writers' lock, so a rebuilt index does not replace one a checkout is appending to
+        with locked(self._journal_file):
+            if not self._index_matches():
+                # Index missing or left behind by a crash: rebuild it from the journal once
+                write_index(path, scan_journal(path).entries)
+            self._index_file = open(index_path(path), "rb")
+        self._index = mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._count = (len(self._index) - len(INDEX_MAGIC)) // INDEX_ENTRY.size
+
+    def _index_matches(self) -> bool:
+        """Checks that the index exists and its last entry ends inside the mapped journal"""
+        path = index_path(self.path)
+        if not os.path.exists(path):
+            return False
+        with open(path, "rb") as f:
+            if f.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                return False
+            size = os.fstat(f.fileno()).st_size
+            if (size - len(INDEX_MAGIC)) % INDEX_ENTRY.size:
+                return False
+            if size == len(INDEX_MAGIC):
+                return True
+            f.seek(size - INDEX_ENTRY.size)
+            offset, length = INDEX_ENTRY.unpack(f.read(INDEX_ENTRY.size))
+        return offset + length <= len(self._journal)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def get_record(self, order_number: int) -> dict:
+        """Returns the record of an order number, raising `KeyError` if the archive has no such order"""
+        if not 1 <= order_number <= self._count:
+            raise KeyError(f"Order {order_number} not found")
+        offset, length = INDEX_ENTRY.unpack_from(self._index, len(INDEX_MAGIC) + (order_number - 1) * INDEX_ENTRY.size)
+        record = None
+        if offset + RECORD_HEADER.size <= len(self._journal):
+            payload_length, checksum = RECORD_HEADER.unpack_from(self._journal, offset)
+            payload = self._journal[offset + RECORD_HEADER.size:offset + length]
+            if payload_length == len(payload) and zlib.crc32(payload) == checksum:
+                record = json.loads(payload)
+        if record is None or record.get("order_number") != order_number:
+            # The index points elsewhere: never hand out another customer's order
+            record = self._scan_for(order_number)
+        return record
+
+    def _scan_for(self, order_number: int) -> dict:
+        """Finds an order by reading the journal itself"""
+        if self._scanned is None:
+            self._scanned = {}
+            for offset, end, payload in iter_records(self._journal):
+                self._scanned.setdefault(json.loads(payload).get("order_number"), (offset, end))
+        if order_number not in self._scanned:
+            raise ValueError(f"Order {order_number} is missing or corrupt in {self.path}")
+        offset, end = self._scanned[order_number]
+        return json.loads(self._journal[offset + RECORD_HEADER.size:end])
+
+    def close(self):
+        for name in ("_index", "_index_file", "_journal", "_journal_file"):
+            handle = getattr(self, name, None)
+            if handle is not None: handle.close()
+
+
+def open_archive(day: datetime | None = None) -> OrderArchive:
+    """Opens the archive of a business day (today by default) in the configured data directory"""
+    return OrderArchive(journal_path(get_data_dir(), day))
+
+
+def reprint_order(record: dict, catalog: MenuCatalog, target=None):
+    """Prints the receipt of an archived order with the same layout as at checkout"""
+    def item_name(item_id):
+        # Items removed from the menu since the order still print with their ID
+        return catalog.items_by_id[item_id]["name"] if item_id in catalog else item_id
+
+    write_receipt(RECEIPT_RENDERER.render_record(record, item_name), target)
+
+
+def main(argv: list[str]):
+    if len(argv) < 2 or not argv[1].isdigit():
+        print("Usage: python archive.py <order_number> [YYYYMMDD]", file=sys.stderr)
+        return 2
+    try:
+        day = datetime.strptime(argv[2], "%Y%m%d") if len(argv) > 2 else None
+    except ValueError:
+        print(f"❌ '{argv[2]}' is not a date (YYYYMMDD).", file=sys.stderr)
+        return 2
+    try:
+        with open_archive(day) as archive:
+            record = archive.get_record(int(argv[1]))
+        catalog = MenuSource().current.catalog
+    except FileNotFoundError:
+        print("❌ No orders were saved on that day.", file=sys.stderr)
+        return 1
+    except KeyError as e:
+        print(f"❌ {e.args[0]}", file=sys.stderr)
+        return 1
+    except ValueError as e:
+        # Not a journal, an order missing from a damaged one, or an invalid menu file
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    reprint_order(record, catalog)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1 @@
+"""Benchmarks for the ordering system hot paths (run each module with `python -m benchmarks.<name>`)"""
@@ -0,0 +1,59 @@
+"""
+Builds day journals of increasing size and measures order lookups through `archive.OrderArchive`
+against scanning the journal for the order.
+
+Run with: python -m benchmarks.archive_lookup
+"""
+import os
+import random
+import tempfile
+import time
+
+from archive import OrderArchive
+from journal import JOURNAL_MAGIC, encode_record, scan_journal, write_index
+
+SIZES = [1_000, 10_000, 100_000]
+LOOKUPS = 1_000
+
+
+def write_day(path: str, order_count: int):
+    """Writes a journal of `order_count` orders (without fsync, this is only test data) and its index"""
+    entries = []
+    with open(path, "wb") as f:
+        f.write(JOURNAL_MAGIC)
+        for n in range(1, order_count + 1):
+            data = encode_record({
+                "order_number": n, "time": "2026-10-18T12:00:00", "discount_type": None, "discount_rate": 0.0, "gst_rate": 0.09,
+                "lines": [{"id": "C01", "name": "Burger + Fries + Drink", "quantity": 1, "price": 880, "total": 880,
+                           "options": {"Burger": ["B01"], "Fries": ["S01"], "Drink": ["D01"]}}],
+                "subtotal": 880, "discount": 0, "gst": 79, "total": 959
+            })
+            entries.append((f.tell(), len(data)))
+            f.write(data)
+    write_index(path, entries)
+
+
+def main():
+    rng = random.Random(0)
+    print(f"{'Orders':>8} {'File (MB)':>10} {'Open (ms)':>10} {'Lookup (us)':>12} {'Full scan (ms)':>15}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in SIZES:
+            path = os.path.join(tmp, f"orders-{size}.journal")
+            write_day(path, size)
+            start = time.perf_counter()
+            archive = OrderArchive(path)
+            open_ms = (time.perf_counter() - start) * 1e3
+            numbers = [rng.randint(1, size) for _ in range(LOOKUPS)]
+            start = time.perf_counter()
+            for n in numbers:
+                assert archive.get_record(n)["order_number"] == n
+            lookup_us = (time.perf_counter() - start) / LOOKUPS * 1e6
+            archive.close()
+            start = time.perf_counter()
+            scan_journal(path)
+            scan_ms = (time.perf_counter() - start) * 1e3
+            print(f"{size:>8} {os.path.getsize(path) / 1e6:>10.1f} {open_ms:>10.2f} {lookup_us:>12.2f} {scan_ms:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
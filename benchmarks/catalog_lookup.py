@@ -0,0 +1,54 @@
+"""
+Compares the old linear-scan menu lookups against `MenuCatalog` at 10k and 100k items.
+
+Run with: python -m benchmarks.catalog_lookup
+"""
+import random
+import timeit
+
+from benchmarks.menu_gen import generate_menu
+from catalog import MenuCatalog, split_item_code
+
+SIZES = [1_000, 10_000, 100_000]
+LOOKUPS = 200
+
+
+def linear_get_item_by_id(menu, item_id):
+    """The lookup the UIs used before `MenuCatalog`"""
+    found = [item for item in menu if item["id"] == item_id]
+    if len(found) == 0:
+        raise Exception("Item not found")
+    return found[0]
+
+
+def linear_get_items_by_category_code(menu, code):
+    """The category lookup the UIs used before `MenuCatalog`"""
+    return [item for item in menu if split_item_code(item["id"])[0] == code]
+
+
+def per_call_us(func, ids, number):
+    """Average microseconds per call of `func` over `ids`"""
+    seconds = timeit.timeit(lambda: [func(i) for i in ids], number=number)
+    return seconds / (number * len(ids)) * 1e6
+
+
+def main():
+    rng = random.Random(1)
+    print(f"{'Items':>8} {'Lookup':<22} {'Linear (us)':>12} {'Catalog (us)':>13} {'Speedup':>9}")
+    for size in SIZES:
+        menu = generate_menu(size)
+        catalog = MenuCatalog(menu)
+        ids = [item["id"] for item in rng.sample(menu, LOOKUPS)]
+        codes = ["B", "S", "D", "DS", "C"]
+
+        linear = per_call_us(lambda i: linear_get_item_by_id(menu, i), ids[:20], 1)
+        indexed = per_call_us(catalog.get_item_by_id, ids, 100)
+        print(f"{size:>8} {'get_item_by_id':<22} {linear:>12.2f} {indexed:>13.3f} {linear / indexed:>8.0f}x")
+
+        linear = per_call_us(lambda c: linear_get_items_by_category_code(menu, c), codes, 1)
+        indexed = per_call_us(catalog.get_items_by_category_code, codes, 1000)
+        print(f"{size:>8} {'get_items_by_category':<22} {linear:>12.2f} {indexed:>13.3f} {linear / indexed:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""
+Compares parsing a combo's `item_ref_ids` on every open against `MenuCatalog.resolve_combo`.
+
+Run with: python -m benchmarks.combo_resolve
+"""
+import timeit
+
+from benchmarks.menu_gen import generate_menu
+from catalog import MenuCatalog
+
+SIZES = [100, 1_000, 10_000, 100_000]
+
+
+def main():
+    print(f"{'Items':>8} {'Parse per open (us)':>20} {'Cached open (us)':>17}")
+    for size in SIZES:
+        catalog = MenuCatalog(generate_menu(size))
+        combo = catalog.get_item_by_id("C01")
+        number = max(100_000 // size, 5)
+        parsed = timeit.timeit(lambda: catalog.parse_item_ref_ids(combo["item_ref_ids"]), number=number) / number * 1e6
+        catalog.resolve_combo("C01")
+        cached = timeit.timeit(lambda: catalog.resolve_combo("C01"), number=100_000) / 100_000 * 1e6
+        print(f"{size:>8} {parsed:>20.2f} {cached:>17.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Replays cursor movement through the menu screen of interactive.py and compares the terminal output
+of a full redraw per keypress (`ESC c` and the whole screen) with `screen.FrameRenderer`.
+
+Run with: python -m benchmarks.frame_render
+"""
+import io
+import os
+import time
+
+from benchmarks.menu_gen import generate_menu
+from catalog import MenuCatalog
+from menu_data import MENU, MENU_ITEM_IDS
+from screen import FrameRenderer
+
+# A typical kiosk terminal; frames taller or wider than this fall back to full redraws
+os.environ.setdefault("COLUMNS", "120")
+os.environ.setdefault("LINES", "60")
+
+
+def format_table(data: list[list[str]], headers: list[str], selected_index: int, tab_space: int = 4) -> list[str]:
+    """Same layout as `display_table` in interactive.py"""
+    col_widths = [max(len(str(cell)) for cell in col) for col in zip(*([headers] + data))]
+    fmt_row = lambda row: "|" + "|".join(f" {str(cell):<{w}} " for cell, w in zip(row, col_widths)) + "|"
+    rule = " " * tab_space + " " + "+" + "+".join("-" * (w + 2) for w in col_widths) + "+"
+    padding = " " * tab_space
+    lines = [rule, f"{padding} {fmt_row(headers)}", rule]
+    for i, row in enumerate(data):
+        lines.append(f"{'> ':>{tab_space}} {fmt_row(row)} <" if i == selected_index else f"{padding} {fmt_row(row)}")
+    lines.append(rule)
+    return lines
+
+
+def menu_frames(catalog: MenuCatalog):
+    """Yields the menu screen after each keypress: down through every category, then right to the next"""
+    categories = [MENU_ITEM_IDS[code][1] for code in MENU_ITEM_IDS]
+    title = "| 📖 Menu |"
+    line = f"+{'-' * (len(title) - 1)}+"
+    for cat_index, code in enumerate(MENU_ITEM_IDS):
+        items = [[item["id"], item["name"], f"${item['price']:.2f}"] for item in catalog.get_items_by_category_code(code)]
+        topbar = "| " + " ".join(f"[{name}]" if i == cat_index else f" {name} " for i, name in enumerate(categories)) + " |"
+        for item_index in range(len(items)):
+            yield "\n".join(
+                [line, title, line, topbar, f"+{(len(topbar) - 2) * '-'}+"]
+                + format_table(items, ["Item ID", "Item Name", "Price"], item_index)
+                + ["-----", "[Left/Right arrows] Move category cursor", "[Up/Down arrows] Move selection cursor",
+                   "[Enter] Confirm selection", "[Q] Go back"]
+            ) + "\n"
+
+
+def main():
+    for label, menu in [("Real menu", MENU), ("Generated menu (160 items)", generate_menu(160))]:
+        frames = list(menu_frames(MenuCatalog(menu)))
+
+        start = time.perf_counter()
+        full = io.StringIO()
+        full_bytes = 0
+        for frame in frames:
+            data = "\033c" + frame
+            full.write(data)
+            full_bytes += len(data.encode("utf-8"))
+        full_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        renderer = FrameRenderer(io.StringIO())
+        for frame in frames:
+            renderer.render(frame)
+        diff_seconds = time.perf_counter() - start
+
+        print(f"{label}: {len(frames)} keypresses")
+        print(f"  full redraw:   {full_bytes:>9,} bytes ({full_bytes / len(frames):8.1f} per frame), {full_seconds * 1e3:.2f} ms")
+        print(f"  differential:  {renderer.total_bytes:>9,} bytes ({renderer.total_bytes / len(frames):8.1f} per frame), {diff_seconds * 1e3:.2f} ms")
+        print(f"  output volume: {renderer.total_bytes / full_bytes:.1%} of full redraws")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Measures `headless.process_stream` throughput on a generated JSONL order feed.
+
+Run with: python -m benchmarks.headless_throughput [order_count]
+"""
+import io
+import json
+import random
+import sys
+import time
+
+from catalog import MenuCatalog
+from headless import process_stream
+from menu_data import DISCOUNT_RATES, MENU
+
+
+def generate_feed(catalog: MenuCatalog, order_count: int, seed: int = 0) -> str:
+    """Returns a JSONL feed of random valid orders (plus a few invalid ones) over `catalog`"""
+    rng = random.Random(seed)
+    discounts = [None] + list(DISCOUNT_RATES)
+    a_la_carte = [item["id"] for item in catalog.menu if item["code"].category != "C"]
+    combos = [item["id"] for item in catalog.menu if item["code"].category == "C"]
+    lines = []
+    for n in range(order_count):
+        items = []
+        for _ in range(rng.randint(1, 6)):
+            if rng.random() < 0.3:
+                combo_id = rng.choice(combos)
+                options = {
+                    section["section"]: [option["id"] for option in rng.sample(section["options"], section["quantity"])]
+                    for section in catalog.resolve_combo(combo_id)
+                }
+                items.append({"id": combo_id, "quantity": rng.randint(1, 3), "options": options})
+            else:
+                items.append({"id": rng.choice(a_la_carte), "quantity": rng.randint(1, 5)})
+        if n % 100 == 99:
+            items.append({"id": "X99", "quantity": 1})
+        lines.append(json.dumps({"order_id": f"W{n}", "discount": rng.choice(discounts), "items": items}))
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    order_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    catalog = MenuCatalog(MENU)
+    feed = generate_feed(catalog, order_count)
+    output = io.StringIO()
+    start = time.perf_counter()
+    ok_count, error_count = process_stream(catalog, io.StringIO(feed), output)
+    seconds = time.perf_counter() - start
+    print(f"Orders:     {order_count:,} ({ok_count:,} ok, {error_count:,} rejected)")
+    print(f"Time:       {seconds:.3f}s")
+    print(f"Throughput: {order_count / seconds:,.0f} orders/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Measures checkout throughput of `journal.OrderJournal` with many concurrent checkouts,
+comparing one fsync per order against group commit, then checks crash recovery of a torn tail.
+
+Run with: python -m benchmarks.journal_group_commit [order_count] [threads]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from config import get_data_dir
+from journal import JOURNAL_MAGIC, OrderJournal, encode_record, recover_journal
+
+RECORD = {"order_number": 0, "lines": [{"id": "C01", "quantity": 1, "price": 880}], "total": 959}
+
+
+def run_fsync_per_order(path: str, order_count: int, threads: int):
+    """Baseline: every checkout writes its record and fsyncs it on its own"""
+    lock = threading.Lock()
+    f = open(path, "ab")
+    f.write(JOURNAL_MAGIC)
+    per_thread = order_count // threads
+
+    def worker():
+        for _ in range(per_thread):
+            data = encode_record(RECORD)
+            with lock:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+
+    seconds = run_threads(worker, threads)
+    f.close()
+    return per_thread * threads, seconds, per_thread * threads
+
+
+def run_threads(worker, threads: int) -> float:
+    """Runs `worker` on `threads` threads and returns the elapsed seconds"""
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker_thread in workers: worker_thread.start()
+    for worker_thread in workers: worker_thread.join()
+    return time.perf_counter() - start
+
+
+def run_group_commit(path: str, order_count: int, threads: int, commit_interval: float, max_batch: int):
+    """Appends `order_count` records from `threads` threads through `OrderJournal`, each waiting for its record to be durable"""
+    journal = OrderJournal(path, commit_interval=commit_interval, max_batch=max_batch)
+    per_thread = order_count // threads
+
+    def worker():
+        for _ in range(per_thread):
+            journal.append(RECORD)
+
+    seconds = run_threads(worker, threads)
+    journal.close()
+    return per_thread * threads, seconds, journal.fsync_count
+
+
+def main():
+    order_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    # Measured in the data directory so fsync hits the same disk as the real journal
+    with tempfile.TemporaryDirectory(dir=get_data_dir()) as tmp:
+        print(f"{'Mode':<22} {'Orders':>7} {'fsyncs':>7} {'Orders/s':>10}")
+        orders, seconds, fsyncs = run_fsync_per_order(os.path.join(tmp, "single.journal"), order_count, threads)
+        print(f"{'fsync per order':<22} {orders:>7} {fsyncs:>7} {orders / seconds:>10,.0f}")
+        path = os.path.join(tmp, "group.journal")
+        orders, seconds, fsyncs = run_group_commit(path, order_count, threads, 0.002, 256)
+        print(f"{'group commit':<22} {orders:>7} {fsyncs:>7} {orders / seconds:>10,.0f}")
+
+        # Crash recovery: cut the last record in half and add garbage after it
+        with open(path, "ab") as f:
+            f.write(encode_record({"order_number": -1})[:9])
+        state = recover_journal(path)
+        print(f"Recovered {len(state.records)} records, dropped {state.torn_bytes} torn bytes")
+        reopened = OrderJournal(path)
+        print(f"Next order number after recovery: {reopened.order_count + 1}")
+        reopened.close()
+
+
+if __name__ == "__main__":
+    main()
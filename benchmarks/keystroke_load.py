@@ -0,0 +1,286 @@
+"""
+Keystroke load test of the interactive UI: runs many cashier sessions of `interactive.py` in parallel,
+each in its own pseudo-terminal (`ROWS` x `COLUMNS`) with its own temporary config and data directory,
+feeds them keystrokes and captures everything they draw.
+
+Keystrokes come from one of:
+- the built-in `CASHIER_SCRIPT` (or `--script FILE`, same format: one `<screen>: <key> <key> ...` line per step),
+  which browses the menu (`handle_food_menu`), builds and edits a combo (`handle_edit_combo`), searches,
+  changes the cart (`handle_edit_cart`) and checks out (`handle_checkout`). Each key is sent once the previous
+  frame is drawn and the output has been quiet for `SETTLE` seconds, plus a random think time (`--think`).
+- keystroke recordings (`--replay FILE,...`, recorded on a kiosk with `kiosk.record_keys` in config.json,
+  see keyboard.py), replayed with their original timing (`--speed` to play them faster), cycled over the sessions.
+
+For every keystroke, the output drawn until the next one is attributed to it: render latency is the time from
+sending the key to the last byte of its frame, first byte the time to the first one. Keys that draw nothing
+(e.g. coalesced repeats, or Up at the top of a list) only count in the key totals.
+Reports render latency percentiles and output bytes per keystroke for each number of sessions,
+then per screen for the last one. A session is complete when the UI exits by itself at the end of its keys.
+
+Run with: python -m benchmarks.keystroke_load [sessions...] [--script FILE | --replay FILE,...] [--think SECONDS] [--speed X] [--capture DIR]
+"""
+import json
+import os
+import pty
+import random
+import selectors
+import signal
+import statistics
+import sys
+import tempfile
+import time
+
+from config import PROJECT_DIR, load_config
+from keyboard import key_bytes, read_recording
+
+SESSIONS = [1, 4, 16]
+ROWS = 40
+COLUMNS = 120
+# Seconds of quiet output after which a frame counts as drawn
+SETTLE = 0.05
+# Average seconds a scripted cashier waits between seeing a frame and the next key
+THINK_TIME = 0.1
+# Seconds a session gets to exit by itself after its last key
+EXIT_TIMEOUT = 2.0
+
+# Steps of a cashier's session on the default menu: (screen the keys go to, keys)
+CASHIER_SCRIPT = [
+    ("main", "enter"),
+    ("food_menu", "down down enter"),
+    ("quantity", "right enter"),
+    ("modal", "enter"),
+    ("main", "enter"),
+    ("food_menu", "right right right right enter"),
+    ("edit_combo", "right down spacebar right right down down spacebar left left left enter"),
+    ("quantity", "enter"),
+    ("modal", "enter"),
+    ("main", "enter"),
+    ("food_menu", "slash"),
+    ("search", "c o k e enter"),
+    ("quantity", "right right enter"),
+    ("modal", "enter"),
+    ("main", "down enter"),
+    ("edit_cart", "down right right left"),
+    ("edit_cart", "enter"),
+    ("edit_combo", "right down spacebar down spacebar enter"),
+    ("modal", "enter"),
+    ("edit_cart", "up backspace down q"),
+    ("main", "down down enter"),
+    ("checkout", "down enter"),
+    ("receipt", "enter"),
+]
+
+
+def script_steps(script: list[tuple[str, str]]) -> list[tuple[str, bytes]]:
+    """`(screen, input)` of every key of a script"""
+    return [(screen, key_bytes(key)) for screen, keys in script for key in keys.split()]
+
+
+def read_script(path: str) -> list[tuple[str, str]]:
+    """Loads a script file: `<screen>: <key> <key> ...` per line (`#` starts a comment)"""
+    script = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                screen, _, keys = line.partition(":")
+                script.append((screen.strip(), keys))
+    return script
+
+
+class Session:
+    """One kiosk UI in a pseudo-terminal and the keystrokes sent to it"""
+
+    def __init__(self, number: int, steps: list, config_path: str, timed: bool):
+        self.number = number
+        self.steps = steps      # (screen, input), or (seconds after the first frame, input) when `timed`
+        self.timed = timed
+        self.next_step = 0
+        self.output = bytearray()
+        self.keystrokes = []    # per key: [screen, sent, first byte, last byte, bytes]
+        self.startup = None     # seconds to the first frame
+        self.exit_code = None
+        self.terminated = False
+        self.started = time.perf_counter()
+        self.last_output = None
+        self.send_at = None
+        self.pid, self.fd = pty.fork()
+        if self.pid == 0:
+            env = {**os.environ, "FASTFOOD_CONFIG": config_path, "LINES": str(ROWS), "COLUMNS": str(COLUMNS)}
+            os.execve(sys.executable, [sys.executable, os.path.join(PROJECT_DIR, "interactive.py")], env)
+
+    @property
+    def done(self) -> bool:
+        return self.exit_code is not None
+
+    def read(self, now: float) -> bool:
+        """Takes the output waiting on the terminal, returns False once the UI has exited"""
+        try:
+            data = os.read(self.fd, 65536)
+        except OSError:
+            data = b""
+        if not data:
+            return False
+        self.output += data
+        self.last_output = now
+        if self.keystrokes:
+            keystroke = self.keystrokes[-1]
+            if keystroke[2] is None:
+                keystroke[2] = now
+            keystroke[3] = now
+            keystroke[4] += len(data)
+        return True
+
+    def quiet_since(self) -> float:
+        last = self.last_output or self.started
+        return max(last, self.keystrokes[-1][1]) if self.keystrokes else last
+
+    def deadline(self, think_time: float, rng: random.Random) -> float | None:
+        """When this session next needs attention: its next key, settling its frame or giving up on its exit"""
+        if self.startup is None:
+            return self.quiet_since() + SETTLE if self.last_output is not None else None
+        if self.next_step >= len(self.steps):
+            return self.quiet_since() + EXIT_TIMEOUT
+        if self.send_at is None:
+            if self.timed:
+                self.send_at = self.started + self.startup + self.steps[self.next_step][0]
+            else:
+                self.send_at = self.quiet_since() + SETTLE + (rng.uniform(0, 2 * think_time) if think_time else 0)
+        return self.send_at
+
+    def tick(self, now: float, think_time: float, rng: random.Random):
+        if self.startup is None:
+            if self.last_output is not None and now - self.last_output >= SETTLE:
+                self.startup = self.last_output - self.started
+            return
+        if self.next_step >= len(self.steps):
+            if now - self.quiet_since() >= EXIT_TIMEOUT and not self.terminated:
+                self.terminated = True
+                os.kill(self.pid, signal.SIGTERM)
+            return
+        if not self.timed and now - self.quiet_since() < SETTLE:
+            # Output came after the key was scheduled: wait for the frame to finish first
+            self.send_at = None
+            return
+        if now >= self.deadline(think_time, rng):
+            screen, data = self.steps[self.next_step]
+            self.keystrokes.append([screen if not self.timed else "recorded", now, None, None, 0])
+            os.write(self.fd, data)
+            self.next_step += 1
+            self.send_at = None
+
+    def close(self):
+        os.close(self.fd)
+        _, status = os.waitpid(self.pid, 0)
+        self.exit_code = os.waitstatus_to_exitcode(status)
+
+
+def run_sessions(session_count: int, streams: list, timed: bool, think_time: float, tmp: str) -> tuple[list[Session], float]:
+    """Runs `session_count` sessions until they all exit; `streams` are cycled over them"""
+    base_config = load_config()
+    sessions = []
+    for i in range(session_count):
+        directory = os.path.join(tmp, f"session-{session_count}-{i}")
+        os.makedirs(directory)
+        config_path = os.path.join(directory, "config.json")
+        with open(config_path, "w", encoding="utf-8") as f:
+            json.dump({**base_config, "database": {"dir": os.path.join(directory, "data")}, "order_server": {"address": ""}, "kiosk": {"record_keys": False}}, f)
+        sessions.append(Session(i, streams[i % len(streams)], config_path, timed))
+
+    rng = random.Random(session_count)
+    selector = selectors.DefaultSelector()
+    for session in sessions:
+        selector.register(session.fd, selectors.EVENT_READ, session)
+    started = time.perf_counter()
+    running = len(sessions)
+    while running:
+        deadlines = [deadline for session in sessions if not session.done and (deadline := session.deadline(think_time, rng)) is not None]
+        timeout = max(min(deadlines) - time.perf_counter(), 0) if deadlines else None
+        for key, _ in selector.select(timeout):
+            session = key.data
+            if not session.read(time.perf_counter()):
+                selector.unregister(session.fd)
+                session.close()
+                running -= 1
+        now = time.perf_counter()
+        for session in sessions:
+            if not session.done:
+                session.tick(now, think_time, rng)
+    return sessions, time.perf_counter() - started
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def summary(keystrokes: list) -> str:
+    """Key count, render latency percentiles (ms) and bytes per key of some keystrokes"""
+    drawn = [keystroke for keystroke in keystrokes if keystroke[2] is not None]
+    latencies = [(keystroke[3] - keystroke[1]) * 1000 for keystroke in drawn] or [0.0]
+    first = [(keystroke[2] - keystroke[1]) * 1000 for keystroke in drawn] or [0.0]
+    sizes = [keystroke[4] for keystroke in keystrokes] or [0]
+    return (
+        f"{len(keystrokes):>6} {len(drawn):>6} {percentile(first, 0.5):>8.2f} {percentile(latencies, 0.5):>8.2f} {percentile(latencies, 0.95):>8.2f}"
+        f" {percentile(latencies, 0.99):>8.2f} {max(latencies):>8.2f} {statistics.mean(sizes):>9,.0f} {max(sizes):>9,}"
+    )
+
+
+HEADER = f"{'Keys':>6} {'Drawn':>6} {'1st p50':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'Bytes/key':>9} {'Max bytes':>9}"
+
+
+def main(argv: list[str]):
+    args = argv[1:]
+    options = {"--script": None, "--replay": None, "--think": THINK_TIME, "--speed": 1.0, "--capture": None}
+    session_counts = []
+    while args:
+        arg = args.pop(0)
+        if arg.isdigit():
+            session_counts.append(int(arg))
+            continue
+        if arg not in options or not args:
+            print(__doc__.strip().splitlines()[-1], file=sys.stderr)
+            return 2
+        options[arg] = args.pop(0)
+    session_counts = session_counts or SESSIONS
+
+    if options["--replay"]:
+        speed = float(options["--speed"])
+        streams = []
+        for path in options["--replay"].split(","):
+            # A recording starts when the UI first waits for a key, i.e. once its first frame is drawn
+            _, chunks = read_recording(path)
+            streams.append([(t / speed, data) for t, data in chunks])
+        timed = True
+    else:
+        streams = [script_steps(read_script(options["--script"]) if options["--script"] else CASHIER_SCRIPT)]
+        timed = False
+
+    print(f"{'Sessions':>8} {'Complete':>8} {'Startup':>8} {HEADER} {'Keys/s':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for session_count in session_counts:
+            sessions, elapsed = run_sessions(session_count, streams, timed, float(options["--think"]), tmp)
+            keystrokes = [keystroke for session in sessions for keystroke in session.keystrokes]
+            complete = sum(1 for session in sessions if session.exit_code == 0 and not session.terminated)
+            startup = statistics.median(session.startup for session in sessions if session.startup is not None) * 1000
+            print(f"{session_count:>8} {complete:>8} {startup:>8.0f} {summary(keystrokes)} {len(keystrokes) / elapsed:>7,.0f}")
+            if options["--capture"]:
+                os.makedirs(options["--capture"], exist_ok=True)
+                for session in sessions:
+                    with open(os.path.join(options["--capture"], f"session-{session_count}-{session.number}.out"), "wb") as f:
+                        f.write(session.output)
+
+    screens = {}
+    for keystroke in keystrokes:
+        screens.setdefault(keystroke[0], []).append(keystroke)
+    print(f"\nBy screen, {session_counts[-1]} sessions (latencies in ms)")
+    print(f"{'Screen':<12} {HEADER}")
+    for screen, values in screens.items():
+        print(f"{screen:<12} {summary(values)}")
+    if options["--capture"]:
+        print(f"Output of every session written to {options['--capture']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,90 @@
+"""
+Simulates a service at the kitchen with `kitchen.KitchenScheduler` (discrete events, no waiting on the clock).
+Orders arrive at random (Poisson arrivals at each rate in `RATES`, orders per minute) for `DURATION` seconds,
+each of 1-3 lines from `MENU` (see benchmarks/order_gen.py). The same orders are run through each policy.
+
+Reports per policy and rate:
+- ticket times (order received to every item done): mean, p50, p95, p99, in seconds
+- hold: mean seconds a finished item waits for the rest of its order
+- the most items waiting at once, and the scheduler's own cost per order (wall clock)
+
+Run with: python -m benchmarks.kitchen_sim [orders per minute...]
+"""
+import random
+import statistics
+import sys
+import time
+
+from benchmarks.order_gen import random_order
+from catalog import MenuCatalog
+from kitchen import POLICIES, KitchenScheduler
+from menu_data import MENU
+
+RATES = [1.0, 2.0, 2.5, 3.0]
+# Simulated seconds of arrivals (a peak hour)
+DURATION = 3600
+
+
+def arrivals(catalog: MenuCatalog, rate: float, seed: int = 0) -> list[tuple[float, dict]]:
+    rng = random.Random(seed)
+    orders = []
+    now = rng.expovariate(rate / 60)
+    while now < DURATION:
+        orders.append((now, random_order(catalog, len(orders) + 1, rng)))
+        now += rng.expovariate(rate / 60)
+    return orders
+
+
+def simulate(policy: str, orders: list[tuple[float, dict]], catalog: MenuCatalog) -> dict:
+    """Runs the orders through a scheduler until the kitchen is idle again"""
+    scheduler = KitchenScheduler(policy=policy, catalog=catalog)
+    display = scheduler.subscribe()
+    created, done, ticket_times, holds = {}, {}, [], []
+    max_waiting = 0
+    position = 0
+    started = time.perf_counter()
+    while position < len(orders) or scheduler.next_time() is not None:
+        next_time = scheduler.next_time()
+        if position < len(orders) and (next_time is None or orders[position][0] <= next_time):
+            now, record = orders[position]
+            position += 1
+            scheduler.advance(now)
+            scheduler.submit(record, now)
+            created[record["order_number"]] = now
+        else:
+            scheduler.advance(next_time)
+        max_waiting = max(max_waiting, scheduler.waiting_count)
+        for event in display.drain():
+            if event.kind == "done":
+                done.setdefault(event.order_number, []).append(event.time)
+            elif event.kind == "ready":
+                ticket_times.append(event.time - created.pop(event.order_number))
+                holds.extend(event.time - finished for finished in done.pop(event.order_number))
+    elapsed = time.perf_counter() - started
+    assert display.dropped == 0 and len(ticket_times) == len(orders)
+    ticket_times.sort()
+    return {
+        "mean": statistics.mean(ticket_times),
+        "p50": ticket_times[len(ticket_times) // 2],
+        "p95": ticket_times[int(len(ticket_times) * 0.95)],
+        "p99": ticket_times[int(len(ticket_times) * 0.99)],
+        "hold": statistics.mean(holds),
+        "max_waiting": max_waiting,
+        "us_per_order": elapsed / len(orders) * 1e6,
+    }
+
+
+def main(argv: list[str]):
+    rates = [float(arg) for arg in argv[1:]] or RATES
+    catalog = MenuCatalog(MENU)
+    print(f"{'Orders/min':>10} {'Policy':>6} {'Mean (s)':>9} {'p50 (s)':>8} {'p95 (s)':>8} {'p99 (s)':>8} {'Hold (s)':>9} {'Max waiting':>12} {'us/order':>9}")
+    for rate in rates:
+        orders = arrivals(catalog, rate)
+        for policy in POLICIES:
+            result = simulate(policy, orders, catalog)
+            print(f"{rate:>10.1f} {policy:>6} {result['mean']:>9.0f} {result['p50']:>8.0f} {result['p95']:>8.0f} {result['p99']:>8.0f} "
+                  f"{result['hold']:>9.0f} {result['max_waiting']:>12} {result['us_per_order']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
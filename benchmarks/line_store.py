@@ -0,0 +1,106 @@
+"""
+Compares the columnar order line store (line_store.py) with order lines kept as dicts:
+- size: the lines as decoded from the journal (dicts, strings and numbers) against the store's columns,
+  and the journal's JSON against the saved store file
+- aggregation: a group-by over the dict lines against `group_sum` / `select` / `option_sum`
+  on the store repeated up to `LINES` lines
+
+Run with: python -m benchmarks.line_store [orders]
+"""
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.order_gen import random_order
+from catalog import MenuCatalog
+from journal import RECORD_HEADER, encode_record
+from line_store import OrderLineStore
+from menu_data import MENU
+
+ORDERS = 100_000
+LINES = 10_000_000
+RUNS = 3
+
+
+def deep_size(value, seen=None) -> int:
+    """Bytes held by a value and everything it refers to (each object counted once)"""
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(deep_size(key, seen) + deep_size(item, seen) for key, item in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(deep_size(item, seen) for item in value)
+    return size
+
+
+def best_time(function, runs: int = RUNS) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def dict_group_sum(records: list[dict]) -> dict:
+    sums = {}
+    for record in records:
+        for line in record["lines"]:
+            sums[line["id"]] = sums.get(line["id"], 0) + line["total"]
+    return sums
+
+
+def main(argv: list[str]):
+    order_count = int(argv[1]) if len(argv) > 1 else ORDERS
+    catalog = MenuCatalog(MENU)
+    rng = random.Random(0)
+    opening = datetime(2024, 5, 1, 10)
+    journal = [encode_record(random_order(catalog, i + 1, rng, opening + timedelta(seconds=i * 30))) for i in range(order_count)]
+    # As decoded from the journal: every record has its own strings
+    records = [json.loads(data[RECORD_HEADER.size:]) for data in journal]
+    store = OrderLineStore.from_records(records)
+    line_count = len(store)
+
+    dict_bytes = deep_size([record["lines"] for record in records])
+    journal_bytes = sum(len(data) for data in journal)
+    file_bytes = len(store.to_bytes())
+    print(f"{order_count:,} orders, {line_count:,} lines ({len(store.option_sets) - 1:,} distinct combo selections)")
+    print(f"{'Form':<24} {'Bytes':>14} {'Bytes/line':>11} {'Ratio':>7}")
+    print(f"{'dict lines (memory)':<24} {dict_bytes:>14,} {dict_bytes / line_count:>11.1f} {1:>7.1f}")
+    print(f"{'store columns (memory)':<24} {store.nbytes:>14,} {store.nbytes / line_count:>11.1f} {dict_bytes / store.nbytes:>7.1f}")
+    print(f"{'journal (file)':<24} {journal_bytes:>14,} {journal_bytes / line_count:>11.1f} {1:>7.1f}")
+    print(f"{'store (file)':<24} {file_bytes:>14,} {file_bytes / line_count:>11.1f} {journal_bytes / file_bytes:>7.1f}")
+
+    dict_time = best_time(lambda: dict_group_sum(records))
+    assert dict_group_sum(records) == store.group_sum("item")
+    del records, journal
+
+    big = OrderLineStore()
+    big.extend(store)
+    while len(big) < LINES:
+        big.extend(big if len(big) * 2 <= LINES else store)
+    print(f"\nAggregations over {len(big):,} lines")
+    print(f"{'Query':<44} {'Time (ms)':>10}")
+    print(f"{'dict lines, sum by item (est. at this size)':<44} {dict_time * len(big) / line_count * 1000:>10.0f}")
+    lunch = (opening.replace(hour=12), opening.replace(hour=14))
+    queries = {
+        "sum by item": lambda: big.group_sum("item"),
+        "sum by category": lambda: big.group_sum("category"),
+        "quantity by hour": lambda: big.group_sum("hour", "quantity"),
+        "lines by discount": lambda: big.group_sum("discount", "lines"),
+        "burgers at lunch, no discount, by item": lambda: big.group_sum(
+            "item", where=big.select(categories={"B"}, discount_types=[None], start=lunch[0], end=lunch[1])
+        ),
+        "combo choices": lambda: big.option_sum(),
+    }
+    for name, query in queries.items():
+        print(f"{name:<44} {best_time(query) * 1000:>10.0f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,31 @@
+"""Generates large synthetic menus shaped like `MENU` for benchmarking"""
+import random
+
+# Category codes used for generated a la carte items
+CATEGORY_CODES = ["B", "S", "D", "DS"]
+
+
+def generate_menu(size: int, combo_ratio: float = 0.05, seed: int = 0):
+    """
+    Returns a list of `size` menu items spread across the categories of `MENU_ITEM_IDS`.
+    About `combo_ratio` of the items are combos whose sections mix wildcard category codes and item IDs.
+    """
+    rng = random.Random(seed)
+    combo_count = max(int(size * combo_ratio), 1)
+    item_count = size - combo_count
+    menu = []
+    ids_by_category = {code: [] for code in CATEGORY_CODES}
+    for i in range(item_count):
+        code = CATEGORY_CODES[i % len(CATEGORY_CODES)]
+        item_id = f"{code}{i // len(CATEGORY_CODES) + 1:02d}"
+        ids_by_category[code].append(item_id)
+        menu.append({"id": item_id, "name": f"Item {item_id}", "price": rng.randint(100, 900) / 100})
+    for i in range(combo_count):
+        item_id = f"C{i + 1:02d}"
+        item_ref_ids = {
+            "Burger": (["B"], 1),
+            "Side": (rng.sample(ids_by_category["S"], min(3, len(ids_by_category["S"]))), 1),
+            "Drink": (["D"], 1),
+        }
+        menu.append({"id": item_id, "name": f"Combo {item_id}", "item_ref_ids": item_ref_ids, "price": rng.randint(600, 1500) / 100})
+    return menu
@@ -0,0 +1,89 @@
+"""
+Measures hot reloads of the menu file through `menu_source.MenuSource`:
+- full: parsing the file and indexing the whole menu again (`MenuCatalog(menu)`)
+- incremental: `MenuCatalog.updated` after changing one price, re-indexing only that category
+- reload: the whole background reload (read, hash, parse, update, check every combo, swap)
+- longest stall: the longest pause of a thread looking items up in `current` while the reload runs
+
+Run with: python -m benchmarks.menu_reload
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+
+from benchmarks.menu_gen import generate_menu
+from catalog import MenuCatalog
+from menu_source import MenuSource, parse_menu_file
+
+SIZES = [1_000, 10_000, 30_000]
+RUNS = 5
+
+
+def write_menu(path: str, menu: list[dict]):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"gst": 0.09, "discount_rates": {"student": 0.1}, "menu": menu}, f)
+
+
+def longest_stall_ms(source: MenuSource, path: str, menu: list[dict]) -> tuple[float, float]:
+    """Changes one price and reloads in a thread, returns (reload time, longest gap between lookups) in ms"""
+    menu[0]["price"] = round(menu[0]["price"] + 0.1, 2)
+    write_menu(path, menu)
+    done = threading.Event()
+    elapsed = []
+
+    def reload():
+        start = time.perf_counter()
+        assert source.reload(), source.error
+        elapsed.append(time.perf_counter() - start)
+        done.set()
+
+    thread = threading.Thread(target=reload)
+    longest = 0.0
+    previous = time.perf_counter()
+    thread.start()
+    while not done.is_set():
+        source.current.catalog.get_item_by_id("B01")
+        now = time.perf_counter()
+        longest = max(longest, now - previous)
+        previous = now
+    thread.join()
+    return elapsed[0] * 1000, longest * 1000
+
+
+def main():
+    print(f"{'Items':>7} {'Full (ms)':>10} {'Incremental (ms)':>17} {'Reload (ms)':>12} {'Longest stall (ms)':>19}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "menu.json")
+        for size in SIZES:
+            menu = generate_menu(size)
+            # JSON has no tuples: compare like for like with the file's lists
+            menu = json.loads(json.dumps(menu))
+            write_menu(path, menu)
+            with open(path, "rb") as f:
+                data = f.read()
+            base = MenuCatalog(parse_menu_file(data)[0])
+
+            full = incremental = reload = stall = float("inf")
+            for run in range(RUNS):
+                start = time.perf_counter()
+                MenuCatalog(parse_menu_file(data)[0])
+                full = min(full, time.perf_counter() - start)
+
+                edited = parse_menu_file(data)[0]
+                edited[run]["price"] += 1
+                start = time.perf_counter()
+                catalog, changed = base.updated(edited)
+                incremental = min(incremental, time.perf_counter() - start)
+                assert len(changed) == 1 and catalog.items_by_category["C"] is base.items_by_category["C"]
+
+            source = MenuSource(path)
+            for _ in range(RUNS):
+                reload_ms, stall_ms = longest_stall_ms(source, path, menu)
+                reload, stall = min(reload, reload_ms), min(stall, stall_ms)
+            print(f"{size:>7} {full * 1000:>10.2f} {incremental * 1000:>17.2f} {reload:>12.2f} {stall:>19.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Measures type-ahead search on a 50,000-item menu: building `search.MenuSearchIndex`,
+then one search per keystroke while queries (some with typos) are typed out.
+
+Run with: python -m benchmarks.menu_search [menu_size]
+"""
+import random
+import sys
+import time
+
+from benchmarks.menu_gen import generate_menu
+from catalog import MenuCatalog
+
+ADJECTIVES = ["classic", "spicy", "crispy", "smoky", "double", "grilled", "cheesy", "honey", "garlic", "golden",
+              "loaded", "mini", "jumbo", "zesty", "tangy", "sweet", "fiery", "herb", "truffle", "teriyaki"]
+NOUNS = ["beef", "chicken", "fish", "veggie", "mushroom", "bacon", "nuggets", "fries", "wedges", "onion",
+         "rings", "cola", "lemonade", "shake", "sundae", "pie", "cookie", "wrap", "salad", "tenders"]
+KINDS = ["burger", "combo", "bucket", "box", "meal", "bites", "float", "cup", "platter", "sandwich"]
+QUERIES = ["b123", "spicy chicken", "chiken burgr", "grilled mushrom burger", "truffle fries", "hony tenders box",
+           "d20", "teriyaki beef platter", "zesty lemonade", "mini cookie"]
+
+
+def name_menu(menu: list[dict], seed: int = 0):
+    """Gives generated items realistic multi-word names"""
+    rng = random.Random(seed)
+    for item in menu:
+        item["name"] = f"{rng.choice(ADJECTIVES).title()} {rng.choice(NOUNS).title()} {rng.choice(KINDS).title()}"
+    return menu
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    catalog = MenuCatalog(name_menu(generate_menu(size)))
+
+    start = time.perf_counter()
+    index = catalog.search_index
+    print(f"Menu items:       {len(index):,}")
+    print(f"Index build:      {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+    timings = []
+    for query in QUERIES:
+        for end in range(1, len(query) + 1):
+            start = time.perf_counter()
+            index.search(query[:end], 10)
+            timings.append(time.perf_counter() - start)
+    timings.sort()
+    print(f"Keystrokes:       {len(timings)}")
+    print(f"Per keystroke:    median {timings[len(timings) // 2] * 1e6:.0f} us, "
+          f"p95 {timings[int(len(timings) * 0.95)] * 1e6:.0f} us, max {timings[-1] * 1e6:.0f} us")
+    for query in QUERIES:
+        print(f"  {query!r:26} -> {[item['name'] for item in index.search(query, 3)]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Compares building the menu catalog from a JSON menu file at start-up against loading it from `menu_snapshot`:
+- JSON + index: `json.load` and `MenuCatalog(menu)`, combos resolved later on first open
+- JSON + combos: the same with every combo resolved, as the snapshot provides
+- snapshot: one read, checksum, `marshal` load and rebuild of the catalog
+The hash of the file's bytes, checking that the snapshot is current, is shown apart.
+
+Run with: python -m benchmarks.menu_snapshot
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.menu_gen import generate_menu
+from catalog import MenuCatalog
+from menu_snapshot import catalog_from_snapshot, encode_snapshot, read_snapshot, write_snapshot
+
+SIZES = [1_000, 10_000, 30_000]
+RUNS = 5
+
+
+def best_ms(func) -> float:
+    """Fastest of `RUNS` calls of `func`, in milliseconds"""
+    best = float("inf")
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def load_json(path: str) -> MenuCatalog:
+    with open(path, encoding="utf-8") as f:
+        return MenuCatalog(json.load(f))
+
+
+def load_json_all(path: str) -> MenuCatalog:
+    catalog = load_json(path)
+    for item in catalog.menu:
+        if "item_ref_ids" in item:
+            catalog.resolve_combo(item["id"])
+    return catalog
+
+
+def main():
+    print(
+        f"{'Items':>7} {'JSON + index (ms)':>18} {'JSON + combos (ms)':>19} {'Snapshot (ms)':>14} "
+        f"{'File hash (ms)':>15} {'Size (KB)':>10}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "menu.snapshot")
+        source_path = os.path.join(tmp, "menu.json")
+        for size in SIZES:
+            source = generate_menu(size)
+            with open(source_path, "w", encoding="utf-8") as f:
+                json.dump(source, f)
+            with open(source_path, "rb") as f:
+                source_hash = hashlib.sha256(f.read()).digest()
+            write_snapshot(path, encode_snapshot(load_json(source_path), source_hash))
+
+            loaded = catalog_from_snapshot(read_snapshot(path, source_hash))
+            built = load_json_all(source_path)
+            assert [item["id"] for item in loaded.menu] == [item["id"] for item in built.menu]
+            for combo_id in ("C01", f"C{max(size // 20, 1):02d}"):
+                assert [(s["section"], [o["id"] for o in s["options"]], s["locked"]) for s in loaded.resolve_combo(combo_id)] \
+                    == [(s["section"], [o["id"] for o in s["options"]], s["locked"]) for s in built.resolve_combo(combo_id)]
+
+            index_only = best_ms(lambda: load_json(source_path))
+            index_combos = best_ms(lambda: load_json_all(source_path))
+            snapshot = best_ms(lambda: catalog_from_snapshot(read_snapshot(path, source_hash)))
+            file_hash = best_ms(lambda: hashlib.sha256(open(source_path, "rb").read()).digest())
+            print(
+                f"{size:>7} {index_only:>18.2f} {index_combos:>19.2f} {snapshot:>14.2f} "
+                f"{file_hash:>15.2f} {os.path.getsize(path) / 1024:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
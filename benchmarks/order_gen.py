@@ -0,0 +1,67 @@
+"""Generates synthetic checked-out orders (journal records) and journal files for benchmarking"""
+import random
+from datetime import datetime, timedelta
+
+from catalog import MenuCatalog
+from journal import JOURNAL_MAGIC, encode_record, write_index
+from menu_data import DISCOUNT_RATES, GST
+from pricing import price_cart, to_cents
+
+COMBO_SHARE = 0.3
+# Trading hours of the generated day
+OPENING = 10
+CLOSING = 22
+
+
+def random_order(catalog: MenuCatalog, order_number: int, rng: random.Random, when: datetime | None = None) -> dict:
+    """A journal record (see `journal.order_record`) with 1-3 random lines, about a third of them combos"""
+    combos = catalog.get_items_by_category_code("C")
+    lines = []
+    for _ in range(rng.randint(1, 3)):
+        quantity = rng.choice([1, 1, 1, 2])
+        if rng.random() < COMBO_SHARE:
+            item = rng.choice(combos)
+        else:
+            item = rng.choice(catalog.menu)
+            while "item_ref_ids" in item:
+                item = rng.choice(catalog.menu)
+        price = to_cents(item["price"])
+        line = {"id": item["id"], "name": item["name"], "quantity": quantity, "price": price, "total": price * quantity}
+        if "item_ref_ids" in item:
+            line["options"] = {
+                section["section"]: [rng.choice(section["options"])["id"] for _ in range(section["quantity"])]
+                for section in catalog.resolve_combo(item["id"])
+            }
+        lines.append(line)
+    discount_type = rng.choice([None, None, None, *DISCOUNT_RATES])
+    discount_rate = DISCOUNT_RATES.get(discount_type, 0.0)
+    priced = price_cart(sum(line["total"] for line in lines), discount_rate, GST)
+    return {
+        "order_number": order_number,
+        "time": (when or datetime.now()).isoformat(timespec="seconds"),
+        "discount_type": discount_type,
+        "discount_rate": discount_rate,
+        "gst_rate": GST,
+        "lines": lines,
+        "subtotal": priced.subtotal,
+        "discount": priced.discount,
+        "gst": priced.gst,
+        "total": priced.total
+    }
+
+
+def write_journal(path: str, catalog: MenuCatalog, count: int, seed: int = 0, day: datetime | None = None):
+    """Writes a journal (and its index) of `count` random orders spread over the trading hours of a day"""
+    rng = random.Random(seed)
+    opening = (day or datetime.now()).replace(hour=OPENING, minute=0, second=0, microsecond=0)
+    step = (CLOSING - OPENING) * 3600 / max(count, 1)
+    entries = []
+    with open(path, "wb") as f:
+        f.write(JOURNAL_MAGIC)
+        offset = len(JOURNAL_MAGIC)
+        for i in range(count):
+            data = encode_record(random_order(catalog, i + 1, rng, opening + timedelta(seconds=i * step)))
+            f.write(data)
+            entries.append((offset, len(data)))
+            offset += len(data)
+    write_index(path, entries)
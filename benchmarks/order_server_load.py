@@ -0,0 +1,105 @@
+"""
+Load test of the order server: starts `order_server.py` in a subprocess (pinned to one core where possible)
+with a temporary data directory, then runs many concurrent kiosk sessions against it over a Unix socket.
+Each session fetches the menu, adds items and a combo, changes a quantity, edits the combo,
+removes a line and checks out, pausing a random think time (`THINK_TIME` on average) before each request.
+Reports p50/p99 latency per operation and overall.
+
+Run with: python -m benchmarks.order_server_load [--burst] [sessions...]
+(`--burst`: no think time, every session sends its requests back to back)
+"""
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from config import PROJECT_DIR
+
+SESSIONS = [100, 300, 1000]
+# Average seconds between two requests of a session (a cashier's keystrokes are further apart)
+THINK_TIME = 0.25
+COMBO_OPTIONS = {"Burger": ["B01"], "Fries": ["S01"], "Drink": ["D01"]}
+EDITED_OPTIONS = {"Burger": ["B02"], "Fries": ["S01"], "Drink": ["D02"]}
+SCRIPT = [
+    ("menu", {}),
+    ("add", {"item": {"id": "B01", "quantity": 2}}),
+    ("add", {"item": {"id": "S02", "quantity": 1}}),
+    ("add", {"item": {"id": "C01", "quantity": 1, "options": COMBO_OPTIONS}}),
+    ("set_quantity", {"index": 0, "quantity": 3}),
+    ("set_options", {"index": 2, "options": EDITED_OPTIONS}),
+    ("remove", {"index": 1}),
+    ("cart", {}),
+    ("checkout", {"discount": "student"}),
+]
+
+
+def pin_to_core(core: int):
+    if hasattr(os, "sched_setaffinity") and core < os.cpu_count():
+        os.sched_setaffinity(0, {core})
+
+
+async def run_session(path: str, latencies: dict, start: asyncio.Event, think_time: float, rng: random.Random):
+    reader, writer = await asyncio.open_unix_connection(path, limit=1 << 20)
+    await start.wait()
+    for op, fields in SCRIPT:
+        if think_time:
+            await asyncio.sleep(rng.uniform(0, 2 * think_time))
+        started = time.perf_counter()
+        writer.write(json.dumps({"op": op, **fields}).encode("utf-8") + b"\n")
+        response = json.loads(await reader.readline())
+        latencies[op].append(time.perf_counter() - started)
+        if not response["ok"]:
+            raise RuntimeError(f"{op} failed: {response['error']}")
+    writer.close()
+
+
+async def run_load(path: str, session_count: int, think_time: float) -> tuple[dict, float]:
+    latencies = {op: [] for op, _ in SCRIPT}
+    start = asyncio.Event()
+    rng = random.Random(0)
+    sessions = [asyncio.create_task(run_session(path, latencies, start, think_time, rng)) for _ in range(session_count)]
+    # Let every session connect first, then start them together
+    await asyncio.sleep(0.5)
+    started = time.perf_counter()
+    start.set()
+    await asyncio.gather(*sessions)
+    return latencies, time.perf_counter() - started
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def main(argv: list[str]):
+    think_time = 0.0 if "--burst" in argv else THINK_TIME
+    session_counts = [int(arg) for arg in argv[1:] if arg.isdigit()] or SESSIONS
+    pin_to_core(1)
+    with tempfile.TemporaryDirectory() as data_dir:
+        path = os.path.join(data_dir, "kiosk.sock")
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(PROJECT_DIR, "order_server.py"), path, "--data-dir", data_dir],
+            stderr=subprocess.DEVNULL, preexec_fn=lambda: pin_to_core(0)
+        )
+        try:
+            while not os.path.exists(path):
+                time.sleep(0.05)
+            for session_count in session_counts:
+                latencies, elapsed = asyncio.run(run_load(path, session_count, think_time))
+                all_latencies = [value for values in latencies.values() for value in values]
+                print(f"\n{session_count} concurrent sessions: {len(all_latencies)} requests in {elapsed:.2f}s ({len(all_latencies) / elapsed:,.0f} req/s)")
+                print(f"  {'Op':<13} {'p50 (ms)':>9} {'p99 (ms)':>9} {'mean (ms)':>10}")
+                for op, values in [*latencies.items(), ("all", all_latencies)]:
+                    print(f"  {op:<13} {percentile(values, 0.5) * 1000:>9.2f} {percentile(values, 0.99) * 1000:>9.2f} {statistics.mean(values) * 1000:>10.2f}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,66 @@
+"""
+Prices 1M generated carts with `pricing.price_batch` and checks every cart against the
+float calculation `print_receipt` used before the integer-cent engine.
+
+Run with: python -m benchmarks.pricing_batch [cart_count]
+"""
+import random
+import sys
+import time
+
+from pricing import BASIS_POINTS, price_batch, price_cart, to_basis_points
+
+GST = 0.09
+DISCOUNT_RATES = [0.0, 0.10, 0.08, 0.05]
+
+
+def float_receipt_total(subtotal: float, discount: float):
+    """The receipt calculation before pricing.py, returns (discount, gst, total) in dollars"""
+    discount_amt = round(subtotal * discount, 2)
+    discounted_subtotal = subtotal - discount_amt
+    gst = round(discounted_subtotal * GST, 2)
+    return discount_amt, gst, round(discounted_subtotal + gst, 2)
+
+
+def is_half_cent_tie(cents: int, rate: float):
+    """True if `cents * rate` is exactly halfway between two cents (where float rounding is arbitrary)"""
+    return cents * to_basis_points(rate) % BASIS_POINTS == BASIS_POINTS // 2
+
+
+def main():
+    cart_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = random.Random(0)
+    # Carts of 1 to 8 lines priced like the menu (1.50 to 9.00, quantities 1 to 5)
+    subtotals = [sum(rng.randint(150, 900) * rng.randint(1, 5) for _ in range(rng.randint(1, 8))) for _ in range(cart_count)]
+    discounts = [rng.choice(DISCOUNT_RATES) for _ in range(cart_count)]
+
+    start = time.perf_counter()
+    priced = price_batch(subtotals, discounts, GST)
+    batch_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for subtotal, discount in zip(subtotals, discounts):
+        price_cart(subtotal, discount, GST)
+    single_seconds = time.perf_counter() - start
+
+    mismatches = 0
+    tie_mismatches = 0
+    totals = list(priced.total)
+    for i, (subtotal, discount) in enumerate(zip(subtotals, discounts)):
+        _, _, float_total = float_receipt_total(subtotal / 100, discount)
+        if round(float_total * 100) != totals[i]:
+            mismatches += 1
+            discount_cents = int(priced.discount[i])
+            if is_half_cent_tie(subtotal, discount) or is_half_cent_tie(subtotal - discount_cents, GST):
+                tie_mismatches += 1
+
+    print(f"Carts priced:            {cart_count:,}")
+    print(f"price_batch:             {batch_seconds:.3f}s ({cart_count / batch_seconds:,.0f} carts/s)")
+    print(f"price_cart loop:         {single_seconds:.3f}s ({cart_count / single_seconds:,.0f} carts/s)")
+    print(f"Totals matching float:   {cart_count - mismatches:,}")
+    print(f"Differing totals:        {mismatches:,} ({tie_mismatches:,} at exact half-cent ties)")
+    print(f"End-of-day total (cents): {int(sum(totals)):,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Compares the print()-per-line receipt function with `ReceiptRenderer`, checking that both produce the same text,
+then renders a batch of receipts as the journal and reprint paths do.
+
+Run with: python -m benchmarks.receipt_render [receipt_count]
+"""
+import contextlib
+import io
+import random
+import sys
+import time
+from datetime import datetime
+
+from catalog import MenuCatalog
+from menu_data import GST, MENU
+from pricing import price_cart
+from receipt import RECEIPT_RENDERER, condense, ADDRESS, PHONE_NUMBER, RESTAURANT_NAME, WEBSITE
+
+NOW = datetime(2026, 10, 18, 12, 30)
+
+
+def print_receipt_per_line(lines, priced, discount, gst_rate, now, item_name, order_number=None):
+    """The receipt function before ReceiptRenderer: one print() per line, layout rebuilt on every call"""
+    col_id, col_name, col_type, col_price, col_qty, col_desc = 5, 17, 12, 9, 4, 20
+    header_fields = (
+        f"{'No.':<3} {'ID':<{col_id}} {'Name':<{col_name}} "
+        f"{'Description':<{col_desc}} {'Type':>{col_type}} "
+        f"{'Price':>{col_price}} {'Qty':>{col_qty}}"
+    )
+    receipt_width = len(header_fields)
+    print(f"\n{RESTAURANT_NAME:^{receipt_width}}")
+    print(f"{ADDRESS:^{receipt_width}}")
+    print(f"{'Tel: ' + PHONE_NUMBER:^{receipt_width}}")
+    print(f"{WEBSITE:^{receipt_width}}")
+    print("-" * receipt_width)
+    print(f"Date: {now.strftime('%d %b %Y   %H:%M')}")
+    if order_number is not None:
+        print(f"Order No.: {order_number}")
+    print("-" * receipt_width)
+    print(header_fields)
+    print("-" * receipt_width)
+    for i, item in enumerate(lines, 1):
+        type_str = "Combo" if "options" in item else "À la carte"
+        disp_name = condense(item.get('name', ''), col_name)
+        disp_desc = condense(item.get('description', ''), col_desc)
+        print(f"{i:<3} {item['id']:<{col_id}} {disp_name:<{col_name}} {disp_desc:<{col_desc}} {type_str:>{col_type}} "
+              f"{item['price'] / 100:>{col_price}.2f} {item['quantity']:>{col_qty}}")
+        if "options" in item:
+            spaces = " " * (col_id + col_name + 6)
+            for option_name, ids in item["options"].items():
+                print(spaces + f"{condense(option_name, 12)}:")
+                count = 1
+                current_id = ""
+                for item_id in ids:
+                    if current_id == item_id: count += 1
+                    else:
+                        count = 1
+                        current_id = item_id
+                    print(spaces + condense(str(count) + " " + item_name(item_id), col_name))
+    print("-" * receipt_width)
+    print(f"{'Subtotal:':<{receipt_width - 10}}{priced.subtotal / 100:>10.2f}")
+    if discount > 0.0:
+        print(f"{f'Discount {discount*100:.0f}%:':<{receipt_width - 10}}-{priced.discount / 100:>9.2f}")
+    print(f"{f'GST {gst_rate*100:.0f}%:':<{receipt_width - 10}}{priced.gst / 100:>10.2f}")
+    print("-" * receipt_width)
+    print(f"{'TOTAL:':<{receipt_width - 10}}{priced.total / 100:>10.2f}")
+    print("-" * receipt_width)
+    print()
+    print(f"{'Thank you for dining with us!':^{receipt_width}}")
+    print(f"{'We hope to see you again.':^{receipt_width}}\n")
+
+
+def generate_records(catalog: MenuCatalog, count: int, seed: int = 0) -> list[dict]:
+    """Random journal-style order records over the real menu"""
+    rng = random.Random(seed)
+    records = []
+    for n in range(1, count + 1):
+        lines = []
+        for item in rng.sample(catalog.menu, rng.randint(1, 6)):
+            line = {"id": item["id"], "name": item["name"], "quantity": rng.randint(1, 4), "price": round(item["price"] * 100)}
+            line["total"] = line["price"] * line["quantity"]
+            if "item_ref_ids" in item:
+                line["options"] = {
+                    section["section"]: [option["id"] for option in rng.sample(section["options"], section["quantity"])]
+                    for section in catalog.resolve_combo(item["id"])
+                }
+            lines.append(line)
+        discount = rng.choice([0.0, 0.10, 0.08, 0.05])
+        priced = price_cart(sum(line["total"] for line in lines), discount, GST)
+        records.append({
+            "order_number": n, "time": NOW.isoformat(), "discount_rate": discount, "gst_rate": GST, "lines": lines,
+            "subtotal": priced.subtotal, "discount": priced.discount, "gst": priced.gst, "total": priced.total
+        })
+    return records
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    catalog = MenuCatalog(MENU)
+    item_name = lambda item_id: catalog.get_item_by_id(item_id)["name"]
+    records = generate_records(catalog, count)
+
+    start = time.perf_counter()
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        for record in records:
+            priced = price_cart(record["subtotal"], record["discount_rate"], GST)
+            print_receipt_per_line(record["lines"], priced, record["discount_rate"], GST, NOW, item_name, record["order_number"])
+    old_seconds = time.perf_counter() - start
+    old_text = buffer.getvalue()
+
+    start = time.perf_counter()
+    new_text = "".join(RECEIPT_RENDERER.render_record(record, item_name) for record in records)
+    new_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch_text = RECEIPT_RENDERER.render_batch(records, item_name)
+    batch_seconds = time.perf_counter() - start
+
+    print(f"Receipts:                {count:,} ({len(new_text) / 1e6:.1f} MB of text)")
+    print(f"print() per line:        {old_seconds * 1e3:8.1f} ms ({old_seconds / count * 1e6:.1f} us/receipt)")
+    print(f"ReceiptRenderer.render:  {new_seconds * 1e3:8.1f} ms ({new_seconds / count * 1e6:.1f} us/receipt)")
+    print(f"ReceiptRenderer batch:   {batch_seconds * 1e3:8.1f} ms ({batch_seconds / count * 1e6:.1f} us/receipt)")
+    print(f"Identical output:        {old_text == new_text == batch_text}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Measures the end-of-day report (report.py) on a generated day of orders:
+the single-process reference pass against the sharded report with 1, 2, 4... worker processes
+(up to the CPUs available), checking that every report matches the reference exactly.
+
+Run with: python -m benchmarks.report_scaling [orders]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.order_gen import write_journal
+from catalog import MenuCatalog
+from menu_data import MENU
+from report import aggregate_journal, build_report
+
+ORDERS = 1_000_000
+
+
+def main(argv: list[str]):
+    count = int(argv[1]) if len(argv) > 1 else ORDERS
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    workers = [1]
+    while workers[-1] * 2 <= cpus:
+        workers.append(workers[-1] * 2)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "orders.journal")
+        start = time.perf_counter()
+        write_journal(path, MenuCatalog(MENU), count)
+        print(f"{count:,} orders, {os.path.getsize(path) / 1e6:,.0f} MB journal (generated in {time.perf_counter() - start:.1f}s), {cpus} CPU(s)")
+
+        start = time.perf_counter()
+        reference = aggregate_journal(path)
+        baseline = time.perf_counter() - start
+        print(f"{'Workers':>9} {'Time (s)':>9} {'Orders/s':>11} {'Speedup':>8} {'Matches':>8}")
+        print(f"{'reference':>9} {baseline:>9.2f} {count / baseline:>11,.0f} {1:>8.2f} {'-':>8}")
+        for worker_count in workers:
+            start = time.perf_counter()
+            report = build_report(path, worker_count)
+            elapsed = time.perf_counter() - start
+            print(f"{worker_count:>9} {elapsed:>9.2f} {count / elapsed:>11,.0f} {baseline / elapsed:>8.2f} {str(report == reference):>8}")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,70 @@
+"""
+Tracks cold start: for each module, the wall-clock time of a fresh `python -c "import <module>"`
+(less an empty interpreter start), its `-X importtime` total and the slowest modules it imports.
+
+Run with: python -m benchmarks.startup [runs]
+"""
+import subprocess
+import sys
+
+from config import PROJECT_DIR
+
+MODULES = ["main", "interactive", "legacy", "headless", "archive", "catalog", "cart", "pricing", "receipt", "journal"]
+TOP_IMPORTS = 3
+
+
+def run_python(code: str, *options: str) -> subprocess.CompletedProcess:
+    # Input from /dev/null so nothing can wait on a terminal
+    return subprocess.run(
+        [sys.executable, *options, "-c", code], cwd=PROJECT_DIR, stdin=subprocess.DEVNULL,
+        capture_output=True, text=True, check=True
+    )
+
+
+def wall_time(code: str, runs: int) -> float:
+    """Fastest wall-clock seconds of starting Python and running `code`, timed inside a parent interpreter"""
+    timer = (
+        "import subprocess, sys, time; start = time.perf_counter(); "
+        f"subprocess.run([sys.executable, '-c', {code!r}], stdin=subprocess.DEVNULL, check=True); "
+        "print(time.perf_counter() - start)"
+    )
+    return min(float(run_python(timer).stdout) for _ in range(runs))
+
+
+def import_times(module: str) -> tuple[int, list[tuple[int, str]]]:
+    """
+    Cumulative microseconds of `import module` and `(cumulative microseconds, name)` of the modules
+    it imported directly, slowest first. Interpreter start-up imports (`site`...) are left out.
+    """
+    result = run_python(f"import {module}", "-X", "importtime")
+    # Nested imports are listed before the module importing them, indented two spaces per level
+    children = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        name = name.strip()
+        if depth == 0:
+            if name == module:
+                return int(cumulative), sorted(children, reverse=True)
+            children = []
+        elif depth == 1:
+            children.append((int(cumulative), name))
+    raise ValueError(f"{module} was not imported")
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    baseline = wall_time("pass", runs)
+    print(f"Empty interpreter start: {baseline * 1e3:.1f} ms (fastest of {runs})")
+    print(f"{'Module':<12} {'wall':>9} {'importtime':>11}  slowest direct imports (ms)")
+    for module in MODULES:
+        wall = wall_time(f"import {module}", runs) - baseline
+        total, children = import_times(module)
+        slowest = ", ".join(f"{name} {cumulative / 1e3:.1f}" for cumulative, name in children[:TOP_IMPORTS])
+        print(f"{module:<12} {wall * 1e3:>6.1f} ms {total / 1e3:>8.1f} ms  {slowest}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Microbenchmark suite of the menu, cart and receipt hot paths every kiosk runs, on generated menus
+(`benchmarks/menu_gen.py`) and carts of each size in `SIZES`:
+- `get_item_by_id`, `get_items_by_category_code`, `split_item_code`: per lookup
+- `parse_item_ref_ids`: per combo parsed
+- `compare_orders`: per pair of cart orders
+- `cart_add_merge`: per order added to a cart holding an identical line
+- `display_table`: per render of the whole menu table
+- `print_receipt`: per receipt of the whole cart (about one line per menu item)
+
+Each benchmark is timed like `timeit`: the number of runs is calibrated to about `MIN_TIME` seconds,
+repeated `REPEATS` times, and the fastest repeat is kept (`per_op`, nanoseconds per operation).
+The suite runs with a fixed `PYTHONHASHSEED` (restarting itself if needed), so dict layouts and
+timings do not change from one run to the next with string hash randomization.
+Results are written as JSON lines to `bench_output.txt` in the project directory: a first line with
+the run's environment (`{"run": {...}}`), then one object per benchmark and size.
+
+With `--baseline FILE` (an earlier output), every result is compared to the baseline's and the run exits
+with status 1 if any got slower by more than `--threshold` (default `THRESHOLD`).
+
+Run with: python -m benchmarks.suite [--sizes 100,1000] [--only name,...] [--output FILE] [--baseline FILE] [--threshold 0.25]
+"""
+import contextlib
+import json
+import os
+import platform
+import random
+import sys
+import timeit
+from datetime import datetime
+
+import interactive
+from benchmarks.menu_gen import generate_menu
+from cart import Cart
+from catalog import MenuCatalog, split_item_code
+from config import PROJECT_DIR
+from menu_data import DISCOUNT_RATES, GST
+from menu_source import MenuState
+
+SIZES = [100, 1_000, 10_000, 100_000]
+OUTPUT_FILE = "bench_output.txt"
+REPEATS = 7
+MIN_TIME = 0.05
+# Relative slowdown against the baseline reported as a regression (runs on a busy machine vary by up to ~20%)
+THRESHOLD = 0.25
+HASH_SEED = "0"
+# Operations per timed run of the per-lookup benchmarks
+LOOKUPS = 1_000
+# Combos parsed per run, and combo lines in the generated carts
+COMBOS = 20
+
+
+class NullWriter:
+    """Standard output replacement that discards the text, so rendering is timed without the terminal"""
+
+    def write(self, text: str) -> int:
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def generate_cart(catalog: MenuCatalog, rng: random.Random) -> list[dict]:
+    """Cart orders of every a la carte item of the menu plus `COMBOS` combos with their first options"""
+    orders = []
+    for item in catalog.menu:
+        if "item_ref_ids" not in item:
+            orders.append({"id": item["id"], "code": item["code"], "name": item["name"], "price": item["price"], "quantity": rng.randint(1, 3)})
+    for combo in catalog.get_items_by_category_code("C")[:COMBOS]:
+        options = {section["section"]: [option["id"] for option in section["options"][:section["quantity"]]] for section in catalog.resolve_combo(combo["id"])}
+        orders.append({"id": combo["id"], "code": combo["code"], "name": combo["name"], "price": combo["price"], "quantity": 1, "options": options})
+    return orders
+
+
+def setup(size: int) -> dict:
+    """The benchmarks of one size: `{ name: (function running some operations, operations per call) }`"""
+    rng = random.Random(size)
+    catalog = MenuCatalog(generate_menu(size))
+    orders = generate_cart(catalog, rng)
+    cart = Cart(sys.maxsize)
+    for order in orders:
+        cart.add(dict(order))
+    # The UI's module state, as after the customer filled the cart
+    interactive.catalog = catalog
+    interactive.menu_state = MenuState(catalog, GST, DISCOUNT_RATES, b"")
+    interactive.cart = cart
+
+    ids = [rng.choice(catalog.menu)["id"] for _ in range(LOOKUPS)]
+    codes = [rng.choice(["B", "S", "D", "DS", "C"]) for _ in range(LOOKUPS)]
+    combos = [item["item_ref_ids"] for item in catalog.get_items_by_category_code("C")[:COMBOS]]
+    pairs = [(rng.choice(orders), rng.choice(orders)) for _ in range(LOOKUPS // 2)]
+    pairs += [(order, dict(order)) for order, _ in pairs]
+    merges = [rng.choice(orders) for _ in range(LOOKUPS)]
+    table = interactive.generate_item_table(catalog.menu)
+    headers = ["ID", "Name", "Price"]
+
+    def get_item_by_id():
+        for item_id in ids:
+            interactive.get_item_by_id(item_id)
+
+    def get_items_by_category_code():
+        for code in codes:
+            interactive.get_items_by_category_code(code)
+
+    def parse_item_ref_ids():
+        for item_ref_ids in combos:
+            interactive.parse_item_ref_ids(item_ref_ids)
+
+    def split_item_codes():
+        for item_id in ids:
+            split_item_code(item_id)
+
+    def compare_orders():
+        for first, second in pairs:
+            interactive.compare_orders(first, second)
+
+    def cart_add_merge():
+        for order in merges:
+            cart.add(order)
+
+    def display_table():
+        with contextlib.redirect_stdout(NullWriter()):
+            interactive.display_table(table, headers, selected_index=len(table) // 2)
+
+    def print_receipt():
+        with contextlib.redirect_stdout(NullWriter()):
+            interactive.print_receipt(DISCOUNT_RATES["student"], order_number=1)
+
+    return {
+        "get_item_by_id": (get_item_by_id, len(ids)),
+        "get_items_by_category_code": (get_items_by_category_code, len(codes)),
+        "parse_item_ref_ids": (parse_item_ref_ids, len(combos)),
+        "split_item_code": (split_item_codes, len(ids)),
+        "compare_orders": (compare_orders, len(pairs)),
+        "cart_add_merge": (cart_add_merge, len(merges)),
+        "display_table": (display_table, 1),
+        "print_receipt": (print_receipt, 1),
+    }
+
+
+def measure(function, operations: int) -> dict:
+    """Times a benchmark function, returning nanoseconds per operation (fastest and median repeat)"""
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    number = max(1, round(number * MIN_TIME / 0.2))
+    times = sorted(seconds / (number * operations) * 1e9 for seconds in timer.repeat(REPEATS, number))
+    return {"per_op": round(times[0], 2), "median": round(times[len(times) // 2], 2), "runs": number, "operations": operations}
+
+
+def run_suite(sizes: list[int], only: set[str] | None = None):
+    """Yields one result per benchmark and size"""
+    for size in sizes:
+        for name, (function, operations) in setup(size).items():
+            if only is None or name in only:
+                yield {"benchmark": name, "size": size, "unit": "ns/op", **measure(function, operations)}
+
+
+def read_results(path: str) -> dict:
+    """`{ (benchmark, size): result }` of an output file"""
+    results = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            result = json.loads(line)
+            if "benchmark" in result:
+                results[result["benchmark"], result["size"]] = result
+    return results
+
+
+def compare(results: list[dict], baseline: dict, threshold: float) -> list[dict]:
+    """Prints each result against the baseline, returns the results slower than `threshold`"""
+    regressions = []
+    print(f"\n{'Benchmark':<28} {'Size':>7} {'Baseline (ns)':>14} {'Now (ns)':>12} {'Change':>8}")
+    for result in results:
+        base = baseline.get((result["benchmark"], result["size"]))
+        if base is None:
+            print(f"{result['benchmark']:<28} {result['size']:>7} {'-':>14} {result['per_op']:>12,.1f} {'new':>8}")
+            continue
+        change = result["per_op"] / base["per_op"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  SLOWER"
+            regressions.append(result)
+        elif change < -threshold:
+            flag = "  faster"
+        print(f"{result['benchmark']:<28} {result['size']:>7} {base['per_op']:>14,.1f} {result['per_op']:>12,.1f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main(argv: list[str]):
+    if os.environ.get("PYTHONHASHSEED") != HASH_SEED:
+        os.execve(sys.executable, [sys.executable, "-m", "benchmarks.suite", *argv[1:]], {**os.environ, "PYTHONHASHSEED": HASH_SEED})
+    args = argv[1:]
+    options = {"--sizes": None, "--only": None, "--output": os.path.join(PROJECT_DIR, OUTPUT_FILE), "--baseline": None, "--threshold": THRESHOLD}
+    while args:
+        flag = args.pop(0)
+        if flag not in options or not args:
+            print(__doc__.strip().splitlines()[-1], file=sys.stderr)
+            return 2
+        options[flag] = args.pop(0)
+    sizes = [int(size) for size in options["--sizes"].split(",")] if options["--sizes"] else SIZES
+    only = set(options["--only"].split(",")) if options["--only"] else None
+    baseline = read_results(options["--baseline"]) if options["--baseline"] else None
+
+    run = {
+        "time": datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+        "implementation": platform.python_implementation(), "platform": platform.platform(), "cpus": os.cpu_count(), "hash_seed": HASH_SEED,
+    }
+    results = []
+    with open(options["--output"], "w", encoding="utf-8") as f:
+        f.write(json.dumps({"run": run}) + "\n")
+        print(f"{'Benchmark':<28} {'Size':>7} {'ns/op':>12} {'median':>12}")
+        for result in run_suite(sizes, only):
+            results.append(result)
+            f.write(json.dumps(result) + "\n")
+            f.flush()
+            print(f"{result['benchmark']:<28} {result['size']:>7} {result['per_op']:>12,.1f} {result['median']:>12,.1f}")
+    print(f"Results written to {options['--output']}")
+    if baseline is not None and compare(results, baseline, float(options["--threshold"])):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
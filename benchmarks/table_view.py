@@ -0,0 +1,57 @@
+"""
+Measures the cost of redrawing a menu table after a cursor move: the previous `display_table`
+(widths recomputed and every row formatted) against `screen.TableView` showing a 40-row window.
+
+Run with: python -m benchmarks.table_view
+"""
+import time
+
+from benchmarks.menu_gen import generate_menu
+from screen import TableView
+
+SIZES = [100, 1_000, 10_000]
+MOVES = 200
+WINDOW = 40
+
+
+def format_table(data: list[list[str]], headers: list[str] = [], selected_index: int = -1, tab_space: int = 4) -> str:
+    """The previous display_table of interactive.py, returning its output instead of printing it"""
+    col_widths = [max(len(str(cell)) for cell in col) for col in zip(*([headers] + data if headers else data))]
+    def fmt_row(row): return "|" + "|".join(f" {str(cell):<{w}} " for cell, w in zip(row, col_widths)) + "|"
+    def fmt_line(): return "+" + "+".join("-" * (w + 2) for w in col_widths) + "+"
+    padding = " " * tab_space if selected_index > -1 else ""
+    lines = []
+    if len(headers) > 0:
+        lines.append(f"{padding} {fmt_line()}")
+        lines.append(f"{padding} {fmt_row(headers)}")
+    lines.append(f"{padding} {fmt_line()}")
+    for i, row in enumerate(data):
+        if selected_index > -1 and i == selected_index: lines.append(f"{'> ':>{tab_space}} {fmt_row(row)} <")
+        else: lines.append(f"{padding} {fmt_row(row)}")
+    lines.append(f"{padding} {fmt_line()}")
+    return "\n".join(lines)
+
+
+def main():
+    headers = ["Item ID", "Item Name", "Price"]
+    print(f"{'Rows':>8} {'full table':>14} {'TableView':>14} {'speed-up':>9}")
+    for size in SIZES:
+        rows = [[item["id"], item["name"], f"${item['price']:.2f}"] for item in generate_menu(size)]
+        assert "\n".join(TableView(headers, rows).lines(3)) == format_table(rows, headers, 3)
+
+        start = time.perf_counter()
+        for move in range(MOVES):
+            format_table(rows, headers, move)
+        full_seconds = time.perf_counter() - start
+
+        table = TableView(headers, rows)
+        start = time.perf_counter()
+        for move in range(MOVES):
+            table.lines(move, WINDOW)
+        view_seconds = time.perf_counter() - start
+
+        print(f"{size:>8,} {full_seconds / MOVES * 1e6:>11.1f} us {view_seconds / MOVES * 1e6:>11.1f} us {full_seconds / view_seconds:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""User cart with a hash index for merging identical orders and running totals"""
+from catalog import parse_item_code
+from pricing import to_cents
+
+
+def order_signature(order: dict) -> tuple:
+    """
+    Returns the canonical signature of a cart order: `(item_id, options)`.
+    Combo `options` are frozen into sorted `(section, (item_ids...))` pairs,
+    so the same combo selection always gives the same signature no matter the selection order.
+    """
+    options = order.get("options")
+    if not options:
+        return order["id"], ()
+    return order["id"], tuple(sorted((section, tuple(sorted(ids))) for section, ids in options.items()))
+
+
+class Cart:
+    """
+    List of cart orders (`{ "id", "code", "name", "price", "quantity", "options"?, "total" }`)
+    with an index `{ signature: order }` so identical orders are found without scanning the cart.
+
+    Totals are kept up to date on every change instead of being re-summed on each redraw:
+    - `order["total"]`: line subtotal (`price * quantity`)
+    - `subtotal`, `item_count`: whole cart
+    - `category_totals`: `{ category_code: subtotal }`
+
+    They are counted in integer cents internally so adding and removing lines never drifts.
+    Change orders through the methods below instead of editing the dicts directly, so the index and totals stay valid.
+    """
+
+    def __init__(self, max_quantity: int):
+        self.max_quantity = max_quantity
+        self.orders = []
+        self._index = {}
+        self.item_count = 0
+        self._subtotal_cents = 0
+        self._category_cents = {}
+
+    @property
+    def subtotal_cents(self) -> int:
+        """Sum of every line total in integer cents"""
+        return self._subtotal_cents
+
+    @property
+    def subtotal(self) -> float:
+        """Sum of every line total in dollars"""
+        return self._subtotal_cents / 100
+
+    @property
+    def category_totals(self) -> dict[str, float]:
+        """Subtotal in dollars of each category code in the cart"""
+        return {code: cents / 100 for code, cents in self._category_cents.items() if cents}
+
+    def _count(self, order: dict, quantity: int, unit_cents: int):
+        """Adds `quantity` (negative to remove) of an order to the running totals"""
+        cents = unit_cents * quantity
+        self.item_count += quantity
+        self._subtotal_cents += cents
+        category = order["code"].category
+        self._category_cents[category] = self._category_cents.get(category, 0) + cents
+
+    def _set_line_quantity(self, order: dict, quantity: int):
+        """Sets an order's quantity and updates its line total and the cart totals by the difference"""
+        unit_cents = to_cents(order["price"])
+        self._count(order, quantity - order["quantity"], unit_cents)
+        order["quantity"] = quantity
+        order["total"] = unit_cents * quantity / 100
+
+    def __len__(self):
+        return len(self.orders)
+
+    def __getitem__(self, index):
+        return self.orders[index]
+
+    def __iter__(self):
+        return iter(self.orders)
+
+    def find(self, order: dict):
+        """Returns the cart order identical to `order` (same item and combo options), or `None`"""
+        return self._index.get(order_signature(order))
+
+    def add(self, order: dict) -> dict:
+        """
+        Adds an order, merging its quantity into an identical order if there is one.
+        Raises `ValueError` if the merged quantity would go over `max_quantity`.
+        Returns the order stored in the cart.
+        """
+        signature = order_signature(order)
+        existing = self._index.get(signature)
+        if existing is None:
+            if order["quantity"] > self.max_quantity:
+                raise ValueError(f"Maximum orders allowed for each item is {self.max_quantity}")
+            if "code" not in order:
+                order["code"] = parse_item_code(order["id"])
+            quantity = order["quantity"]
+            order["quantity"] = 0
+            self._set_line_quantity(order, quantity)
+            self.orders.append(order)
+            self._index[signature] = order
+            return order
+        total_quantity = existing["quantity"] + order["quantity"]
+        if total_quantity > self.max_quantity:
+            raise ValueError(f"Maximum orders allowed for each item is {self.max_quantity}")
+        self._set_line_quantity(existing, total_quantity)
+        return existing
+
+    def set_quantity(self, index: int, quantity: int):
+        """Changes the quantity of the order at `index`"""
+        if not 1 <= quantity <= self.max_quantity:
+            raise ValueError(f"Quantity must be between 1 and {self.max_quantity}")
+        self._set_line_quantity(self.orders[index], quantity)
+
+    def set_options(self, index: int, options: dict) -> int:
+        """
+        Replaces the combo options of the order at `index`.
+        If the new options match another order in the cart, both are merged into that order.
+        Raises `ValueError` if the merge would go over `max_quantity`.
+        Returns the index of the order holding the edited item.
+        """
+        order = self.orders[index]
+        old_signature = order_signature(order)
+        new_signature = order_signature({"id": order["id"], "options": options})
+        if new_signature == old_signature:
+            order["options"] = options
+            return index
+        existing = self._index.get(new_signature)
+        if existing is None:
+            del self._index[old_signature]
+            order["options"] = options
+            self._index[new_signature] = order
+            return index
+        total_quantity = existing["quantity"] + order["quantity"]
+        if total_quantity > self.max_quantity:
+            raise ValueError(f"Maximum orders allowed for each item is {self.max_quantity}")
+        self.pop(index)
+        self._set_line_quantity(existing, total_quantity)
+        return self.orders.index(existing)
+
+    def pop(self, index: int = -1) -> dict:
+        """Removes and returns the order at `index`"""
+        order = self.orders.pop(index)
+        del self._index[order_signature(order)]
+        self._count(order, -order["quantity"], to_cents(order["price"]))
+        return order
+
+    def to_lines(self) -> list[dict]:
+        """Returns plain copies of the orders for storage: `{ "id", "name", "quantity", "price", "total", "options"? }` with amounts in cents"""
+        lines = []
+        for order in self.orders:
+            unit_cents = to_cents(order["price"])
+            line = {
+                "id": order["id"],
+                "name": order["name"],
+                "quantity": order["quantity"],
+                "price": unit_cents,
+                "total": unit_cents * order["quantity"]
+            }
+            if "options" in order:
+                line["options"] = order["options"]
+            lines.append(line)
+        return lines
+
+    def clear(self):
+        """Removes every order"""
+        self.orders = []
+        self._index = {}
+        self.item_count = 0
+        self._subtotal_cents = 0
+        self._category_cents = {}
@@ -0,0 +1,260 @@
+"""Indexed menu catalog shared by the legacy and interactive UIs"""
+import sys
+from typing import NamedTuple
+
+from search import MenuSearchIndex
+
+
+class ItemCode(NamedTuple):
+    """
+    Parsed item code, e.g. `ItemCode("DS", "01", "DS01")`.
+    Use `parse_item_code` to get one: each distinct code is parsed once and the same instance is reused.
+    """
+    category: str
+    number: str
+    code: str
+
+    @property
+    def is_category(self):
+        """`True` for a bare category code such as `"B"` (combo wildcards)"""
+        return self.number == ""
+
+
+# Every ItemCode parsed so far, { item_code: ItemCode }
+_item_codes: dict[str, ItemCode] = {}
+
+
+def parse_item_code(item_code: str) -> ItemCode:
+    """Returns the interned `ItemCode` for an item code string, parsing it on first use only"""
+    parsed = _item_codes.get(item_code)
+    if parsed is None:
+        cat_code = ''
+        item_num = ''
+        for char in item_code:
+            if char.isalpha(): cat_code += char
+            else: item_num += char
+        parsed = ItemCode(sys.intern(cat_code), sys.intern(item_num), sys.intern(item_code))
+        _item_codes[item_code] = parsed
+    return parsed
+
+
+def split_item_code(item_code):
+    """Splits an item code into its category code and category item number."""
+    parsed = parse_item_code(item_code)
+    return parsed.category, parsed.number
+
+
+class MenuCatalog:
+    """
+    Wraps the `MENU` list with hash indexes built once at load:
+    - `items_by_id`: `{ item_id: item }`
+    - `items_by_category`: `{ category_code: [items...] }` (menu order is kept)
+
+    Each menu item also gets its parsed `"code"` (`ItemCode`) so callers never re-parse `"id"`.
+
+    Lookups are dictionary hits instead of full menu scans.
+    `version` goes up every time the menu is replaced, which invalidates the resolved combo cache
+    and the type-ahead `search_index`.
+    """
+
+    def __init__(self, menu: list[dict]):
+        self.version = 0
+        self._combo_cache = {}
+        self._search_index = None
+        self._build_indexes(menu)
+
+    @classmethod
+    def from_indexes(
+            cls,
+            menu: list[dict],
+            items_by_category: dict[str, list[dict]],
+            combos: dict[str, list],
+            version: int = 0,
+            items_by_id: dict[str, dict] | None = None
+        ) -> "MenuCatalog":
+        """
+        Builds a catalog from indexes computed beforehand (see menu_snapshot.py), without checking or parsing the menu again.
+        Items must already have their `"code"`; `combos` holds the resolved sections of each combo ID (see `resolve_combo`).
+        """
+        catalog = cls.__new__(cls)
+        catalog.version = version
+        catalog._combo_cache = {(combo_id, version): sections for combo_id, sections in combos.items()}
+        catalog._search_index = None
+        catalog.menu = menu
+        catalog.items_by_id = items_by_id if items_by_id is not None else {item["id"]: item for item in menu}
+        catalog.items_by_category = items_by_category
+        return catalog
+
+    def _build_indexes(self, menu: list[dict]):
+        items_by_id = {}
+        items_by_category = {}
+        for item in menu:
+            if item["id"] in items_by_id:
+                raise ValueError(f"Duplicate item ID '{item["id"]}' in menu")
+            item["code"] = parse_item_code(item["id"])
+            items_by_id[item["id"]] = item
+            items_by_category.setdefault(item["code"].category, []).append(item)
+        self.menu = menu
+        self.items_by_id = items_by_id
+        self.items_by_category = items_by_category
+
+    def updated(self, menu: list[dict]) -> tuple["MenuCatalog", set[str]]:
+        """
+        Returns a new catalog for an edited menu, and the category codes whose items changed.
+        Categories whose items are all unchanged keep their item dicts and index lists, and combos whose
+        item and referenced categories are unchanged keep their resolved sections.
+        This catalog is left untouched, so screens still holding it keep seeing a consistent menu.
+        """
+        new_by_category = {}
+        for item in menu:
+            item["code"] = parse_item_code(item["id"])
+            new_by_category.setdefault(item["code"].category, []).append(item)
+        changed = set(self.items_by_category).difference(new_by_category)
+        for code, items in new_by_category.items():
+            old_items = self.items_by_category.get(code)
+            if old_items == items:
+                new_by_category[code] = old_items
+            else:
+                changed.add(code)
+        # Menu order, with the reused item dicts of unchanged categories
+        category_items = {code: iter(items) for code, items in new_by_category.items()}
+        menu = [next(category_items[item["code"].category]) for item in menu]
+        items_by_id = {item["id"]: item for item in menu}
+        if len(items_by_id) != len(menu):
+            seen = set()
+            for item in menu:
+                if item["id"] in seen:
+                    raise ValueError(f"Duplicate item ID '{item["id"]}' in menu")
+                seen.add(item["id"])
+
+        combos = {}
+        # A copy: the UI thread may resolve combos while a reload runs
+        for (combo_id, version), sections in list(self._combo_cache.items()):
+            item = items_by_id.get(combo_id)
+            if version != self.version or item is None or item is not self.items_by_id.get(combo_id):
+                continue
+            referenced = {parse_item_code(ref).category for options, _ in item["item_ref_ids"].values() for ref in options}
+            if referenced.isdisjoint(changed):
+                combos[combo_id] = sections
+        catalog = MenuCatalog.from_indexes(menu, new_by_category, combos, self.version + 1, items_by_id)
+        return catalog, changed
+
+    def set_menu(self, menu: list[dict]):
+        """Replaces the menu, rebuilds the indexes and drops every resolved combo"""
+        self._build_indexes(menu)
+        self.version += 1
+        self._combo_cache = {}
+        self._search_index = None
+
+    def __len__(self):
+        return len(self.menu)
+
+    @property
+    def search_index(self) -> MenuSearchIndex:
+        """Type-ahead search index over item IDs and names, built on first use for each menu"""
+        if self._search_index is None:
+            self._search_index = MenuSearchIndex(self.menu)
+        return self._search_index
+
+    def search(self, query: str, limit: int = 10) -> list[dict]:
+        """Returns up to `limit` items whose ID or name matches a partial, possibly misspelt query"""
+        return self.search_index.search(query, limit)
+
+    def __contains__(self, item_id):
+        return item_id in self.items_by_id
+
+    def get_items_by_category_code(self, code: str):
+        """Gets the items of a category code (shared list, do not modify)"""
+        return self.items_by_category.get(code, [])
+
+    def get_item_by_id(self, item_id: str):
+        """Gets an item by its item ID"""
+        item = self.items_by_id.get(item_id)
+        if item is None:
+            raise Exception("Item not found")
+        return item
+
+    def get_items_by_ids(self, item_ids: list[str]):
+        """
+        Gets items by their ids specified
+        if category_code only: Retrieves all items containing the specified category code
+        """
+        result = []
+        for item_id in item_ids:
+            item_code = parse_item_code(item_id)
+            if item_code.is_category:
+                result.extend(self.get_items_by_category_code(item_code.category))
+            else:
+                result.append(self.get_item_by_id(item_id))
+        return result
+
+    def parse_item_ref_ids(self, item_ref_ids: dict) -> list:
+        """
+        Parses the item_ref_ids dictionary from a combo meal.
+        Returns a list of dictionaries with section as key and a dict as value:
+        ```python
+        {
+            'section': str,
+            'options': [...],
+            'quantity': int,
+            'locked': bool
+            ...
+        }
+        ```
+        - `'options'`: `list` of item IDs or category codes available for selection
+        - `'quantity'`: how many can be selected from options
+        - `'locked'`: `True` if `quantity == len(options)` (user cannot change selection)
+        """
+        parsed = []
+        for section, (options, quantity) in item_ref_ids.items():
+            if quantity > len(options):
+                raise ValueError(f"Quantity for section '{section}' cannot be greater than number of options.")
+
+            parsed_options = self.get_items_by_ids(options)
+            parsed.append({
+                'section': section,
+                'options': parsed_options,
+                'quantity': quantity,
+                'locked': quantity == len(parsed_options)
+            })
+        return parsed
+
+    def resolve_combo(self, combo_id: str) -> list:
+        """
+        Returns the parsed sections of a combo (see `parse_item_ref_ids`).
+        Sections are resolved once per combo ID and menu version, then shared (do not modify).
+        """
+        key = (combo_id, self.version)
+        sections = self._combo_cache.get(key)
+        if sections is None:
+            sections = self.parse_item_ref_ids(self.get_item_by_id(combo_id)["item_ref_ids"])
+            for section in sections:
+                # Option ID lookup used to validate selections without scanning the options
+                section["option_ids"] = frozenset(option["id"] for option in section["options"])
+            self._combo_cache[key] = sections
+        return sections
+
+    def validate_combo_options(self, combo_id: str, options: dict) -> list[str]:
+        """
+        Checks a combo selection (`{ section: [item_ids...] }`) against the combo's `item_ref_ids`.
+        Returns a list of error messages, empty if the selection is valid.
+        """
+        errors = []
+        sections = self.resolve_combo(combo_id)
+        for section in sections:
+            chosen = options.get(section["section"])
+            if chosen is None:
+                errors.append(f"Section '{section["section"]}' has no selection")
+            elif not isinstance(chosen, list) or not all(isinstance(item_id, str) for item_id in chosen):
+                errors.append(f"Section '{section["section"]}' must be a list of item IDs")
+            elif len(chosen) != section["quantity"]:
+                errors.append(f"Section '{section["section"]}' needs exactly {section["quantity"]} item(s)")
+            else:
+                for item_id in chosen:
+                    if item_id not in section["option_ids"]:
+                        errors.append(f"Item '{item_id}' is not an option of section '{section["section"]}'")
+        section_names = {section["section"] for section in sections}
+        for name in options:
+            if name not in section_names:
+                errors.append(f"Unknown section '{name}'")
+        return errors
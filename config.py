@@ -0,0 +1,27 @@
+"""
+Loads config.json and resolves the data directory it declares.
+`FASTFOOD_CONFIG` in the environment names another config file to use instead (e.g. for test kiosks).
+"""
+import json
+import os
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_PATH = os.environ.get("FASTFOOD_CONFIG") or os.path.join(PROJECT_DIR, "config.json")
+
+
+def load_config(path: str = CONFIG_PATH) -> dict:
+    """Reads the JSON config file"""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def get_data_dir(config: dict | None = None) -> str:
+    """
+    Returns the absolute `database.dir` directory (relative paths are from the project directory),
+    creating it if needed.
+    """
+    if config is None:
+        config = load_config()
+    data_dir = os.path.join(PROJECT_DIR, config.get("database", {}).get("dir", "data"))
+    os.makedirs(data_dir, exist_ok=True)
+    return data_dir
@@ -0,0 +1,159 @@
+"""
+Headless order pricing: reads orders from a JSONL stream and writes priced results as JSONL,
+using the same menu file, combo rules, discounts and GST as the terminal UIs (see menu_source.py).
+
+Input, one order per line:
+```json
+{"order_id": "A1", "discount": "student", "items": [
+    {"id": "C01", "quantity": 2, "options": {"Burger": ["B01"], "Fries": ["S01"], "Drink": ["D02"]}},
+    {"id": "B02", "quantity": 1}
+]}
+```
+- `discount`: a key of the menu file's `discount_rates`, or `null` / missing for no discount
+- `options`: required for combos only, checked against the combo's `item_ref_ids`
+
+Output, one result per input line (amounts in integer cents):
+```json
+{"order_id": "A1", "status": "ok", "discount_type": "student", "lines": [{"id": "C01", "name": "...", "quantity": 2, "price": 880, "total": 1760, "options": {...}}],
+ "subtotal": 2260, "discount": 226, "gst": 183, "total": 2217}
+{"order_id": "A2", "status": "error", "line": 2, "errors": ["..."]}
+```
+
+Orders are handled one line at a time, so memory stays flat however long the stream is.
+A line that cannot be read as an order (invalid JSON or UTF-8, nested too deeply) gets an error result;
+the stream goes on.
+
+Run with: python headless.py [input.jsonl|-] [output.jsonl|-]
+"""
+import json
+import sys
+
+from cart import Cart
+from catalog import MenuCatalog
+from menu_data import ALLOWED_ORDERS_PER_ITEM, DISCOUNT_RATES, GST
+from menu_source import MenuSource
+from pricing import price_cart
+
+
+class OrderError(ValueError):
+    """Raised when an order from the feed cannot be priced"""
+
+
+def build_order(catalog: MenuCatalog, item: dict) -> dict:
+    """Validates one order item (`{"id", "quantity"?, "options"?}`) and returns the cart order for it"""
+    item_id = item["id"]
+    if not isinstance(item_id, str):
+        raise OrderError("'id' must be a string")
+    menu_item = catalog.items_by_id.get(item_id)
+    if menu_item is None:
+        raise OrderError(f"unknown item ID '{item_id}'")
+    quantity = item.get("quantity", 1)
+    if type(quantity) is not int or not 1 <= quantity <= ALLOWED_ORDERS_PER_ITEM:
+        raise OrderError(f"quantity must be an integer from 1 to {ALLOWED_ORDERS_PER_ITEM}")
+    order = {"id": item_id, "code": menu_item["code"], "name": menu_item["name"], "price": menu_item["price"], "quantity": quantity}
+    if menu_item["code"].category == "C":
+        options = item.get("options")
+        if not isinstance(options, dict):
+            raise OrderError(f"combo {item_id} needs 'options'")
+        errors = catalog.validate_combo_options(item_id, options)
+        if errors:
+            raise OrderError("; ".join(errors))
+        order["options"] = options
+    elif item.get("options"):
+        raise OrderError("only combos can have options")
+    return order
+
+
+def build_cart(catalog: MenuCatalog, items: list) -> Cart:
+    """Validates the items of an order and adds them to a new cart, merging identical lines"""
+    if not isinstance(items, list) or not items:
+        raise OrderError("Order has no items")
+    cart = Cart(ALLOWED_ORDERS_PER_ITEM)
+    for i, item in enumerate(items, 1):
+        if not isinstance(item, dict) or "id" not in item:
+            raise OrderError(f"Item {i} has no 'id'")
+        try:
+            cart.add(build_order(catalog, item))
+        except ValueError as e:
+            raise OrderError(f"Item {i}: {e}")
+    return cart
+
+
+def price_order(catalog: MenuCatalog, order: dict, gst: float = GST, discount_rates: dict = DISCOUNT_RATES) -> dict:
+    """Prices one decoded order from the feed, returning its result record"""
+    discount_type = order.get("discount")
+    if discount_type is not None and not isinstance(discount_type, str):
+        raise OrderError("'discount' must be a string or null")
+    if discount_type is None:
+        discount_rate = 0.0
+    elif discount_type in discount_rates:
+        discount_rate = discount_rates[discount_type]
+    else:
+        raise OrderError(f"Unknown discount '{discount_type}'")
+    cart = build_cart(catalog, order.get("items"))
+    priced = price_cart(cart.subtotal_cents, discount_rate, gst)
+    return {
+        "order_id": order.get("order_id"),
+        "status": "ok",
+        "discount_type": discount_type,
+        "lines": cart.to_lines(),
+        "subtotal": priced.subtotal,
+        "discount": priced.discount,
+        "gst": priced.gst,
+        "total": priced.total
+    }
+
+
+def process_stream(catalog: MenuCatalog, input_stream, output_stream, gst: float = GST, discount_rates: dict = DISCOUNT_RATES) -> tuple[int, int]:
+    """
+    Prices every order line of `input_stream` (text, or bytes decoded here as UTF-8 line by line)
+    and writes one result line to `output_stream`. Blank lines are skipped. Returns `(ok_count, error_count)`.
+    """
+    ok_count = error_count = 0
+    encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    decode = json.JSONDecoder().decode
+    write = output_stream.write
+    for line_number, line in enumerate(input_stream, 1):
+        if not line.strip():
+            continue
+        order_id = None
+        try:
+            order = decode(line.decode("utf-8") if isinstance(line, bytes) else line)
+            if not isinstance(order, dict):
+                raise OrderError("Order must be a JSON object")
+            order_id = order.get("order_id")
+            result = price_order(catalog, order, gst, discount_rates)
+            ok_count += 1
+        except ValueError as e:
+            # OrderError, or a line that is not JSON (JSONDecodeError) or not UTF-8 (UnicodeDecodeError)
+            result = {"order_id": order_id, "status": "error", "line": line_number, "errors": [str(e)]}
+            error_count += 1
+        except RecursionError:
+            result = {"order_id": order_id, "status": "error", "line": line_number, "errors": ["Order is nested too deeply"]}
+            error_count += 1
+        write(encode(result) + "\n")
+    return ok_count, error_count
+
+
+def main(argv: list[str]):
+    input_path = argv[1] if len(argv) > 1 else "-"
+    output_path = argv[2] if len(argv) > 2 else "-"
+    try:
+        menu = MenuSource().current
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    # Read as bytes, so a line that is not UTF-8 is rejected on its own instead of ending the stream
+    input_stream = sys.stdin.buffer if input_path == "-" else open(input_path, "rb")
+    output_stream = sys.stdout if output_path == "-" else open(output_path, "w", encoding="utf-8", buffering=1 << 16)
+    try:
+        ok_count, error_count = process_stream(menu.catalog, input_stream, output_stream, menu.gst, menu.discount_rates)
+    finally:
+        if input_stream is not sys.stdin.buffer: input_stream.close()
+        if output_stream is not sys.stdout: output_stream.close()
+    print(f"Priced {ok_count} order(s), {error_count} error(s)", file=sys.stderr)
+    return 0 if error_count == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
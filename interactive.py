@@ -1,74 +1,16 @@
-# Government Details
-GST = 0.09
-# Restaurant Details
-RESTAURANT_NAME = "Obama Fried Chicken"
-ADDRESS = "#01-234 Serangoon Central, 23, Singapore 556083"
-PHONE_NUMBER = "+65 9012 3456"
-WEBSITE = "https://obama-fried-chicken.com.sg"
-ALLOWED_ORDERS_PER_ITEM = 100
-
-# Print Receipt Details
-WIDTH_RECEIPT_TABLE_COLUMN_ID = 5
-WIDTH_RECEIPT_TABLE_COLUMN_NAME = 17    # name field display width
-WIDTH_RECEIPT_TABLE_COLUMN_TYPE = 12
-WIDTH_RECEIPT_TABLE_COLUMN_PRICE = 9
-WIDTH_RECEIPT_TABLE_COLUMN_QUANTITY = 4
-WIDTH_RECEIPT_TABLE_COLUMN_DESCRIPTION = 20
-
 import sys
 import time
 
-if not sys.stdin.isatty():
-    print("=== NOT SUPPORTED")
-    print("This program cannot be run on pseudo-based terminals.")
-    print("Please run the legacy.py python program instead.")
-    exit(1)
-
 # Datasets and dataset functions
 from datetime import datetime
-
-# { id: (noun_name, plural_name, icon) }
-MENU_ITEM_IDS = {
-    "B": ("Burger", "Burgers", "🍔"),
-    "S": ("Side", "Sides", "🍟"),
-    "D": ("Drink", "Drinks", "🥤"),
-    "DS": ("Dessert", "Desserts", "🍦"),
-    "C": ("Combo", "Combos", "🥡")
-}
-
-MENU = [
-    # Burgers
-    {"id": "B01", "name": "Classic Beef Burger", "price": 5.50},
-    {"id": "B02", "name": "Chicken Burger", "price": 5.00},
-    {"id": "B03", "name": "Veggie Burger", "price": 4.80},
-    {"id": "B04", "name": "Spicy Chicken Burger", "price": 5.30},
-    # Sides
-    {"id": "S01", "name": "French Fries", "price": 2.50},
-    {"id": "S02", "name": "Onion Rings", "price": 2.80},
-    {"id": "S03", "name": "Chicken Nuggets (6pc)", "price": 3.50},
-    {"id": "S04", "name": "Cheese Sticks (4pc)", "price": 3.20},
-    # Drinks
-    {"id": "D01", "name": "Coke", "price": 1.80},
-    {"id": "D02", "name": "Sprite", "price": 1.80},
-    {"id": "D03", "name": "Ice lemon Tea", "price": 2.20},
-    {"id": "D04", "name": "Mineral water", "price": 1.50},
-    # Desserts
-    {"id": "DS01", "name": "Chocolate sundae", "price": 2.80},
-    {"id": "DS02", "name": "Vanilla cone", "price": 1.50},
-    {"id": "DS03", "name": "Apple pie", "price": 2.30},
-    {"id": "DS04", "name": "Strawberry sundae", "price": 2.80},
-    # Combos (for item reference ids, just only the alphabet id = any)
-    {"id": "C01", "name": "Burger + Fries + Drink", "item_ref_ids": { "Burger": (["B"], 1), "Fries": (["S01"], 1), "Drink": (["D"], 1) }, "price": 8.80},
-    {"id": "C02", "name": "Nuggets + Fries + Drink", "item_ref_ids": { "Nuggets": (["S03"], 1), "Fries": (["S01"], 1), "Drink": (["D"], 1)}, "price": 8.50},
-    {"id": "C03", "name": "Veggie Combo", "item_ref_ids": { "Main": (["B03"], 1), "Dessert": (["S04"], 1), "Drink": (["D04"], 1)}, "price": 8.20},
-    {"id": "C04", "name": "Kids Meal", "item_ref_ids": { "Main": (["S03", "S04"], 1), "Fries": (["S01"], 1), "Dessert": (["DS"], 1), "Drink": (["D01", "D02", "D04"], 1)}, "price": 6.50}
-]
-
-DISCOUNT_RATES = {
-    "student": 0.10,
-    "staff": 0.08,
-    "loyalty_member": 0.05
-}
+import metrics
+from cart import Cart, order_signature
+from catalog import MenuCatalog, parse_item_code
+from config import load_config
+from menu_data import ALLOWED_ORDERS_PER_ITEM, MENU_ITEM_IDS
+from pricing import price_cart
+from receipt import RESTAURANT_NAME, print_order_receipt
+from screen import FrameRenderer, TableView, available_rows
 
 def generate_item_table(items: list[dict]):
     """Returns a 2D list of items as a table"""
@@ -77,30 +19,42 @@ def generate_item_table(items: list[dict]):
         for item in items
     ]
 
+# The menu file, watched for changes while the UI runs (see menu_source.py)
+menu_source = None
+# Menu in use (with its GST and discount rates) and its indexes by item ID and category code,
+# taken from `menu_source` by `refresh_menu()` between screens
+menu_state = None
+catalog: MenuCatalog | None = None
+# Last reload error of `menu_source` shown to the cashier
+menu_error = None
+
+def refresh_menu():
+    """
+    Switches to the latest menu loaded from the menu file (called between screens, never during one),
+    and tells the cashier once when a changed menu file was refused
+    """
+    global menu_state, catalog, menu_error
+    menu_state = menu_source.current
+    catalog = menu_state.catalog
+    if menu_source.error != menu_error:
+        menu_error = menu_source.error
+        if menu_error:
+            display_modal("Menu not updated", f"{menu_error}\nThe previous menu stays in use.", "warning")
+
 def get_items_by_category_code(code: str):
     """Gets an item by category code"""
-    return [item for item in MENU if split_item_code(item["id"])[0] == code]
+    return catalog.get_items_by_category_code(code)
 
 def get_item_by_id(item_id: str):
     """Gets an item by its item ID"""
-    found = [item for item in MENU if item["id"] == item_id]
-    if len(found) == 0:
-        raise Exception("Item not found")
-    return found[0]
+    return catalog.get_item_by_id(item_id)
 
 def get_items_by_ids(item_ids: list[str]):
     """
     Gets items by their ids specified
     if category_code only: Retrieves all items containing the specified category code
     """
-    result = []
-    for item_id in item_ids:
-        [cat_code, item_num] = split_item_code(item_id)
-        if item_num == "":
-            result.extend(get_items_by_category_code(cat_code))
-        else:
-            result.append(get_item_by_id(item_id))
-    return result
+    return catalog.get_items_by_ids(item_ids)
 
 def parse_item_ref_ids(item_ref_ids: dict) -> list:
     """
@@ -119,48 +73,20 @@ def parse_item_ref_ids(item_ref_ids: dict) -> list:
     - `'quantity'`: how many can be selected from options
     - `'locked'`: `True` if `quantity == len(options)` (user cannot change selection)
     """
-    parsed = []
-    for section, (options, quantity) in item_ref_ids.items():
-        if quantity > len(options):
-            raise ValueError(f"Quantity for section '{section}' cannot be greater than number of options.")
-
-        parsed_options = get_items_by_ids(options)
-        parsed.append({
-            'section': section,
-            'options': parsed_options,
-            'quantity': quantity,
-            'locked': quantity == len(parsed_options)
-        })
-    return parsed
+    return catalog.parse_item_ref_ids(item_ref_ids)
 
 # Utility functions
-def condense(text, max_len):
-    """Truncates text for better display on screen to prevent misalignment"""
-    return text if len(text) <= max_len else text[:max_len-3] + "..."
-
 def clear_console():
     """Clears the console screen"""
     # 033 = Code for terminal controls
     # C = Clears the console buffer output
     print("\033c", end="")
-
-def split_item_code(item_code):
-    """Splits an item code into its category code and category item number."""
-    cat_code = ''
-    item_num = ''
-    for char in item_code:
-        if char.isalpha(): cat_code += char
-        else: item_num += char
-    return cat_code, item_num
+    # The next frame cannot be drawn as a difference from what was on screen
+    screen.invalidate()
 
 def compare_orders(item1, item2):
-    cat_code1 = split_item_code(item1["id"])
-    if item1["id"] != item2["id"]: return False
-    elif cat_code1 == "C":
-        for key in item1["item_ref_ids"].keys():
-            if set(item1["item_ref_ids"][key]) != set(item2["item_ref_ids"][key]):
-                return False
-    return True
+    """Checks if two orders are the same item with the same combo options"""
+    return order_signature(item1) == order_signature(item2)
 
 def colourize_text(text: str, color="white"):
     """Colourizes text for console terminals"""
@@ -225,22 +151,21 @@ def display_topbar(options=None, selected_option: int = 0, top_line: str = ""):
 
 def display_table(data: list[list[str]], headers: list[str] = [], selected_index: int = -1, tab_space: int = 4):
     """Prints a formatted table (compatible with interactive menu selection)"""
-    # Calculate max width for each column
-    col_widths = [max(len(str(cell)) for cell in col) for col in zip(*([headers] + data if headers else data))]
-    # Helper function to format a row
-    def fmt_row(row): return "|" + "|".join(f" {str(cell):<{w}} " for cell, w in zip(row, col_widths)) + "|"
-    # Helper function to format a line
-    def fmt_line(): return "+" + "+".join("-" * (w + 2) for w in col_widths) + "+"
-    padding = " " * tab_space if selected_index > -1 else ""
-    if len(headers) > 0:
-        print(padding, fmt_line())
-        print(padding, fmt_row(headers))
-    print(padding, fmt_line())
-    for i, row in enumerate(data):
-        # Highlight selected row if needed
-        if selected_index > -1 and i == selected_index: print(f"{'> ':>{tab_space}}", fmt_row(row), "<")
-        else: print(padding, fmt_row(row))
-    print(padding, fmt_line())
+    print("\n".join(TableView(headers, data, tab_space).lines(selected_index)))
+
+def display_table_view(table: TableView, selected_index: int = -1, reserved_rows: int = 0):
+    """
+    Prints the rows of a table that fit on screen around the selected one
+    - `reserved_rows`: rows of the screen taken by everything else printed with the table
+    """
+    print("\n".join(table.lines(selected_index, available_rows(reserved_rows))))
+
+def page_index(index: int, key: str, repeat: int, table: TableView):
+    """Moves a selection index for Up/Down/PgUp/PgDn keys, staying inside the table"""
+    step = table.page_size if key in ("pageup", "pagedown") else 1
+    if key in ("up", "pageup"): index -= step * repeat
+    else: index += step * repeat
+    return min(max(index, 0), max(len(table) - 1, 0))
 
 
 def handle_input():
@@ -251,122 +176,83 @@ def handle_input():
             ch = msvcrt.getch()
             if ch == b'\xe0':
                 ch2 = msvcrt.getch()
-                return {'H': 'up', 'P': 'down', 'K': 'left', 'M': 'right'}.get(ch2.decode(), None)
+                return {'H': 'up', 'P': 'down', 'K': 'left', 'M': 'right', 'I': 'pageup', 'Q': 'pagedown'}.get(ch2.decode(), None)
             if ch == b'\r': return 'enter'
             if ch == b' ': return 'spacebar'
             if ch in (b'\x08', b'\x7f'): return 'backspace'  # Backspace (Windows)
             if ch == b'-': return 'minus'
             if ch == b'+': return 'plus'
+            if ch == b'/': return 'slash'
+            if ch == b'\x1b': return 'escape'
             ch = ch.decode()
             if ch.isalnum() or ch == " ": return ch
     else:
-        tty = __import__("tty")
-        termios = __import__("termios")
-        fd = sys.stdin.fileno()
-        old = termios.tcgetattr(fd)
-        try:
-            tty.setraw(fd)
-            while True:
-                ch = sys.stdin.read(1)
-                if ch == '\x1b' and sys.stdin.read(1) == '[':
-                    return {'A': 'up', 'B': 'down', 'C': 'right', 'D': 'left'}.get(sys.stdin.read(1), None)
-                if ch in ('\r', '\n'): return 'enter'
-                if ch == " ": return 'spacebar'
-                if ch in ('\x08', '\x7f'): return 'backspace'  # Backspace (Unix)
-                if ch == '-': return 'minus'
-                if ch == '+': return 'plus'
-                if ch.isalnum(): return ch
-        finally:
-            termios.tcsetattr(fd, termios.TCSADRAIN, old)
-
-cart = []
+        return get_input_session().read_key()
+
+def handle_input_repeat():
+    """
+    Like `handle_input`, returning `(key, count)`: held Up/Down/PgUp/PgDn keys already waiting are taken together,
+    so scrolling applies them in one step and redraws once.
+    """
+    if sys.platform.startswith('win'):
+        return handle_input(), 1
+    return get_input_session().read_repeat()
+
+input_session = None
+
+def get_input_session():
+    """
+    Starts the raw-mode keyboard session on first use; it lasts until the program exits.
+    With `kiosk.record_keys` set in config.json, the session's keystrokes are recorded to the data directory.
+    """
+    global input_session
+    if input_session is None:
+        from keyboard import InputSession
+        record_path = None
+        config = load_config()
+        if config.get("kiosk", {}).get("record_keys"):
+            import os
+            from config import get_data_dir
+            record_path = os.path.join(get_data_dir(config), f"keys-{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}.jsonl")
+        input_session = InputSession(sys.stdin.fileno(), record_path)
+    return input_session
+
+cart = Cart(ALLOWED_ORDERS_PER_ITEM)
+# Screens of the menu, cart and combo editors are drawn as differences between frames
+screen = FrameRenderer()
 
 # Handling functions
-def print_receipt(discount: float = 0.0):
+def save_order(discount_type: str | None, discount_rate: float) -> int:
+    """Saves the checked-out cart and returns its order number: on the order server for a thin client, otherwise to the journal"""
+    if not isinstance(cart, Cart):
+        return cart.checkout(discount_type)["order_number"]
+    # Loaded on first checkout, it is not needed to start the UI
+    from journal import open_journal
+    with open_journal() as journal:
+        return journal.append_order(cart, discount_type, discount_rate, menu_state.gst)["order_number"]
+
+def print_receipt(discount: float = 0.0, order_number: int | None = None):
     """Prints a receipt containing the items ordered as well as calculation"""
-    # Name too long, convert to smaller variables for cleaner code
-    col_id = WIDTH_RECEIPT_TABLE_COLUMN_ID
-    col_name = WIDTH_RECEIPT_TABLE_COLUMN_NAME
-    col_type = WIDTH_RECEIPT_TABLE_COLUMN_TYPE
-    col_price = WIDTH_RECEIPT_TABLE_COLUMN_PRICE
-    col_qty = WIDTH_RECEIPT_TABLE_COLUMN_QUANTITY
-    col_desc = WIDTH_RECEIPT_TABLE_COLUMN_DESCRIPTION
-
-    # Set headers accordingly
-    header_fields = f"{'No.':<3} {'ID':<{col_id}} {'Name':<{col_name}} {'Description':<{col_desc}} {'Type':>{col_type}} {'Price':>{col_price}} {'Qty':>{col_qty}}"
-    receipt_width = len(header_fields)
-
-    # Calculations
-    subtotal = sum(item["price"] * item["quantity"] for item in cart)
-    discount_amt = round(subtotal * discount, 2)
-    discounted_subtotal = subtotal - discount_amt
-    gst = round(discounted_subtotal * GST, 2)
-    total = round(discounted_subtotal + gst, 2)
-    now = datetime.now().strftime("%d %b %Y   %H:%M")
-
-    # Print Header
-    print(f"\n{RESTAURANT_NAME:^{receipt_width}}")
-    print(f"{ADDRESS:^{receipt_width}}")
-    print(f"{'Tel: ' + PHONE_NUMBER:^{receipt_width}}")
-    print(f"{WEBSITE:^{receipt_width}}")
-    print("-" * receipt_width)
-    print(f"Date: {now}")
-    print("-" * receipt_width)
-
-    # Table Body
-    print(header_fields)
-    print("-" * receipt_width)
-    for i, item in enumerate(cart, 1):
-        type_str = "Combo" if "options" in item else "À la carte"
-        # Truncate name and description
-        disp_name = condense(item.get('name', ''), col_name)
-        disp_desc = condense(item.get('description', ''), col_desc)
-        print(f"{i:<3} {item['id']:<{col_id}} {disp_name:<{col_name}} {disp_desc:<{col_desc}} {type_str:>{col_type}} "
-              f"{item['price']:>{col_price}.2f} {item['quantity']:>{col_qty}}")
-
-        # Options (for combos)
-        if "options" in item:
-            spaces = " " * (col_id + col_name + 6)
-            for option_name, ids in item["options"].items():
-                print(spaces + f"{condense(option_name, 12)}:")
-                count = 1
-                current_id = ""
-                for item_id in ids:
-                    # Check for similarity to display quantity
-                    if current_id == item_id: count += 1
-                    else:
-                        count = 1
-                        current_id = item_id
-                    option_item_name = condense(str(count) + " " + get_item_by_id(item_id)['name'], col_name)
-                    print(spaces + f"{option_item_name}")
-    print("-" * receipt_width)
-
-    # Display calculations
-    print(f"{'Subtotal:':<{receipt_width - 10}}{subtotal:>10.2f}")
-    if discount > 0.0:
-        print(f"{f'Discount {discount*100:.0f}%:':<{receipt_width - 10}}-{discount_amt:>9.2f}")
-    print(f"{f'GST {GST*100:.0f}%:':<{receipt_width - 10}}{gst:>10.2f}")
-    print("-" * receipt_width)
-    print(f"{'TOTAL:':<{receipt_width - 10}}{total:>10.2f}")
-    print("-" * receipt_width)
-
-    # Footer
-    print()
-    print(f"{'Thank you for dining with us!':^{receipt_width}}")
-    print(f"{'We hope to see you again.':^{receipt_width}}\n")
+    # Calculations are done in integer cents by the pricing engine
+    priced = price_cart(cart.subtotal_cents, discount, menu_state.gst)
+    print_order_receipt(
+        cart.to_lines(), priced, discount, menu_state.gst, datetime.now(),
+        # Items removed from the menu file since they were added still print with their ID
+        lambda item_id: catalog.items_by_id[item_id]["name"] if item_id in catalog else item_id, order_number
+    )
 
 def handle_ui_integer_selection(question: str, allowed_min: int = -sys.maxsize, allowed_max: int = sys.maxsize, back_button: bool = False):
     """Handles integer selection UI"""
     default = allowed_min if allowed_min > 0 else 0
     selected_number = default
     def show():
-        clear_console()
-        print(question)
-        print(f"    | [Left] < (-) {selected_number} (+) > [Right]")
-        print(f"    | [Enter] Confirm")
-        if back_button:
-            print(f"    | [Q] Back")
-        print(f"    | 💡 Use numbers to type, minus symbol to negate")
+        with screen.frame():
+            print(question)
+            print(f"    | [Left] < (-) {selected_number} (+) > [Right]")
+            print(f"    | [Enter] Confirm")
+            if back_button:
+                print(f"    | [Q] Back")
+            print(f"    | 💡 Use numbers to type, minus symbol to negate")
     while True:
         show()
         key = handle_input()
@@ -459,6 +345,18 @@ def handle_ui_menu_selection(
     if ui_options[idx] == "Confirm": return "confirm"
     return idx
 
+def update_cart(change, title: str = "Cannot update Cart") -> bool:
+    """
+    Runs a change to the cart, returning False after showing why if it failed
+    (e.g. refused by the order server, or the server cannot be reached for a thin client)
+    """
+    try:
+        change()
+    except (OSError, ValueError) as e:
+        display_modal(title, str(e), "error")
+        return False
+    return True
+
 # User interface functions
 
 def handle_edit_cart():
@@ -474,58 +372,77 @@ def handle_edit_cart():
     
     table_headers = ["Index", "Code", "Category", "Name", "Price", "Quantity", "Total"]
     current_index = 0
+    def cart_row(i):
+        return [
+            str(i + 1), cart[i]["id"],
+            MENU_ITEM_IDS[cart[i]["code"].category][1], cart[i]["name"],
+            f"${cart[i]["price"]:.2f}",
+            (f"- {cart[i]["quantity"]:^{len(table_headers[5])}} +" if current_index == i else f"  {cart[i]["quantity"]:^{len(table_headers[5])}}  "),
+            f"${cart[i]["total"]:.2f}"
+        ]
+    # Rows are updated one at a time as the selection and quantities change, and rebuilt when lines move
+    table = TableView(table_headers)
+    def rebuild_table():
+        table.set_rows([cart_row(i) for i in range(len(cart))])
+    rebuild_table()
     def show():
         """Display to console terminal and return num of items allowed to choose"""
-        clear_console()
-        display_table([
-            [
-                str(i + 1), cart[i]["id"],
-                MENU_ITEM_IDS[split_item_code(cart[i]["id"])[0]][1], cart[i]["name"],
-                f"${cart[i]["price"]:.2f}",
-                (f"- {cart[i]["quantity"]:^{len(table_headers[5])}} +" if current_index == i else f"  {cart[i]["quantity"]:^{len(table_headers[5])}}  "),
-                f"${cart[i]["price"] * cart[i]["quantity"]:.2f}"
-            ]
-            for i in range(len(cart))
-        ], table_headers, selected_index=current_index)
-        print("---")
-        print(f"Total: ${sum(item["price"] * item["quantity"] for item in cart):.2f}")
-        print("---")
-        print("[Up/Down arrows] Move selection cursor")
-        print("[Left/Right arrows] Update quantity")
-        print("[Enter] Edit selection")
-        print("[Backspace] Delete selection")
-        print("[Q] Back")
+        with screen.frame():
+            # Table borders and page line, total and help lines, and the cursor line
+            display_table_view(table, current_index, reserved_rows=14)
+            print("---")
+            print(f"Total: ${cart.subtotal:.2f}")
+            print("---")
+            print("[Up/Down arrows] Move selection cursor")
+            print("[Left/Right arrows] Update quantity")
+            print("[Enter] Edit selection")
+            print("[Backspace] Delete selection")
+            print("[Q] Back")
     while True:
         show()
-        key = handle_input()
+        key, repeat = handle_input_repeat()
         if key == "left":
-            cart[current_index]["quantity"] = max(cart[current_index]["quantity"] - 1, 1)
+            update_cart(lambda: cart.set_quantity(current_index, max(cart[current_index]["quantity"] - 1, 1)))
+            table.set_row(current_index, cart_row(current_index))
         elif key == "right":
-            cart[current_index]["quantity"] = min(cart[current_index]["quantity"] + 1, ALLOWED_ORDERS_PER_ITEM)
-        elif key == "up":
-            current_index = max(current_index - 1, 0)
-        elif key == "down":
-            current_index = min(current_index + 1, len(cart) - 1)
+            update_cart(lambda: cart.set_quantity(current_index, min(cart[current_index]["quantity"] + 1, ALLOWED_ORDERS_PER_ITEM)))
+            table.set_row(current_index, cart_row(current_index))
+        elif key in ("up", "down", "pageup", "pagedown"):
+            previous_index = current_index
+            current_index = page_index(current_index, key, repeat, table)
+            table.set_row(previous_index, cart_row(previous_index))
+            table.set_row(current_index, cart_row(current_index))
         elif key == "enter":
             current = cart[current_index]
             # Edit a combo meal
-            category_code, _ = split_item_code(current["id"])
-            if category_code == "C":
+            if current["code"].category == "C":
+                if current["id"] not in catalog:
+                    # Removed by a menu reload since it was added
+                    display_modal("Cannot edit item", f"{current["name"]} is no longer on the menu, it cannot be edited.", "error")
+                    continue
                 # Enable combo editing
                 combo_selected_data = handle_edit_combo(current["id"], current["options"])
                 if combo_selected_data is None:
                     continue
-                cart[current_index]["options"] = combo_selected_data
+                try:
+                    # Identical combos are merged, so the edited item may move to another row
+                    current_index = cart.set_options(current_index, combo_selected_data)
+                except (OSError, ValueError) as e:
+                    display_modal("Cannot save changes", str(e), "error")
+                    continue
+                rebuild_table()
                 display_modal(
                     "Saved changes to Cart",
-                    f"Successfully saved new item data to cart:\n - ({order["id"]}) {order["name"]}",
+                    f"Successfully saved new item data to cart:\n - ({current["id"]}) {current["name"]}",
                     "success",
                 )
             else:
                 display_modal("Cannot edit item", f"({current["id"]}) {current["name"]} is an à la carte item. You can only edit combo items.", "error")
         elif key == "backspace":
-            cart.pop(current_index)
+            if not update_cart(lambda: cart.pop(current_index)):
+                continue
             current_index = 0
+            rebuild_table()
             if len(cart) == 0:
                 display_modal("No items in Cart", (
                     "There are currently no items in your cart. "
@@ -541,7 +458,7 @@ def handle_edit_combo(item_id: str, preselected: dict = {}):
     Handles editing of a combo meal by selecting items for each section.
     Optionally takes a `preselected` dict mapping section names to lists of selected option indices.
     """
-    cat_code, _ = split_item_code(item_id)
+    cat_code = parse_item_code(item_id).category
     if cat_code != "C":
         raise ValueError("Only combo meals can be edited.")
 
@@ -551,7 +468,8 @@ def handle_edit_combo(item_id: str, preselected: dict = {}):
 
     # Get icon and parse combo sections
     icon = MENU_ITEM_IDS[cat_code][2]
-    parsed_sections = parse_item_ref_ids(item_info["item_ref_ids"])
+    # Resolved once per combo and menu version, then reused on every open
+    parsed_sections = catalog.resolve_combo(item_id)
     section_names = list(item_info["item_ref_ids"].keys())
 
     # Prepare initial selection state
@@ -572,67 +490,82 @@ def handle_edit_combo(item_id: str, preselected: dict = {}):
     tab = 0  # 0 = info, 1+ = section index
     sel_idx = 0  # selection index within section
 
-    def show():
-        """Display to console terminal and return num of items allowed to choose"""
-        clear_console()
-        title = f"| {icon} Edit Combo Meal ({item_id}) |"
-        line = f"+{'-' * (len(title) - 1)}+"
-        allowed_items = 0
-        print(line)
-        print(title)
-        display_topbar(["Information"] + section_names, tab, top_line=line)
-        if tab == 0:
-            # Show combo info and current selections
-            info = [["Name", item_info['name']], ["Price", f"${item_info['price']:.2f}"]]
-            section_items = []
-            for i, section in enumerate(parsed_sections):
-                if section["locked"]:
-                    chosen = ", ".join(item["name"] for item in section["options"])
-                elif len(selected[i]) == section["quantity"]:
-                    chosen = ", ".join(section["options"][j]["name"] for j in selected[i])
-                else:
-                    chosen = "(Not completed)"
-                section_items.append([section_names[i], chosen, section["quantity"]])
-            display_table(info)
-            display_table(section_items, ["Section", "Selected", "Quantity"])
-            print("-----")
-        else:
-            # Show options for current section
-            section = parsed_sections[tab - 1]
+    # One options table per section, built on its first visit; checkboxes are updated row by row
+    section_tables = {}
+    def option_row(section_index, i, row):
+        return (["[X]"] if i in selected[section_index] else ["[ ]"]) + list(row)
+    def get_section_table(section_index):
+        if section_index not in section_tables:
+            section = parsed_sections[section_index]
             items = generate_item_table(section["options"])
-            allowed_items = len(items)
             if section["locked"]:
-                display_table(items, ["Item ID", "Item Name", "Price"])
-                print(" (Section is locked; cannot edit)")
-                print("-----")
+                section_tables[section_index] = TableView(["Item ID", "Item Name", "Price"], items)
             else:
-                # Show selectable items with checkboxes
-                table = [
-                    (["[X]"] if i in selected[tab - 1] else ["[ ]"]) + list(row)
-                    for i, row in enumerate(items)
-                ]
-                display_table(table, ["", "Item ID", "Item Name", "Price"], sel_idx)
+                section_tables[section_index] = TableView(
+                    ["", "Item ID", "Item Name", "Price"],
+                    [option_row(section_index, i, row) for i, row in enumerate(items)]
+                )
+        return section_tables[section_index]
+    def update_checkbox(section_index, i):
+        table = get_section_table(section_index)
+        table.set_row(i, option_row(section_index, i, table.rows[i][1:]))
+
+    def show():
+        """Display to console terminal and return num of items allowed to choose"""
+        with screen.frame():
+            title = f"| {icon} Edit Combo Meal ({item_id}) |"
+            line = f"+{'-' * (len(title) - 1)}+"
+            allowed_items = 0
+            print(line)
+            print(title)
+            display_topbar(["Information"] + section_names, tab, top_line=line)
+            if tab == 0:
+                # Show combo info and current selections
+                info = [["Name", item_info['name']], ["Price", f"${item_info['price']:.2f}"]]
+                section_items = []
+                for i, section in enumerate(parsed_sections):
+                    if section["locked"]:
+                        chosen = ", ".join(item["name"] for item in section["options"])
+                    elif len(selected[i]) == section["quantity"]:
+                        chosen = ", ".join(section["options"][j]["name"] for j in selected[i])
+                    else:
+                        chosen = "(Not completed)"
+                    section_items.append([section_names[i], chosen, section["quantity"]])
+                display_table(info)
+                display_table(section_items, ["Section", "Selected", "Quantity"])
                 print("-----")
-                print("[Spacebar] Select/Deselect item")
-                print("[Up/Down] Move selection cursor")
-        print("[Left/Right] Move category cursor")
-        print("[Enter] Save changes")
-        print("[Q] Back")
+            else:
+                # Show options for current section
+                section = parsed_sections[tab - 1]
+                table = get_section_table(tab - 1)
+                allowed_items = len(table)
+                # Title and top bar, table borders and page line, help lines and the cursor line
+                if section["locked"]:
+                    display_table_view(table, reserved_rows=14)
+                    print(" (Section is locked; cannot edit)")
+                    print("-----")
+                else:
+                    # Show selectable items with checkboxes
+                    display_table_view(table, sel_idx, reserved_rows=17)
+                    print("-----")
+                    print("[Spacebar] Select/Deselect item")
+                    print("[Up/Down] Move selection cursor")
+            print("[Left/Right] Move category cursor")
+            print("[Enter] Save changes")
+            print("[Q] Back")
         return allowed_items
 
     while True:
         max_idx = show()
-        key = handle_input()
+        key, repeat = handle_input_repeat()
         if key == "left":
             tab = max(tab - 1, 0)
             sel_idx = 0
         elif key == "right":
             tab = min(tab + 1, len(section_names))
             sel_idx = 0
-        elif key == "up":
-            sel_idx = max(sel_idx - 1, 0)
-        elif key == "down":
-            sel_idx = min(sel_idx + 1, max(max_idx - 1, 0))
+        elif key in ("up", "down", "pageup", "pagedown") and tab > 0:
+            sel_idx = page_index(sel_idx, key, repeat, get_section_table(tab - 1))
         elif key == "spacebar" and tab > 0:
             section = parsed_sections[tab - 1]
             if not section["locked"] and 0 <= sel_idx < max_idx:
@@ -641,6 +574,7 @@ def handle_edit_combo(item_id: str, preselected: dict = {}):
                 else:
                     if len(selected[tab - 1]) < section["quantity"]:
                         selected[tab - 1].append(sel_idx)
+                update_checkbox(tab - 1, sel_idx)
         elif key == "enter":
             # Validate selections
             result = {}
@@ -674,14 +608,25 @@ def handle_checkout():
         back_button=True
     )
 
-    if identity == 0: discount_rate = DISCOUNT_RATES["student"]
-    elif identity == 1: discount_rate = DISCOUNT_RATES["staff"]
-    elif identity == 2: discount_rate = DISCOUNT_RATES["loyalty_member"]
-    elif identity == 3: discount_rate = 0.0
+    if identity == 0: discount_type = "student"
+    elif identity == 1: discount_type = "staff"
+    elif identity == 2: discount_type = "loyalty_member"
+    elif identity == 3: discount_type = None
     else: return None
-    
-    print("Printing receipt...")
-    print_receipt(discount_rate)
+    discount_rate = menu_state.discount_rates.get(discount_type, 0.0)
+
+    with metrics.timer("checkout.total"):
+        # Save the order before printing its receipt
+        order_number = None
+        try:
+            with metrics.timer("checkout.save"):
+                order_number = save_order(discount_type, discount_rate)
+            metrics.count("checkout.orders")
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Could not save the order: {e}")
+
+        print("Printing receipt...")
+        print_receipt(discount_rate, order_number)
 
 def handle_food_menu():
     header_categories = [MENU_ITEM_IDS[code][1] for code in MENU_ITEM_IDS.keys()]
@@ -691,26 +636,39 @@ def handle_food_menu():
     cat_index = 0
     item_index = 0
 
-    item_table = generate_item_table(header_category_items[cat_index])
+    # One table per category, built on its first visit
+    category_tables = {}
+    def get_item_table(index):
+        if index not in category_tables:
+            category_tables[index] = TableView(["Item ID", "Item Name", "Price"], generate_item_table(header_category_items[index]))
+        return category_tables[index]
+
+    item_table = get_item_table(cat_index)
 
     def display_content():
         title = f"| 📖 Menu |"
         line = f"+{'-' * (len(title) - 1)}+"
-        clear_console()
-        print(line)
-        print(title)
-        display_topbar(header_categories, cat_index, top_line=line)
-        display_table(item_table, ["Item ID", "Item Name", "Price"], item_index)
-        print("-----")
-        print("[Left/Right arrows] Move category cursor")
-        print("[Up/Down arrows] Move selection cursor")
-        print("[Enter] Confirm selection")
-        print("[Q] Go back")
+        with screen.frame():
+            print(line)
+            print(title)
+            display_topbar(header_categories, cat_index, top_line=line)
+            # Title and top bar, table borders and page line, help lines and the cursor line
+            display_table_view(item_table, item_index, reserved_rows=17)
+            print("-----")
+            print("[Left/Right arrows] Move category cursor")
+            print("[Up/Down arrows] Move selection cursor")
+            print("[/] Search by item ID or name")
+            print("[Enter] Confirm selection")
+            print("[Q] Go back")
 
     while True:
         display_content()
-        key = handle_input()
-        if key in ["left", "right", "up", "down", "enter", "q"]:
+        key, repeat = handle_input_repeat()
+        if key == "slash":
+            found_item = handle_menu_search()
+            if found_item is not None:
+                return found_item
+        elif key in ["left", "right", "up", "down", "pageup", "pagedown", "enter", "q"]:
             # Clamp values for each key
             if key == "left":
                 cat_index = max(cat_index - 1, 0)
@@ -718,106 +676,181 @@ def handle_food_menu():
             elif key == "right":
                 cat_index = min(cat_index + 1, len(header_categories) - 1)
                 item_index = 0
-            elif key == "up":
-                item_index = max(item_index - 1, 0)
-            elif key == "down":
-                item_index = min(item_index + 1, len(item_table) - 1)
+            elif key in ("up", "down", "pageup", "pagedown"):
+                item_index = page_index(item_index, key, repeat, item_table)
             elif key == "enter":
-                return str(item_table[item_index][0])  # Return selected item ID
+                return item_table.rows[item_index][0]  # Return selected item ID
             elif key == "q":
                 return None
-        item_table = generate_item_table(header_category_items[cat_index])
+        item_table = get_item_table(cat_index)
         # Clamp item_index if item_table shrinks
         if item_index >= len(item_table):
             item_index = max(len(item_table) - 1, 0)
 
-# Main code
+def handle_menu_search():
+    """Type-ahead search over item IDs and names, returns the selected item ID (or `None` to go back)"""
+    query = ""
+    result_index = 0
+    results = []
+    result_table = TableView(["Item ID", "Item Name", "Price"])
+    searched_query = None
 
-# Just to make restaurant title nicer
-title_header = "| " + RESTAURANT_NAME + " |"
-bar_header = f"+{'-' * (len(title_header) - 2)}+"
-while True:
-    clear_console()
-    print(bar_header)
-    print(title_header)
-    print(bar_header)
-    print()
-    tab_selection = handle_ui_menu_selection("What would you like to do?",
-        options=["Browse and Order", "View and Edit cart", "Checkout", "Quit"],
-        option_icons=["🔍", "🛒", "💳", "🚪"]
-    )
+    def show():
+        title = "| 🔎 Search Menu |"
+        line = f"+{'-' * (len(title) - 1)}+"
+        with screen.frame():
+            print(line)
+            print(title)
+            print(line)
+            print(f"Search: {query}_")
+            if results:
+                display_table_view(result_table, result_index)
+            elif query.strip():
+                print(" No matching items")
+            print("-----")
+            print("[Type] Item ID or name (typos are fine)")
+            print("[Up/Down arrows] Move selection cursor")
+            print("[Enter] Confirm selection")
+            print("[Esc] Go back")
 
-    if tab_selection == 0:
-        selected_item = handle_food_menu()
-        if selected_item == None:
-            continue
-        completed = False
-        combo_preselected_data = {}
-        while not completed:
-            code, num = split_item_code(selected_item)
-            if code == "C":
-                # Enable combo editing
-                combo_selected_data = handle_edit_combo(selected_item, combo_preselected_data)
-                if combo_selected_data is None:
-                    selected_item = handle_food_menu()
-                    if selected_item is None:
-                        # Since user chooses to go back break this loop to go back to the main loop
-                        break
-                    continue
-                combo_preselected_data = combo_selected_data
-            quantity = handle_ui_integer_selection(
-                f"Please enter quantity for item {selected_item}:",
-                allowed_min=1,
-                allowed_max=ALLOWED_ORDERS_PER_ITEM,
-                back_button=True
-            )
-            if quantity is None:
-                if code != "C":
-                    # If it is not a combo meal go back to menu selection
-                    selected_item = handle_food_menu()
-                    if selected_item is None:
-                        # Since user chooses to go back break this loop to go back to the main loop
-                        break
-                continue
-            # Store into an order variable
-            added_item = get_item_by_id(selected_item)
-            order: dict[str, dict | str | int] = { "id": selected_item, "name": added_item["name"], "price": added_item["price"], "quantity": quantity }
-            if code == "C":
-                order["options"] = combo_preselected_data
-            
-            overflow = False
-            found_similar_item = False
-            for i in range(len(cart)):
-                if compare_orders(order, cart[i]):
-                    total_quantity = cart[i]["quantity"] + order["quantity"]
-                    if total_quantity > ALLOWED_ORDERS_PER_ITEM:
-                        overflow = True
-                        display_modal(
-                            "Order overflow",
-                            f"You have reached to {total_quantity} orders for this item. Maximum orders allowed for each item is {ALLOWED_ORDERS_PER_ITEM}.",
-                            "error"
-                        )
-                    else:
-                        cart[i]["quantity"] += order["quantity"]
-                        found_similar_item = True
-            
-            if overflow: continue
-            if not found_similar_item: cart.append(order)
-            # Display added to cart message
-            display_modal(
-                "Added to Cart",
-                f"Successfully added this item to cart:\n - ({order["id"]}) {order["name"]}\n - Quantity: {quantity}",
-                "success",
-            )
-            completed = True
-        if not completed: continue
-    elif tab_selection == 1: handle_edit_cart()
-    elif tab_selection == 2:
-        handle_checkout()
-        print("--- Press enter to exit the program")
-        while handle_input() != "enter": continue
-        break
+    while True:
+        if query != searched_query:
+            # As many results as fit: title, search line, table borders, help lines and the cursor line
+            results = catalog.search(query, available_rows(15))
+            result_table.set_rows(generate_item_table(results))
+            searched_query = query
+            result_index = 0
+        show()
+        key, repeat = handle_input_repeat()
+        if key == "escape":
+            return None
+        elif key == "enter":
+            if results:
+                return results[result_index]["id"]
+        elif key in ("up", "down", "pageup", "pagedown"):
+            result_index = page_index(result_index, key, repeat, result_table)
+        elif key == "backspace":
+            query = query[:-1]
+        elif key == "spacebar":
+            query += " "
+        elif key is not None and len(key) == 1:
+            query += key
+
+# Main code
+
+def main():
+    """Runs the interactive UI until the customer checks out or quits"""
+    if not sys.stdin.isatty():
+        print("=== NOT SUPPORTED")
+        print("This program cannot be run on pseudo-based terminals.")
+        print("Please run the legacy.py python program instead.")
+        return 1
+
+    global menu_source, cart
+    config = load_config()
+    metrics.start_from_config(config)
+    if config.get("memory_profile", {}).get("enabled"):
+        # Loaded only when profiling, tracemalloc is started as early as possible
+        from memprofile import start_from_config
+        start_from_config(config)
+    address = config.get("order_server", {}).get("address")
+    if address:
+        # Thin client: the order server owns the menu, the cart and order numbers
+        from order_client import connect_kiosk
+        menu_source, cart = connect_kiosk(address)
     else:
-        print("👋 Goodbye!")
-        time.sleep(1)
-        break
\ No newline at end of file
+        from menu_source import open_menu_source
+        try:
+            menu_source = open_menu_source(watch=True)
+        except ValueError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return 1
+
+    # Just to make restaurant title nicer
+    title_header = "| " + RESTAURANT_NAME + " |"
+    bar_header = f"+{'-' * (len(title_header) - 2)}+"
+    while True:
+        refresh_menu()
+        clear_console()
+        print(bar_header)
+        print(title_header)
+        print(bar_header)
+        print()
+        tab_selection = handle_ui_menu_selection("What would you like to do?",
+            options=["Browse and Order", "View and Edit cart", "Checkout", "Quit"],
+            option_icons=["🔍", "🛒", "💳", "🚪"]
+        )
+
+        if tab_selection == 0:
+            selected_item = handle_food_menu()
+            if selected_item == None:
+                continue
+            completed = False
+            combo_preselected_data = {}
+            while not completed:
+                code = parse_item_code(selected_item).category
+                if code == "C":
+                    # Enable combo editing
+                    combo_selected_data = handle_edit_combo(selected_item, combo_preselected_data)
+                    if combo_selected_data is None:
+                        selected_item = handle_food_menu()
+                        if selected_item is None:
+                            # Since user chooses to go back break this loop to go back to the main loop
+                            break
+                        continue
+                    combo_preselected_data = combo_selected_data
+                quantity = handle_ui_integer_selection(
+                    f"Please enter quantity for item {selected_item}:",
+                    allowed_min=1,
+                    allowed_max=ALLOWED_ORDERS_PER_ITEM,
+                    back_button=True
+                )
+                if quantity is None:
+                    if code != "C":
+                        # If it is not a combo meal go back to menu selection
+                        selected_item = handle_food_menu()
+                        if selected_item is None:
+                            # Since user chooses to go back break this loop to go back to the main loop
+                            break
+                    continue
+                # Store into an order variable
+                added_item = get_item_by_id(selected_item)
+                order: dict[str, dict | str | int] = { "id": selected_item, "code": added_item["code"], "name": added_item["name"], "price": added_item["price"], "quantity": quantity }
+                if code == "C":
+                    order["options"] = combo_preselected_data
+
+                # Identical orders (same item and combo options) are merged by the cart index
+                similar_item = cart.find(order)
+                total_quantity = order["quantity"] + (similar_item["quantity"] if similar_item else 0)
+                if total_quantity > ALLOWED_ORDERS_PER_ITEM:
+                    display_modal(
+                        "Order overflow",
+                        f"You have reached to {total_quantity} orders for this item. Maximum orders allowed for each item is {ALLOWED_ORDERS_PER_ITEM}.",
+                        "error"
+                    )
+                    continue
+                if not update_cart(lambda: cart.add(order), "Cannot add to Cart"):
+                    # Back to the main menu
+                    break
+                # Display added to cart message
+                display_modal(
+                    "Added to Cart",
+                    f"Successfully added this item to cart:\n - ({order["id"]}) {order["name"]}\n - Quantity: {quantity}",
+                    "success",
+                )
+                completed = True
+            if not completed: continue
+        elif tab_selection == 1: handle_edit_cart()
+        elif tab_selection == 2:
+            handle_checkout()
+            print("--- Press enter to exit the program")
+            while handle_input() != "enter": continue
+            break
+        else:
+            print("👋 Goodbye!")
+            time.sleep(1)
+            break
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,319 @@
+"""
+Append-only order journal (write-ahead log) stored in the `database.dir` of config.json.
+
+One file per business day, `orders-YYYYMMDD.journal`:
+- file header: `JOURNAL_MAGIC` (8 bytes)
+- records: `<length: uint32 LE> <crc32 of payload: uint32 LE> <payload: UTF-8 JSON>`
+
+Next to it, `orders-YYYYMMDD.idx` holds one fixed-width entry per record so order N can be found
+without reading the journal (see archive.py):
+- file header: `INDEX_MAGIC` (8 bytes)
+- entries: `<record offset: uint64 LE> <record length incl. header: uint32 LE>`
+The index is derived data: it is rebuilt from the journal whenever it does not match.
+
+Appends go to the OS straight away, but fsyncs are batched across orders (group commit):
+a background thread syncs once for every order appended within `commit_interval` seconds
+(or as soon as `max_batch` orders are waiting), then wakes every caller waiting on those orders.
+
+After a crash, `recover_journal` scans the file, keeps every complete record whose checksum matches,
+and truncates the torn tail left by an interrupted write.
+
+Kiosks and the order server may write the same day's journal: every writer holds an exclusive `flock` on it
+while recovering, numbering and appending, and first catches up with the records other writers appended since,
+so order numbers and index offsets always come from the file itself.
+"""
+import contextlib
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from datetime import datetime
+from typing import NamedTuple
+
+from config import get_data_dir
+from pricing import price_cart
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: no advisory locks, one writer per data directory
+    fcntl = None
+
+JOURNAL_MAGIC = b"FFJRNL01"
+RECORD_HEADER = struct.Struct("<II")
+INDEX_MAGIC = b"FFINDX01"
+INDEX_ENTRY = struct.Struct("<QI")
+# Anything bigger is treated as a corrupt length field
+MAX_RECORD_SIZE = 16 * 1024 * 1024
+
+
+class JournalState(NamedTuple):
+    """Result of scanning a journal file"""
+    records: list           # decoded records, in order
+    entries: list           # (offset, length) of each record, for the index
+    valid_length: int       # bytes up to the end of the last good record
+    torn_bytes: int         # bytes after it (torn or corrupt tail)
+
+
+def journal_path(data_dir: str, day: datetime | None = None) -> str:
+    """Path of the journal file for a business day (today by default)"""
+    day = day or datetime.now()
+    return os.path.join(data_dir, f"orders-{day:%Y%m%d}.journal")
+
+
+def index_path(path: str) -> str:
+    """Path of the offset index of a journal file"""
+    return os.path.splitext(path)[0] + ".idx"
+
+
+def encode_record(record: dict) -> bytes:
+    """Encodes one record with its length and checksum header"""
+    payload = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def iter_records(buffer, offset: int = len(JOURNAL_MAGIC)):
+    """
+    Yields `(offset, end, payload)` for every complete, checksum-valid record in `buffer`
+    (bytes, or an mmap), stopping at the first torn or corrupt one.
+    """
+    size = len(buffer)
+    while offset + RECORD_HEADER.size <= size:
+        length, checksum = RECORD_HEADER.unpack_from(buffer, offset)
+        start = offset + RECORD_HEADER.size
+        end = start + length
+        if length > MAX_RECORD_SIZE or end > size:
+            return
+        payload = buffer[start:end]
+        if zlib.crc32(payload) != checksum:
+            return
+        yield offset, end, payload
+        offset = end
+
+
+def scan_journal(path: str) -> JournalState:
+    """Reads every valid record of a journal file without changing it"""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < len(JOURNAL_MAGIC):
+            data = f.read()
+            if JOURNAL_MAGIC.startswith(data):
+                # Crashed while writing the file header
+                return JournalState([], [], 0, size)
+            raise ValueError(f"{path} is not an order journal")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data[:len(JOURNAL_MAGIC)] != JOURNAL_MAGIC:
+                raise ValueError(f"{path} is not an order journal")
+            records = []
+            entries = []
+            valid_length = len(JOURNAL_MAGIC)
+            for offset, end, payload in iter_records(data):
+                records.append(json.loads(payload))
+                entries.append((offset, end - offset))
+                valid_length = end
+    return JournalState(records, entries, valid_length, size - valid_length)
+
+
+def write_index(path: str, entries: list):
+    """(Re)writes the offset index of a journal file atomically"""
+    temp_path = index_path(path) + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(INDEX_MAGIC)
+        f.write(b"".join(INDEX_ENTRY.pack(offset, length) for offset, length in entries))
+    os.replace(temp_path, index_path(path))
+
+
+@contextlib.contextmanager
+def locked(f):
+    """Holds an exclusive lock on an open journal file (blocking until other writers release it)"""
+    if fcntl is None:
+        yield
+        return
+    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def recover_journal(path: str) -> JournalState:
+    """Scans a journal after a crash and truncates any torn tail so new records append cleanly"""
+    state = scan_journal(path)
+    if state.torn_bytes:
+        with open(path, "r+b") as f:
+            f.truncate(state.valid_length)
+            f.flush()
+            os.fsync(f.fileno())
+    return state
+
+
+class OrderJournal:
+    """
+    Appends checked-out orders to a journal file with group commit.
+    Order numbers restart at 1 for every journal file and continue after recovery,
+    and across every process writing the file (see `locked`).
+    """
+
+    def __init__(self, path: str, commit_interval: float = 0.005, max_batch: int = 256):
+        self.path = path
+        self.commit_interval = commit_interval
+        self.max_batch = max_batch
+        self._file = open(path, "ab")
+        with locked(self._file):
+            self._recover()
+        self._cond = threading.Condition()
+        self._appended = 0      # records written to the OS so far
+        self._durable = 0       # records covered by an fsync
+        self._closed = False
+        self.fsync_count = 0
+        self._flusher = threading.Thread(target=self._flush_loop, name="journal-flusher", daemon=True)
+        self._flusher.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def _recover(self):
+        """Scans the whole file (under the lock): truncates a torn tail, counts the orders, repairs the index"""
+        state = recover_journal(self.path)
+        if state.valid_length == 0:
+            # New file, or one emptied by the recovery after a crash while writing its header
+            self._file.write(JOURNAL_MAGIC)
+            self._file.flush()
+            state = state._replace(valid_length=len(JOURNAL_MAGIC))
+        self.order_count = len(state.entries)
+        self._end = state.valid_length
+        self._check_index(state.entries)
+
+    def _check_index(self, entries: list | None = None):
+        """Rebuilds the index if a crash (of any writer) left it out of step with the journal"""
+        expected_size = len(INDEX_MAGIC) + self.order_count * INDEX_ENTRY.size
+        path = index_path(self.path)
+        if not os.path.exists(path) or os.path.getsize(path) != expected_size:
+            write_index(self.path, scan_journal(self.path).entries if entries is None else entries)
+
+    def _catch_up(self):
+        """Under the lock: takes in the records other writers appended since this one last wrote"""
+        size = os.fstat(self._file.fileno()).st_size
+        if size < self._end:
+            # Truncated behind our back: start over from the file
+            self._recover()
+            return
+        if size > self._end:
+            with open(self.path, "rb") as f:
+                f.seek(self._end)
+                data = f.read(size - self._end)
+            end = 0
+            for _, end, _ in iter_records(data, 0):
+                self.order_count += 1
+            self._end += end
+            if self._end < size:
+                # Torn tail of a writer that died while holding the lock
+                os.ftruncate(self._file.fileno(), self._end)
+                os.fsync(self._file.fileno())
+        self._check_index()
+
+    def _write(self, build) -> dict:
+        """Under the lock: catches up, builds the next record with `build(order_number)` and appends it and its index entry"""
+        with locked(self._file):
+            self._catch_up()
+            record = build(self.order_count + 1)
+            data = encode_record(record)
+            offset = self._end
+            self._file.write(data)
+            self._file.flush()
+            # Opened per append: another writer may have replaced the index file while rebuilding it
+            with open(index_path(self.path), "ab") as index_file:
+                index_file.write(INDEX_ENTRY.pack(offset, len(data)))
+            self._end = offset + len(data)
+            self.order_count += 1
+        return record
+
+    def append(self, record: dict, wait: bool = True) -> int:
+        """
+        Appends a record and returns its sequence number in this session.
+        With `wait`, returns only once the record is on disk.
+        """
+        return self._append(lambda _: record, wait)[0]
+
+    def _append(self, build, wait: bool) -> tuple[int, dict]:
+        with self._cond:
+            if self._closed:
+                raise ValueError("Journal is closed")
+            record = self._write(build)
+            self._appended += 1
+            sequence = self._appended
+            self._cond.notify_all()
+            if wait:
+                while self._durable < sequence:
+                    self._cond.wait()
+        return sequence, record
+
+    def wait_durable(self, sequence: int):
+        """Blocks until the record with this sequence number is on disk"""
+        with self._cond:
+            while self._durable < sequence:
+                self._cond.wait()
+
+    def append_order(self, cart, discount_type: str | None, discount_rate: float, gst_rate: float, wait: bool = True) -> dict:
+        """Builds the record of a checked-out cart, numbered after the last order in the file, appends it and returns it"""
+        return self._append(lambda order_number: order_record(cart, order_number, discount_type, discount_rate, gst_rate), wait)[1]
+
+    def _flush_loop(self):
+        while True:
+            with self._cond:
+                while self._appended == self._durable and not self._closed:
+                    self._cond.wait()
+                if self._appended == self._durable:
+                    return
+                # Give other checkouts a moment to join this fsync
+                deadline = time.monotonic() + self.commit_interval
+                while self._appended - self._durable < self.max_batch and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                target = self._appended
+            # Sync outside the lock so new orders keep appending meanwhile
+            os.fsync(self._file.fileno())
+            with self._cond:
+                self.fsync_count += 1
+                self._durable = target
+                self._cond.notify_all()
+
+    def close(self):
+        """Syncs every pending record and closes the file"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._flusher.join()
+        self._file.close()
+
+
+def order_record(cart, order_number: int, discount_type: str | None, discount_rate: float, gst_rate: float, now: datetime | None = None) -> dict:
+    """Builds the journal record of a checked-out cart (amounts in integer cents)"""
+    priced = price_cart(cart.subtotal_cents, discount_rate, gst_rate)
+    return {
+        "order_number": order_number,
+        "time": (now or datetime.now()).isoformat(timespec="seconds"),
+        "discount_type": discount_type,
+        "discount_rate": discount_rate,
+        "gst_rate": gst_rate,
+        "lines": cart.to_lines(),
+        "subtotal": priced.subtotal,
+        "discount": priced.discount,
+        "gst": priced.gst,
+        "total": priced.total
+    }
+
+
+def open_journal(day: datetime | None = None, **kwargs) -> OrderJournal:
+    """Opens (and recovers if needed) the journal of a business day in the configured data directory"""
+    return OrderJournal(journal_path(get_data_dir(), day), **kwargs)
@@ -0,0 +1,237 @@
+"""
+Keyboard input for the interactive UI on POSIX terminals.
+
+`InputSession` puts the terminal in raw mode once (output processing is left on, so `print` still works)
+and restores it on `close()`, at exit or on SIGTERM/SIGHUP. Input is read in chunks as it arrives
+and decoded by `KeyDecoder`, so a burst of held arrow keys is never split or dropped,
+and a lone ESC is reported after `ESCAPE_TIMEOUT` instead of blocking for the rest of a sequence.
+
+With a `record_path`, the session also appends every chunk of raw input to a keystroke recording
+(JSON lines: a header `{"started": ..., "rows": ..., "columns": ...}`, then `{"t": seconds since start, "data": input}`),
+which `read_recording` loads back for replay (see benchmarks/keystroke_load.py).
+"""
+import atexit
+import codecs
+import json
+import os
+import select
+import shutil
+import signal
+import time
+from collections import deque
+from datetime import datetime
+
+import metrics
+
+# How long to wait for the rest of an escape sequence before treating ESC as a key
+ESCAPE_TIMEOUT = 0.05
+READ_SIZE = 4096
+
+# Final bytes of `ESC [ ...` (CSI) and `ESC O ...` (SS3) sequences for the keys the UI uses
+ARROW_KEYS = {"A": "up", "B": "down", "C": "right", "D": "left"}
+# `ESC [ <n> ~` sequences, by parameter
+TILDE_KEYS = {"5": "pageup", "6": "pagedown"}
+CONTROL_KEYS = {"\r": "enter", "\n": "enter", " ": "spacebar", "\x08": "backspace", "\x7f": "backspace", "-": "minus", "+": "plus", "/": "slash"}
+
+# What a terminal sends for each key name, for feeding keys to the UI
+KEY_SEQUENCES = {
+    "up": b"\x1b[A", "down": b"\x1b[B", "right": b"\x1b[C", "left": b"\x1b[D", "pageup": b"\x1b[5~", "pagedown": b"\x1b[6~",
+    "enter": b"\r", "spacebar": b" ", "backspace": b"\x7f", "minus": b"-", "plus": b"+", "slash": b"/", "escape": b"\x1b",
+}
+
+GROUND, ESCAPE, CSI, SS3 = range(4)
+
+
+def key_bytes(key: str) -> bytes:
+    """The input a terminal sends for a key name (see `KeyDecoder`), or the key's own characters"""
+    return KEY_SEQUENCES.get(key) or key.encode()
+
+
+class KeyDecoder:
+    """
+    Escape-sequence state machine turning terminal input into key names
+    (`up`, `down`, `left`, `right`, `pageup`, `pagedown`, `enter`, `spacebar`, `backspace`, `minus`, `plus`, `slash`, `escape`
+    or an alphanumeric character). Other input is skipped.
+    """
+
+    def __init__(self):
+        self.keys = deque()
+        self.state = GROUND
+        self._params = ""
+        self._utf8 = codecs.getincrementaldecoder("utf-8")("replace")
+
+    def feed(self, data: bytes):
+        """Decodes a chunk of input, queueing complete keys in `keys`"""
+        for ch in self._utf8.decode(data):
+            self._feed_char(ch)
+
+    def _feed_char(self, ch: str):
+        state = self.state
+        if state == GROUND:
+            if ch == "\x1b":
+                self.state = ESCAPE
+            elif ch == "\x03":
+                # Raw mode turns off signals, so Ctrl+C arrives as a character
+                raise KeyboardInterrupt
+            elif ch in CONTROL_KEYS:
+                self.keys.append(CONTROL_KEYS[ch])
+            elif ch.isalnum():
+                self.keys.append(ch)
+        elif state == ESCAPE:
+            if ch == "[":
+                self.state = CSI
+                self._params = ""
+            elif ch == "O":
+                self.state = SS3
+            else:
+                # ESC followed by something else: the ESC was a key of its own
+                self.keys.append("escape")
+                self.state = GROUND
+                self._feed_char(ch)
+        elif "\x40" <= ch <= "\x7e":
+            # Final byte of a CSI/SS3 sequence
+            if ch in ARROW_KEYS:
+                self.keys.append(ARROW_KEYS[ch])
+            elif ch == "~" and state == CSI and self._params in TILDE_KEYS:
+                self.keys.append(TILDE_KEYS[self._params])
+            self.state = GROUND
+        else:
+            self._params += ch
+
+    def timeout(self):
+        """Called when no more input arrived within `ESCAPE_TIMEOUT`: ends a lone ESC or a truncated sequence"""
+        if self.state == ESCAPE:
+            self.keys.append("escape")
+        self.state = GROUND
+
+    @property
+    def incomplete(self) -> bool:
+        return self.state != GROUND
+
+
+class KeyRecorder:
+    """Appends raw terminal input to a keystroke recording, timed from when the recorder was created"""
+
+    def __init__(self, path: str):
+        self.file = open(path, "a", encoding="utf-8")
+        self.start = time.monotonic()
+        size = shutil.get_terminal_size()
+        self._write({"started": datetime.now().isoformat(timespec="seconds"), "rows": size.lines, "columns": size.columns})
+
+    def _write(self, entry: dict):
+        # One line per chunk, flushed straight away so a crashed kiosk still leaves its keystrokes
+        self.file.write(json.dumps(entry) + "\n")
+        self.file.flush()
+
+    def record(self, data: bytes):
+        # Invalid UTF-8 is kept as surrogate escapes, so the recording replays byte for byte
+        self._write({"t": round(time.monotonic() - self.start, 4), "data": data.decode("utf-8", "surrogateescape")})
+
+    def close(self):
+        self.file.close()
+
+
+def read_recording(path: str) -> tuple[dict, list[tuple[float, bytes]]]:
+    """Loads a keystroke recording: its header and `(seconds since start, raw input)` for every chunk"""
+    header, chunks = {}, []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            entry = json.loads(line)
+            if "data" in entry:
+                chunks.append((entry["t"], entry["data"].encode("utf-8", "surrogateescape")))
+            elif not header:
+                header = entry
+    return header, chunks
+
+
+class InputSession:
+    """Raw-mode keyboard session on a terminal file descriptor (standard input by default)"""
+
+    def __init__(self, fd: int = 0, record_path: str | None = None):
+        termios = __import__("termios")
+        tty = __import__("tty")
+        self.fd = fd
+        self.decoder = KeyDecoder()
+        self._termios = termios
+        self._saved = termios.tcgetattr(fd)
+        mode = termios.tcgetattr(fd)
+        tty.cfmakeraw(mode)
+        # Keep newline translation on output so printed lines still start at the left margin
+        mode[tty.OFLAG] = self._saved[tty.OFLAG]
+        termios.tcsetattr(fd, termios.TCSAFLUSH, mode)
+        self.recorder = KeyRecorder(record_path) if record_path else None
+        self._closed = False
+        atexit.register(self.close)
+        self._previous_handlers = {}
+        for signum in (signal.SIGTERM, signal.SIGHUP):
+            self._previous_handlers[signum] = signal.signal(signum, self._on_signal)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        """Restores the terminal mode and signal handlers saved when the session started"""
+        if self._closed:
+            return
+        self._closed = True
+        self._termios.tcsetattr(self.fd, self._termios.TCSADRAIN, self._saved)
+        for signum, handler in self._previous_handlers.items():
+            signal.signal(signum, handler)
+        if self.recorder is not None:
+            self.recorder.close()
+        atexit.unregister(self.close)
+
+    def _on_signal(self, signum, _frame):
+        self.close()
+        # Let the previous handler (by default: terminate) deal with the signal
+        os.kill(os.getpid(), signum)
+
+    def _fill(self, timeout: float | None) -> bool:
+        """Reads whatever input is available (waiting up to `timeout`), returns False if none came"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        data = os.read(self.fd, READ_SIZE)
+        if not data:
+            raise EOFError("Terminal input closed")
+        metrics.mark("input")
+        if self.recorder is not None:
+            self.recorder.record(data)
+        with metrics.timer("input.decode"):
+            self.decoder.feed(data)
+        return True
+
+    def pending(self) -> bool:
+        """Whether keys are already waiting to be read"""
+        if not self.decoder.keys and not self.decoder.incomplete:
+            self._fill(0)
+        return bool(self.decoder.keys)
+
+    def read_key(self) -> str:
+        """Blocks until a key is pressed and returns its name"""
+        keys = self.decoder.keys
+        while not keys:
+            if self.decoder.incomplete:
+                if not self._fill(ESCAPE_TIMEOUT):
+                    self.decoder.timeout()
+            else:
+                self._fill(None)
+        metrics.mark("state")
+        return keys.popleft()
+
+    def read_repeat(self, coalesce=("up", "down", "pageup", "pagedown")) -> tuple[str, int]:
+        """
+        Like `read_key`, but also takes every identical key already queued behind it when it is one of `coalesce`,
+        returning `(key, count)` so a held key is applied in one step instead of one redraw per repeat.
+        """
+        key = self.read_key()
+        count = 1
+        if key in coalesce:
+            keys = self.decoder.keys
+            while self.pending() and keys[0] == key:
+                keys.popleft()
+                count += 1
+        return key, count
@@ -0,0 +1,369 @@
+"""
+Kitchen queue: checked-out orders become tickets, prepared item by item across the kitchen stations.
+
+Orders reach the kitchen through the day's journal (see journal.py): `JournalFollower` reads the records
+appended since it last looked, whichever kiosk or order server checked them out, and `KitchenScheduler.submit`
+turns each into a ticket with one task per item to prepare (a combo is prepared as the options chosen for it).
+`prep_info` gives the station and prep time of an item.
+
+Each station prepares up to `KITCHEN_STATIONS[station]` items at once and keeps a heap of the tasks waiting for it.
+With the `"prep"` policy a task is due at its latest start: ticket time + the ticket's longest prep time
+- the task's prep time, and stations take the task due first. A station is never idle while tasks wait for it,
+so a task can start before it is due: the due times only order the waiting tasks (a quick item of a big order
+lets the slower items of other orders go first, and older tickets still come first).
+`"fifo"` takes tasks in the order they came, as soon as a place is free.
+In benchmarks/kitchen_sim.py, `"prep"` gives lower mean ticket times than `"fifo"` at every rate,
+but a slightly longer p99 tail once the kitchen is close to full (2.5 orders a minute and up).
+
+Every change is sent as a `KitchenEvent` to each subscribed `KitchenDisplay`. Memory stays bounded:
+at most `max_tasks` tasks wait (`submit` raises `KitchenFull` beyond that, and the order stays in the journal
+until there is room; a ticket that could never fit raises `TicketTooLarge` and is turned away), tickets are dropped
+once ready, a display that falls behind loses its oldest events, and the journal is read `READ_CHUNK` bytes at a time.
+
+Times are seconds given by the caller, so the same scheduler runs the kitchen and its simulation
+(see benchmarks/kitchen_sim.py).
+
+Run with: python kitchen.py [prep|fifo] (displays the orders checked out from now on)
+"""
+import heapq
+import itertools
+import json
+import os
+import sys
+import time
+from collections import deque
+from datetime import datetime
+from typing import NamedTuple
+
+from catalog import MenuCatalog, parse_item_code
+from config import get_data_dir
+from journal import JOURNAL_MAGIC, MAX_RECORD_SIZE, RECORD_HEADER, iter_records, journal_path
+from menu_data import KITCHEN_STATIONS, PREP_TIMES
+
+POLICIES = ("prep", "fifo")
+# Tasks waiting across all stations
+MAX_WAITING_TASKS = 10_000
+# Events kept for a display until it reads them
+MAX_DISPLAY_EVENTS = 1_000
+# Journal records read at once
+MAX_POLL_RECORDS = 256
+# Journal bytes read at once (a longer record is read whole)
+READ_CHUNK = 256 * 1024
+# Seconds between two looks at the journal
+POLL_INTERVAL = 0.5
+
+
+class KitchenFull(ValueError):
+    """Raised when a ticket would take the waiting tasks over the scheduler's `max_tasks`"""
+
+
+class TicketTooLarge(ValueError):
+    """Raised when a ticket has more items than the scheduler's `max_tasks`, so it would never fit"""
+
+
+class KitchenEvent(NamedTuple):
+    """
+    One change in the kitchen: `"ticket"` (order received), `"start"` and `"done"` (an item at a station),
+    `"ready"` (every item of the order is done)
+    """
+    kind: str
+    time: float
+    order_number: int
+    item_id: str | None = None
+    station: str | None = None
+
+
+class Ticket:
+    """An order in the kitchen: `remaining` items still to finish, `longest_prep` the slowest of them"""
+    __slots__ = ("order_number", "created", "remaining", "longest_prep")
+
+    def __init__(self, order_number: int, created: float, remaining: int, longest_prep: float):
+        self.order_number = order_number
+        self.created = created
+        self.remaining = remaining
+        self.longest_prep = longest_prep
+
+
+class Task(NamedTuple):
+    """One item to prepare for a ticket"""
+    ticket: Ticket
+    item_id: str
+    station: str
+    prep_time: float
+
+
+def prep_info(item_id: str, catalog: MenuCatalog | None = None) -> tuple[str, float] | None:
+    """
+    Station and prep seconds of an item: its own `station` / `prep_time` in the menu if set,
+    else those of its category in `PREP_TIMES`. `None` for items the kitchen does not prepare.
+    """
+    item = catalog.items_by_id.get(item_id) if catalog is not None else None
+    station, prep_time = PREP_TIMES.get(parse_item_code(item_id).category, (None, None))
+    if item is not None:
+        station = item.get("station", station)
+        prep_time = item.get("prep_time", prep_time)
+    if station is None or prep_time is None:
+        return None
+    return station, prep_time
+
+
+def ticket_items(record: dict) -> list[str]:
+    """The item IDs to prepare for a journal record, one per unit (combos give their chosen options)"""
+    item_ids = []
+    for line in record["lines"]:
+        if "options" in line:
+            ids = [item_id for chosen in line["options"].values() for item_id in chosen]
+        else:
+            ids = [line["id"]]
+        item_ids.extend(ids * line["quantity"])
+    return item_ids
+
+
+class KitchenDisplay:
+    """Events for one kitchen screen, read with `drain`. Beyond `max_events` unread, the oldest are dropped."""
+
+    def __init__(self, max_events: int = MAX_DISPLAY_EVENTS):
+        self.events = deque(maxlen=max_events)
+        self.dropped = 0
+
+    def push(self, event: KitchenEvent):
+        if len(self.events) == self.events.maxlen:
+            self.dropped += 1
+        self.events.append(event)
+
+    def drain(self) -> list[KitchenEvent]:
+        """Returns and forgets the unread events, oldest first"""
+        events = list(self.events)
+        self.events.clear()
+        return events
+
+
+class KitchenScheduler:
+    """
+    Prepares tickets on the stations of `stations` (`{ station: items prepared at once }`) in the order of `policy`.
+    `waiting_count`, `open_tickets` and `ready_count` record the load.
+    """
+
+    def __init__(self, stations: dict[str, int] = KITCHEN_STATIONS, policy: str = "prep",
+                 max_tasks: int = MAX_WAITING_TASKS, catalog: MenuCatalog | None = None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy '{policy}'")
+        self.policy = policy
+        self.max_tasks = max_tasks
+        self.displays: list[KitchenDisplay] = []
+        self._free = dict(stations)
+        self._waiting = {station: [] for station in stations}
+        # (finish time, sequence, task) of the items being prepared
+        self._running = []
+        self._sequence = itertools.count()
+        self._prep_info = {}
+        self.catalog = catalog
+        self.waiting_count = 0
+        self.open_tickets = 0
+        self.ready_count = 0
+
+    def set_catalog(self, catalog: MenuCatalog):
+        """Takes station and prep times from another menu version, for the tickets submitted from now on"""
+        if catalog is not self.catalog:
+            self.catalog = catalog
+            self._prep_info = {}
+
+    def subscribe(self, max_events: int = MAX_DISPLAY_EVENTS) -> KitchenDisplay:
+        """Returns a new display receiving every event from now on"""
+        display = KitchenDisplay(max_events)
+        self.displays.append(display)
+        return display
+
+    def _publish(self, event: KitchenEvent):
+        for display in self.displays:
+            display.push(event)
+
+    def _task_info(self, item_id: str) -> tuple[str, float] | None:
+        info = self._prep_info.get(item_id, False)
+        if info is False:
+            info = self._prep_info[item_id] = prep_info(item_id, self.catalog)
+        return info
+
+    def submit(self, record: dict, now: float) -> Ticket | None:
+        """
+        Queues the items of a journal record as a ticket created at `now`, returns it
+        (`None` if the order has nothing to prepare). Raises `KitchenFull` if there is no room for its items
+        yet, `TicketTooLarge` if there never will be.
+        """
+        tasks = []
+        for item_id in ticket_items(record):
+            info = self._task_info(item_id)
+            if info is not None:
+                tasks.append((item_id, *info))
+        if not tasks:
+            return None
+        if len(tasks) > self.max_tasks:
+            raise TicketTooLarge(f"Order {record['order_number']} has {len(tasks)} items, more than the kitchen queue holds ({self.max_tasks})")
+        if self.waiting_count + len(tasks) > self.max_tasks:
+            raise KitchenFull(f"Order {record['order_number']} does not fit in the kitchen queue ({self.waiting_count} items waiting)")
+        ticket = Ticket(record["order_number"], now, len(tasks), max(task[2] for task in tasks))
+        self.open_tickets += 1
+        self._publish(KitchenEvent("ticket", now, ticket.order_number))
+        for item_id, station, prep_time in tasks:
+            if station not in self._waiting:
+                # A station named only in the menu file prepares one item at a time
+                self._waiting[station] = []
+                self._free[station] = 1
+            due = now + ticket.longest_prep - prep_time if self.policy == "prep" else now
+            heapq.heappush(self._waiting[station], (due, next(self._sequence), Task(ticket, item_id, station, prep_time)))
+        self.waiting_count += len(tasks)
+        for station in {task[1] for task in tasks}:
+            self._start(station, now)
+        return ticket
+
+    def _start(self, station: str, now: float):
+        """Starts the waiting tasks on the free places of a station, the first due first (early if need be)"""
+        waiting = self._waiting[station]
+        while waiting and self._free[station] > 0:
+            task = heapq.heappop(waiting)[2]
+            self._free[task.station] -= 1
+            self.waiting_count -= 1
+            heapq.heappush(self._running, (now + task.prep_time, next(self._sequence), task))
+            self._publish(KitchenEvent("start", now, task.ticket.order_number, task.item_id, station))
+
+    def advance(self, now: float) -> int:
+        """
+        Runs the kitchen up to `now`: every item done by then finishes at its own finish time,
+        and the place it frees takes the next task due. Returns how many items finished.
+        """
+        finished = 0
+        running = self._running
+        while running and running[0][0] <= now:
+            finish, _, task = heapq.heappop(running)
+            finished += 1
+            self._free[task.station] += 1
+            ticket = task.ticket
+            ticket.remaining -= 1
+            self._publish(KitchenEvent("done", finish, ticket.order_number, task.item_id, task.station))
+            if ticket.remaining == 0:
+                self.open_tickets -= 1
+                self.ready_count += 1
+                self._publish(KitchenEvent("ready", finish, ticket.order_number))
+            self._start(task.station, finish)
+        return finished
+
+    def next_time(self) -> float | None:
+        """Time of the next item done (tasks only wait for a place), `None` if the kitchen is idle"""
+        return self._running[0][0] if self._running else None
+
+    def queue_lengths(self) -> dict[str, int]:
+        """Items waiting at each station"""
+        return {station: len(waiting) for station, waiting in self._waiting.items()}
+
+
+class JournalFollower:
+    """
+    Reads the records appended to the journal of the current business day as they are checked out.
+    A new day's journal is read from its first record.
+    """
+
+    def __init__(self, data_dir: str, from_start: bool = False):
+        self.data_dir = data_dir
+        self.path = journal_path(data_dir)
+        self.offset = len(JOURNAL_MAGIC)
+        if not from_start:
+            # Orders already in the journal were checked out before the kitchen started
+            while consumed := sum(end - start for start, end, _ in iter_records(self._read_new(), 0)):
+                self.offset += consumed
+
+    def _read_new(self, size: int = READ_CHUNK) -> bytes:
+        """
+        Up to `size` bytes of the journal from the current offset, or more to end its first record if that is longer
+        (empty until the journal exists)
+        """
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(self.offset)
+                data = f.read(size)
+                if len(data) >= RECORD_HEADER.size:
+                    length, _ = RECORD_HEADER.unpack_from(data)
+                    missing = RECORD_HEADER.size + length - len(data)
+                    if missing > 0 and length <= MAX_RECORD_SIZE:
+                        data += f.read(missing)
+                return data
+        except FileNotFoundError:
+            return b""
+
+    def poll(self, max_records: int = MAX_POLL_RECORDS) -> list[dict]:
+        """Returns up to `max_records` records appended since the last poll (a record still being written waits for the next one)"""
+        path = journal_path(self.data_dir)
+        if path != self.path:
+            self.path, self.offset = path, len(JOURNAL_MAGIC)
+        records = []
+        while len(records) < max_records:
+            consumed = 0
+            for _, end, payload in iter_records(self._read_new(), 0):
+                records.append(json.loads(payload))
+                consumed = end
+                if len(records) == max_records:
+                    break
+            if not consumed:
+                break
+            self.offset += consumed
+        return records
+
+
+def format_event(event: KitchenEvent, catalog: MenuCatalog) -> str:
+    """One line of the kitchen display"""
+    clock = datetime.fromtimestamp(event.time).strftime("%H:%M:%S")
+    if event.item_id is None:
+        return f"{clock}  #{event.order_number:<5} {event.kind.upper()}"
+    item = catalog.items_by_id.get(event.item_id)
+    name = item["name"] if item is not None else event.item_id
+    return f"{clock}  #{event.order_number:<5} {event.kind:<6} {event.station:<8} {name}"
+
+
+def main(argv: list[str]):
+    from menu_source import MenuSource, menu_file_path
+
+    policy = argv[1] if len(argv) > 1 else "prep"
+    if policy not in POLICIES:
+        print(f"Usage: python kitchen.py [{'|'.join(POLICIES)}]", file=sys.stderr)
+        return 2
+    data_dir = get_data_dir()
+    try:
+        menu_source = MenuSource(menu_file_path(data_dir), on_error=lambda error: print(error, file=sys.stderr))
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    menu_source.start_watching()
+    scheduler = KitchenScheduler(policy=policy, catalog=menu_source.current.catalog)
+    display = scheduler.subscribe()
+    follower = JournalFollower(data_dir)
+    backlog = deque()
+    print(f"Kitchen display ({policy} scheduling), following {os.path.basename(follower.path)}", file=sys.stderr)
+    try:
+        while True:
+            scheduler.set_catalog(menu_source.current.catalog)
+            now = time.time()
+            scheduler.advance(now)
+            if not backlog:
+                backlog.extend(follower.poll())
+            while backlog:
+                try:
+                    scheduler.submit(backlog[0], now)
+                except KitchenFull:
+                    # Left in the backlog until items finish
+                    break
+                except TicketTooLarge as e:
+                    print(f"Skipped: {e}", file=sys.stderr)
+                backlog.popleft()
+            for event in display.drain():
+                print(format_event(event, scheduler.catalog), flush=True)
+            next_time = scheduler.next_time()
+            wait = POLL_INTERVAL if next_time is None else min(max(next_time - now, 0.0), POLL_INTERVAL)
+            time.sleep(wait)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        menu_source.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -1,66 +1,12 @@
-# Government Details
-GST = 0.09
-# Restaurant Details
-RESTAURANT_NAME = "Obama Fried Chicken"
-ADDRESS = "#01-234 Serangoon Central, 23, Singapore 556083"
-PHONE_NUMBER = "+65 9012 3456"
-WEBSITE = "https://obama-fried-chicken.com.sg"
-ALLOWED_ORDERS_PER_ITEM = 100
-
-# Print Receipt Details
-WIDTH_RECEIPT_TABLE_COLUMN_ID = 5
-WIDTH_RECEIPT_TABLE_COLUMN_NAME = 17    # name field display width
-WIDTH_RECEIPT_TABLE_COLUMN_TYPE = 12
-WIDTH_RECEIPT_TABLE_COLUMN_PRICE = 9
-WIDTH_RECEIPT_TABLE_COLUMN_QUANTITY = 4
-WIDTH_RECEIPT_TABLE_COLUMN_DESCRIPTION = 20
-
 import sys
 # Datasets and dataset functions
 from datetime import datetime
-
-# { id: (noun_name, plural_name, icon) }
-MENU_ITEM_IDS = {
-    "B": ("Burger", "Burgers", "🍔"),
-    "S": ("Side", "Sides", "🍟"),
-    "D": ("Drink", "Drinks", "🥤"),
-    "DS": ("Dessert", "Desserts", "🍦"),
-    "C": ("Combo", "Combos", "🥡")
-}
-
-MENU = [
-    # Burgers
-    {"id": "B01", "name": "Classic Beef Burger", "price": 5.50},
-    {"id": "B02", "name": "Chicken Burger", "price": 5.00},
-    {"id": "B03", "name": "Veggie Burger", "price": 4.80},
-    {"id": "B04", "name": "Spicy Chicken Burger", "price": 5.30},
-    # Sides
-    {"id": "S01", "name": "French Fries", "price": 2.50},
-    {"id": "S02", "name": "Onion Rings", "price": 2.80},
-    {"id": "S03", "name": "Chicken Nuggets (6pc)", "price": 3.50},
-    {"id": "S04", "name": "Cheese Sticks (4pc)", "price": 3.20},
-    # Drinks
-    {"id": "D01", "name": "Coke", "price": 1.80},
-    {"id": "D02", "name": "Sprite", "price": 1.80},
-    {"id": "D03", "name": "Ice lemon Tea", "price": 2.20},
-    {"id": "D04", "name": "Mineral water", "price": 1.50},
-    # Desserts
-    {"id": "DS01", "name": "Chocolate sundae", "price": 2.80},
-    {"id": "DS02", "name": "Vanilla cone", "price": 1.50},
-    {"id": "DS03", "name": "Apple pie", "price": 2.30},
-    {"id": "DS04", "name": "Strawberry sundae", "price": 2.80},
-    # Combos (for item reference ids, just only the alphabet id = any)
-    {"id": "C01", "name": "Burger + Fries + Drink", "item_ref_ids": { "Burger": (["B"], 1), "Fries": (["S01"], 1), "Drink": (["D"], 1) }, "price": 8.80},
-    {"id": "C02", "name": "Nuggets + Fries + Drink", "item_ref_ids": { "Nuggets": (["S03"], 1), "Fries": (["S01"], 1), "Drink": (["D"], 1)}, "price": 8.50},
-    {"id": "C03", "name": "Veggie Combo", "item_ref_ids": { "Main": (["B03"], 1), "Dessert": (["S04"], 1), "Drink": (["D04"], 1)}, "price": 8.20},
-    {"id": "C04", "name": "Kids Meal", "item_ref_ids": { "Main": (["S03", "S04"], 1), "Fries": (["S01"], 1), "Dessert": (["DS"], 1), "Drink": (["D01", "D02", "D04"], 1)}, "price": 6.50}
-]
-
-DISCOUNT_RATES = {
-    "student": 0.10,
-    "staff": 0.08,
-    "loyalty_member": 0.05
-}
+from cart import Cart, order_signature
+from catalog import MenuCatalog, parse_item_code
+from config import load_config
+from menu_data import ALLOWED_ORDERS_PER_ITEM, MENU_ITEM_IDS
+from pricing import price_cart
+from receipt import RESTAURANT_NAME, print_order_receipt
 
 def generate_item_table(items: list[dict]):
     """Returns a 2D list of items as a table"""
@@ -69,30 +15,42 @@ def generate_item_table(items: list[dict]):
         for item in items
     ]
 
+# The menu file, watched for changes while the UI runs (see menu_source.py)
+menu_source = None
+# Menu in use (with its GST and discount rates) and its indexes by item ID and category code,
+# taken from `menu_source` by `refresh_menu()` between screens
+menu_state = None
+catalog: MenuCatalog | None = None
+# Last reload error of `menu_source` shown to the cashier
+menu_error = None
+
+def refresh_menu():
+    """
+    Switches to the latest menu loaded from the menu file (called between screens, never during one),
+    and tells the cashier once when a changed menu file was refused
+    """
+    global menu_state, catalog, menu_error
+    menu_state = menu_source.current
+    catalog = menu_state.catalog
+    if menu_source.error != menu_error:
+        menu_error = menu_source.error
+        if menu_error:
+            print(f"⚠️  Menu not updated: {menu_error}\n   The previous menu stays in use.")
+
 def get_items_by_category_code(code: str):
     """Gets an item by category code"""
-    return [item for item in MENU if split_item_code(item["id"])[0] == code]
+    return catalog.get_items_by_category_code(code)
 
 def get_item_by_id(item_id: str):
     """Gets an item by its item ID"""
-    found = [item for item in MENU if item["id"] == item_id]
-    if len(found) == 0:
-        raise Exception("Item not found")
-    return found[0]
+    return catalog.get_item_by_id(item_id)
 
 def get_items_by_ids(item_ids: list[str]):
     """
     Gets items by their ids specified
     if category_code only: Retrieves all items containing the specified category code
     """
-    result = []
-    for item_id in item_ids:
-        [cat_code, item_num] = split_item_code(item_id)
-        if item_num == "":
-            result.extend(get_items_by_category_code(cat_code))
-        else:
-            result.append(get_item_by_id(item_id))
-    return result
+    return catalog.get_items_by_ids(item_ids)
 
 def parse_item_ref_ids(item_ref_ids: dict) -> list:
     """
@@ -111,42 +69,12 @@ def parse_item_ref_ids(item_ref_ids: dict) -> list:
     - `'quantity'`: how many can be selected from options
     - `'locked'`: `True` if `quantity == len(options)` (user cannot change selection)
     """
-    parsed = []
-    for section, (options, quantity) in item_ref_ids.items():
-        if quantity > len(options):
-            raise ValueError(f"Quantity for section '{section}' cannot be greater than number of options.")
-
-        parsed_options = get_items_by_ids(options)
-        parsed.append({
-            'section': section,
-            'options': parsed_options,
-            'quantity': quantity,
-            'locked': quantity == len(parsed_options)
-        })
-    return parsed
+    return catalog.parse_item_ref_ids(item_ref_ids)
 
 # Utility functions
-def condense(text, max_len):
-    """Truncates text for better display on screen to prevent misalignment"""
-    return text if len(text) <= max_len else text[:max_len-3] + "..."
-
-def split_item_code(item_code):
-    """Splits an item code into its category code and category item number."""
-    cat_code = ''
-    item_num = ''
-    for char in item_code:
-        if char.isalpha(): cat_code += char
-        else: item_num += char
-    return cat_code, item_num
-
 def compare_orders(item1, item2):
-    cat_code1 = split_item_code(item1["id"])
-    if item1["id"] != item2["id"]: return False
-    elif cat_code1 == "C":
-        for key in item1["item_ref_ids"].keys():
-            if set(item1["item_ref_ids"][key]) != set(item2["item_ref_ids"][key]):
-                return False
-    return True
+    """Checks if two orders are the same item with the same combo options"""
+    return order_signature(item1) == order_signature(item2)
 
 def display_table(data: list[list[str]], headers: list[str] = [], selected_index: int = -1, tab_space: int = 4):
     """Prints a formatted table (compatible with interactive menu selection)"""
@@ -169,85 +97,27 @@ def display_table(data: list[list[str]], headers: list[str] = [], selected_index
     print(padding, fmt_line())
 
 # User data variables
-cart = []
+cart = Cart(ALLOWED_ORDERS_PER_ITEM)
 
 # Handling functions
-def print_receipt(discount: float = 0.0):
+def save_order(discount_type: str | None, discount_rate: float) -> int:
+    """Saves the checked-out cart and returns its order number: on the order server for a thin client, otherwise to the journal"""
+    if not isinstance(cart, Cart):
+        return cart.checkout(discount_type)["order_number"]
+    # Loaded on first checkout, it is not needed to start the UI
+    from journal import open_journal
+    with open_journal() as journal:
+        return journal.append_order(cart, discount_type, discount_rate, menu_state.gst)["order_number"]
+
+def print_receipt(discount: float = 0.0, order_number: int | None = None):
     """Prints a receipt containing the items ordered as well as calculation"""
-    # Name too long, convert to smaller variables for cleaner code
-    col_id = WIDTH_RECEIPT_TABLE_COLUMN_ID
-    col_name = WIDTH_RECEIPT_TABLE_COLUMN_NAME
-    col_type = WIDTH_RECEIPT_TABLE_COLUMN_TYPE
-    col_price = WIDTH_RECEIPT_TABLE_COLUMN_PRICE
-    col_qty = WIDTH_RECEIPT_TABLE_COLUMN_QUANTITY
-    col_desc = WIDTH_RECEIPT_TABLE_COLUMN_DESCRIPTION
-
-    # Set headers accordingly
-    header_fields = (
-        f"{'No.':<3} {'ID':<{col_id}} {'Name':<{col_name}} "
-        f"{'Description':<{col_desc}} {'Type':>{col_type}} "
-        f"{'Price':>{col_price}} {'Qty':>{col_qty}}"
+    # Calculations are done in integer cents by the pricing engine
+    priced = price_cart(cart.subtotal_cents, discount, menu_state.gst)
+    print_order_receipt(
+        cart.to_lines(), priced, discount, menu_state.gst, datetime.now(),
+        # Items removed from the menu file since they were added still print with their ID
+        lambda item_id: catalog.items_by_id[item_id]["name"] if item_id in catalog else item_id, order_number
     )
-    receipt_width = len(header_fields)
-
-    # Calculations
-    subtotal = sum(item["price"] * item["quantity"] for item in cart)
-    discount_amt = round(subtotal * discount, 2)
-    discounted_subtotal = subtotal - discount_amt
-    gst = round(discounted_subtotal * GST, 2)
-    total = round(discounted_subtotal + gst, 2)
-    now = datetime.now().strftime("%d %b %Y   %H:%M")
-
-    # Print Header
-    print(f"\n{RESTAURANT_NAME:^{receipt_width}}")
-    print(f"{ADDRESS:^{receipt_width}}")
-    print(f"{'Tel: ' + PHONE_NUMBER:^{receipt_width}}")
-    print(f"{WEBSITE:^{receipt_width}}")
-    print("-" * receipt_width)
-    print(f"Date: {now}")
-    print("-" * receipt_width)
-
-    # Table Body
-    print(header_fields)
-    print("-" * receipt_width)
-    for i, item in enumerate(cart, 1):
-        type_str = "Combo" if "options" in item else "À la carte"
-        # Truncate name and description
-        disp_name = condense(item.get('name', ''), col_name)
-        disp_desc = condense(item.get('description', ''), col_desc)
-        print(f"{i:<3} {item['id']:<{col_id}} {disp_name:<{col_name}} {disp_desc:<{col_desc}} {type_str:>{col_type}} "
-              f"{item['price']:>{col_price}.2f} {item['quantity']:>{col_qty}}")
-
-        # Options (for combos)
-        if "options" in item:
-            spaces = " " * (col_id + col_name + 6)
-            for option_name, ids in item["options"].items():
-                print(spaces + f"{condense(option_name, 12)}:")
-                count = 1
-                current_id = ""
-                for item_id in ids:
-                    # Check for similarity to display quantity
-                    if current_id == item_id: count += 1
-                    else:
-                        count = 1
-                        current_id = item_id
-                    option_item_name = condense(str(count) + " " + get_item_by_id(item_id)['name'], col_name)
-                    print(spaces + f"{option_item_name}")
-    print("-" * receipt_width)
-
-    # Display calculations
-    print(f"{'Subtotal:':<{receipt_width - 10}}{subtotal:>10.2f}")
-    if discount > 0.0:
-        print(f"{f'Discount {discount*100:.0f}%:':<{receipt_width - 10}}-{discount_amt:>9.2f}")
-    print(f"{f'GST {GST*100:.0f}%:':<{receipt_width - 10}}{gst:>10.2f}")
-    print("-" * receipt_width)
-    print(f"{'TOTAL:':<{receipt_width - 10}}{total:>10.2f}")
-    print("-" * receipt_width)
-
-    # Footer
-    print()
-    print(f"{'Thank you for dining with us!':^{receipt_width}}")
-    print(f"{'We hope to see you again.':^{receipt_width}}\n")
 
 
 def handle_ui_integer_selection(question: str, allowed_min: int = -sys.maxsize, allowed_max: int = sys.maxsize, back_button: bool = False):
@@ -317,14 +187,14 @@ def handle_edit_cart():
         display_table([
             [
                 str(i + 1), cart[i]["id"],
-                MENU_ITEM_IDS[split_item_code(cart[i]["id"])[0]][1], cart[i]["name"],
+                MENU_ITEM_IDS[cart[i]["code"].category][1], cart[i]["name"],
                 f"${cart[i]["price"]:.2f}",
                 cart[i]["quantity"],
-                f"${cart[i]["price"] * cart[i]["quantity"]:.2f}"
+                f"${cart[i]["total"]:.2f}"
             ]
             for i in range(len(cart))
         ], table_headers)
-        print(f"Total: ${sum(item["price"] * item["quantity"] for item in cart):.2f}")
+        print(f"Total: ${cart.subtotal:.2f}")
     while True:
         show()
         print("Select items by their indices separated by commas or B to go back.")
@@ -364,21 +234,37 @@ def handle_edit_cart():
             if action == 0:
                 new_quantity = handle_ui_integer_selection("Please type in the new quantity.", allowed_min=1, allowed_max=100, back_button=True)
                 if new_quantity:
-                    for i in indices: cart[i]["quantity"] = new_quantity
+                    try:
+                        for i in indices: cart.set_quantity(i, new_quantity)
+                    except (OSError, ValueError) as e:
+                        # Refused by or unreachable order server (thin client)
+                        print(f"❌ Could not update the cart: {e}")
                     break
             elif action == 1:
                 if len(indices) > 1: print("❌ You can only edit 1 item at a time.")
-                elif split_item_code(cart[indices[0]]["id"])[0] != "C": print("❌ Cannot edit à la carte items. You can only edit combo items.")
+                elif cart[indices[0]]["code"].category != "C": print("❌ Cannot edit à la carte items. You can only edit combo items.")
+                elif cart[indices[0]]["id"] not in catalog:
+                    # Removed by a menu reload since it was added
+                    print(f"❌ {cart[indices[0]]["name"]} is no longer on the menu, it cannot be edited.")
                 else:
-                    combo_selected_data = handle_edit_combo(cart[indices[0]]["id"], cart[indices[0]]["options"])
+                    # Pass a copy so the cart index keeps the old options until the edit is saved
+                    combo_selected_data = handle_edit_combo(cart[indices[0]]["id"], dict(cart[indices[0]]["options"]))
                     if combo_selected_data:
-                        cart[indices[0]]["options"] = combo_selected_data
+                        try:
+                            cart.set_options(indices[0], combo_selected_data)
+                        except (OSError, ValueError) as e:
+                            print(f"❌ {e}")
+                            continue
                         break
             elif action == 2:
                 # Follow last index first method: Prevent errors from being raised when delete action is used
                 # Sort out indices in descending order
                 indices.sort(reverse=True)
-                for i in indices: cart.pop(i)
+                try:
+                    for i in indices: cart.pop(i)
+                except (OSError, ValueError) as e:
+                    print(f"❌ Could not update the cart: {e}")
+                    break
                 if len(cart) == 0:
                     print("ℹ️ There are currently no items in your cart.")
                     return None
@@ -390,7 +276,7 @@ def handle_edit_combo(item_id: str, preselected: dict = {}):
     Handles editing of a combo meal by selecting items for each section.
     Optionally takes a `preselected` dict mapping section names to lists of selected option indices.
     """
-    cat_code, _ = split_item_code(item_id)
+    cat_code = parse_item_code(item_id).category
     if cat_code != "C":
         raise ValueError("Only combo meals can be edited.")
 
@@ -399,7 +285,8 @@ def handle_edit_combo(item_id: str, preselected: dict = {}):
         raise ValueError(f"Item with ID {item_id} not in Menu")
 
     # Get icon and parse combo sections
-    parsed_sections = parse_item_ref_ids(item_info["item_ref_ids"])
+    # Resolved once per combo and menu version, then reused on every open
+    parsed_sections = catalog.resolve_combo(item_id)
     section_names = list(item_info["item_ref_ids"].keys())
 
     # Prepare initial selection state
@@ -491,14 +378,22 @@ def handle_checkout():
         back_button=True
     )
 
-    if identity == 0: discount_rate = DISCOUNT_RATES["student"]
-    elif identity == 1: discount_rate = DISCOUNT_RATES["staff"]
-    elif identity == 2: discount_rate = DISCOUNT_RATES["loyalty_member"]
-    elif identity == 3: discount_rate = 0.0
+    if identity == 0: discount_type = "student"
+    elif identity == 1: discount_type = "staff"
+    elif identity == 2: discount_type = "loyalty_member"
+    elif identity == 3: discount_type = None
     else: return None
-    
+    discount_rate = menu_state.discount_rates.get(discount_type, 0.0)
+
+    # Save the order before printing its receipt
+    order_number = None
+    try:
+        order_number = save_order(discount_type, discount_rate)
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Could not save the order: {e}")
+
     print("Printing receipt...")
-    print_receipt(discount_rate)
+    print_receipt(discount_rate, order_number)
         
 def handle_food_menu(skip_to_order: bool = False):
     header_categories = [MENU_ITEM_IDS[code][1] for code in MENU_ITEM_IDS.keys()]
@@ -523,107 +418,138 @@ def handle_food_menu(skip_to_order: bool = False):
                 )
                 if chosen_category == "back": break
                 if int(chosen_category) == 5:
-                    item_table = generate_item_table(MENU)
+                    item_table = generate_item_table(catalog.menu)
                 else:
                     code = list(MENU_ITEM_IDS.keys())[int(chosen_category)]
                     item_table = generate_item_table(get_items_by_category_code(code))
                 display_table(item_table, ["Item ID", "Item Name", "Price"])
         elif chosen_option == 1:
             skip_to_order = False
-            item_ids = [item_id["id"] for item_id in MENU]
+            matches = []
             while True:
                 print("-" * 20)
-                print("Enter the item ID you would like to order")
+                print("Enter the item ID you would like to order, or part of its name to search")
                 print("(or leave blank to go back)")
                 item_id = input(">> ")
 
                 if item_id == "":
                     break # Exit this loop, but goes back to the main food menu
-                elif item_id in item_ids:
+                elif item_id in catalog:
                     return item_id # Returns the item_id
-                
+                elif item_id.isdigit() and 1 <= int(item_id) <= len(matches):
+                    return matches[int(item_id) - 1]["id"] # Picked from the last search results
+
+                # Search item IDs and names (typos are tolerated)
+                matches = catalog.search(item_id, 10)
+                if matches:
+                    print("🔎 Matching items:")
+                    display_table(
+                        [[str(i + 1)] + row for i, row in enumerate(generate_item_table(matches))],
+                        ["No.", "Item ID", "Item Name", "Price"]
+                    )
+                    print("💡 Enter a number from the list to order that item, or type again to refine the search.")
+                    continue
                 print("❌ Invalid item ID!")
                 print("💡 If you have forgotten the item ID, you can go back and use the Browse Menu option.")
         elif chosen_option == "back": break
 
 # Main code
 
-# Just to make restaurant title nicer
-title_header = "| " + RESTAURANT_NAME + " |"
-bar_header = f"+{'-' * (len(title_header) - 2)}+"
-while True:
-    print(bar_header)
-    print(title_header)
-    print(bar_header)
-    print()
-    tab_selection = handle_ui_menu_selection("What would you like to do?",
-        options=["Browse and Order", "View and Edit cart", "Checkout", "Quit"],
-        option_icons=["🔍", "🛒", "💳", "🚪"]
-    )
+def main():
+    """Runs the legacy UI until the customer checks out or quits"""
+    global menu_source, cart
+    address = load_config().get("order_server", {}).get("address")
+    if address:
+        # Thin client: the order server owns the menu, the cart and order numbers
+        from order_client import connect_kiosk
+        menu_source, cart = connect_kiosk(address)
+    else:
+        from menu_source import open_menu_source
+        try:
+            menu_source = open_menu_source(watch=True)
+        except ValueError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return 1
+
+    # Just to make restaurant title nicer
+    title_header = "| " + RESTAURANT_NAME + " |"
+    bar_header = f"+{'-' * (len(title_header) - 2)}+"
+    while True:
+        refresh_menu()
+        print(bar_header)
+        print(title_header)
+        print(bar_header)
+        print()
+        tab_selection = handle_ui_menu_selection("What would you like to do?",
+            options=["Browse and Order", "View and Edit cart", "Checkout", "Quit"],
+            option_icons=["🔍", "🛒", "💳", "🚪"]
+        )
 
-    if tab_selection == 0:
-        selected_item = handle_food_menu()
-        if selected_item == None:
-            continue
-        completed = False
-        combo_preselected_data = {}
-        while not completed:
-            code, num = split_item_code(selected_item)
-            if code == "C":
-                # Enable combo editing
-                combo_selected_data = handle_edit_combo(selected_item, combo_preselected_data)
-                if combo_selected_data is None:
-                    combo_preselected_data = {}
-                    selected_item = handle_food_menu(True)
-                    if selected_item is None:
-                        # Since user chooses to go back break this loop to go back to the main loop
-                        break
-                    continue
-                combo_preselected_data = combo_selected_data
-            quantity = handle_ui_integer_selection(
-                f"Please enter quantity for item {selected_item}:",
-                allowed_min=1,
-                allowed_max=ALLOWED_ORDERS_PER_ITEM,
-                back_button=True
-            )
-            if quantity is None:
-                if code != "C":
-                    # If it is not a combo meal go back to menu selection
-                    selected_item = handle_food_menu(True)
-                    if selected_item is None:
-                        # Since user chooses to go back break this loop to go back to the main loop
-                        break
+        if tab_selection == 0:
+            selected_item = handle_food_menu()
+            if selected_item == None:
                 continue
-            # Store into an order variable
-            added_item = get_item_by_id(selected_item)
-            order: dict[str, dict | str | int] = { "id": selected_item, "name": added_item["name"], "price": added_item["price"], "quantity": quantity }
-            if code == "C":
-                order["options"] = combo_preselected_data
-            
-            overflow = False
-            found_similar_item = False
-            for i in range(len(cart)):
-                if compare_orders(order, cart[i]):
-                    total_quantity = cart[i]["quantity"] + order["quantity"]
-                    if total_quantity > ALLOWED_ORDERS_PER_ITEM:
-                        overflow = True
-                        print(f"❌ You ordered {total_quantity} of this item. Max is {ALLOWED_ORDERS_PER_ITEM}.")
-                    else:
-                        cart[i]["quantity"] += order["quantity"]
-                        found_similar_item = True
-            
-            if overflow: continue
-            if not found_similar_item: cart.append(order)
-            # Display added to cart message
-            print(f"✅ Successfully added {quantity} item{"s" if quantity > 1 else ""} of ({order["id"]}) {order["name"]} to cart")
-            completed = True
-        if not completed: continue
-    elif tab_selection == 1: handle_edit_cart()
-    elif tab_selection == 2:
-        handle_checkout()
-        print("--- Press enter to exit the program")
-        input()
-        break
-    else:
-        print("👋 Goodbye!")
-        break
\ No newline at end of file
+            completed = False
+            combo_preselected_data = {}
+            while not completed:
+                code = parse_item_code(selected_item).category
+                if code == "C":
+                    # Enable combo editing
+                    combo_selected_data = handle_edit_combo(selected_item, combo_preselected_data)
+                    if combo_selected_data is None:
+                        combo_preselected_data = {}
+                        selected_item = handle_food_menu(True)
+                        if selected_item is None:
+                            # Since user chooses to go back break this loop to go back to the main loop
+                            break
+                        continue
+                    combo_preselected_data = combo_selected_data
+                quantity = handle_ui_integer_selection(
+                    f"Please enter quantity for item {selected_item}:",
+                    allowed_min=1,
+                    allowed_max=ALLOWED_ORDERS_PER_ITEM,
+                    back_button=True
+                )
+                if quantity is None:
+                    if code != "C":
+                        # If it is not a combo meal go back to menu selection
+                        selected_item = handle_food_menu(True)
+                        if selected_item is None:
+                            # Since user chooses to go back break this loop to go back to the main loop
+                            break
+                    continue
+                # Store into an order variable
+                added_item = get_item_by_id(selected_item)
+                order: dict[str, dict | str | int] = { "id": selected_item, "code": added_item["code"], "name": added_item["name"], "price": added_item["price"], "quantity": quantity }
+                if code == "C":
+                    order["options"] = combo_preselected_data
+
+                # Identical orders (same item and combo options) are merged by the cart index
+                similar_item = cart.find(order)
+                total_quantity = order["quantity"] + (similar_item["quantity"] if similar_item else 0)
+                if total_quantity > ALLOWED_ORDERS_PER_ITEM:
+                    print(f"❌ You ordered {total_quantity} of this item. Max is {ALLOWED_ORDERS_PER_ITEM}.")
+                    continue
+                try:
+                    cart.add(order)
+                except (OSError, ValueError) as e:
+                    # Refused by or unreachable order server (thin client): back to the main menu
+                    print(f"❌ Could not add the item to the cart: {e}")
+                    break
+                # Display added to cart message
+                print(f"✅ Successfully added {quantity} item{"s" if quantity > 1 else ""} of ({order["id"]}) {order["name"]} to cart")
+                completed = True
+            if not completed: continue
+        elif tab_selection == 1: handle_edit_cart()
+        elif tab_selection == 2:
+            handle_checkout()
+            print("--- Press enter to exit the program")
+            input()
+            break
+        else:
+            print("👋 Goodbye!")
+            break
+
+
+if __name__ == "__main__":
+    sys.exit(main())
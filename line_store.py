@@ -0,0 +1,362 @@
+"""
+Columnar store of order lines for analytics.
+
+Journal records keep each line as a dict of strings and numbers; here every line is one row across typed
+`array` columns, with item IDs, discount types and combo selections interned in lookup lists:
+- `items`: item index (uint32) into `item_ids`
+- `quantities`: uint16
+- `prices`: unit price in integer cents (uint32)
+- `times`: the order's local time, as seconds since 1970-01-01 (uint32, no time zone)
+- `discounts`: discount index (uint8) into `discount_types` (`None` is index 0)
+- `options`: selection index (uint32) into `option_sets`, `(combo_id, ((section, item_id)...))`
+  (`None`, index 0, for lines that are not combos); a day has few distinct selections
+
+Filters (`select`) and group-by sums (`group_sum`, `option_sum`) run on NumPy views of the columns when NumPy
+is installed, without copying them, and as plain loops otherwise. Sums are exact integers either way.
+
+Saved as `<magic: 8 bytes> <format version: uint32 LE> <rows: uint32 LE> <crc32 of payload: uint32 LE>`
+followed by a `marshal` payload of the lookup lists and the little-endian column bytes.
+
+Run with: python line_store.py <journal file> <store file> (converts a journal)
+"""
+import json
+import marshal
+import os
+import struct
+import sys
+import zlib
+from array import array
+from datetime import date, datetime, timedelta
+
+from catalog import parse_item_code
+from journal import JOURNAL_MAGIC, iter_records
+
+STORE_MAGIC = b"FFLINE01"
+STORE_HEADER = struct.Struct("<III")
+FORMAT_VERSION = 1
+MARSHAL_VERSION = 4
+# { column: array typecode }
+COLUMNS = {"items": "I", "quantities": "H", "prices": "I", "times": "I", "discounts": "B", "options": "I"}
+GROUPS = ("item", "category", "discount", "hour", "day")
+VALUES = ("total", "quantity", "lines")
+EPOCH = datetime(1970, 1, 1)
+SECONDS_PER_DAY = 86400
+
+
+def local_seconds(timestamp: str) -> int:
+    """Seconds since 1970-01-01 of a record's local ISO time, e.g. `"2024-05-01T12:30:00"`"""
+    return int((datetime.fromisoformat(timestamp) - EPOCH).total_seconds())
+
+
+def _numpy():
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+    return np
+
+
+def _view(np, column: array):
+    """NumPy view of an array column (no copy; the column cannot grow while the view exists)"""
+    return np.frombuffer(column, dtype=column.typecode)
+
+
+def _remap(column: array, mapping: list[int]) -> array:
+    """A copy of a column of lookup indexes, translated by `mapping`"""
+    if all(i == position for i, position in enumerate(mapping)):
+        return array(column.typecode, column)
+    return array(column.typecode, (mapping[i] for i in column))
+
+
+def day_label(days: int) -> date:
+    """The date `days` days after 1970-01-01"""
+    return (EPOCH + timedelta(days=days)).date()
+
+
+class OrderLineStore:
+    """Order lines in typed columns (see the module docstring); `len(store)` is the number of lines"""
+
+    def __init__(self):
+        self.item_ids: list[str] = []
+        self.discount_types: list[str | None] = [None]
+        self.option_sets: list[tuple | None] = [None]
+        self._item_index = {}
+        self._discount_index = {None: 0}
+        self._option_index = {None: 0}
+        for name, typecode in COLUMNS.items():
+            setattr(self, name, array(typecode))
+
+    def __len__(self):
+        return len(self.items)
+
+    def _intern(self, values: list, index: dict, value) -> int:
+        position = index.get(value)
+        if position is None:
+            position = index[value] = len(values)
+            values.append(value)
+        return position
+
+    def add_record(self, record: dict):
+        """Appends the lines of a journal record"""
+        seconds = local_seconds(record["time"])
+        discount = self._intern(self.discount_types, self._discount_index, record["discount_type"])
+        for line in record["lines"]:
+            self.items.append(self._intern(self.item_ids, self._item_index, line["id"]))
+            self.quantities.append(line["quantity"])
+            self.prices.append(line["price"])
+            self.times.append(seconds)
+            self.discounts.append(discount)
+            selection = None
+            if "options" in line:
+                choices = tuple((section, item_id) for section, chosen in line["options"].items() for item_id in chosen)
+                selection = (line["id"], choices)
+            self.options.append(self._intern(self.option_sets, self._option_index, selection))
+
+    @classmethod
+    def from_records(cls, records) -> "OrderLineStore":
+        store = cls()
+        for record in records:
+            store.add_record(record)
+        return store
+
+    @classmethod
+    def from_journal(cls, path: str) -> "OrderLineStore":
+        """Store of every valid record of a journal file"""
+        with open(path, "rb") as f:
+            data = f.read()
+        if data[:len(JOURNAL_MAGIC)] != JOURNAL_MAGIC:
+            raise ValueError(f"{path} is not an order journal")
+        return cls.from_records(json.loads(payload) for _, _, payload in iter_records(data))
+
+    def extend(self, other: "OrderLineStore"):
+        """Appends the lines of another store (or of itself), mapping its lookup lists onto this store's"""
+        item_map = [self._intern(self.item_ids, self._item_index, item_id) for item_id in other.item_ids]
+        discount_map = [self._intern(self.discount_types, self._discount_index, value) for value in other.discount_types]
+        option_map = [self._intern(self.option_sets, self._option_index, selection) for selection in other.option_sets]
+        # Every column is copied before it is appended, so a store can be extended with itself
+        self.items.extend(_remap(other.items, item_map))
+        self.discounts.extend(_remap(other.discounts, discount_map))
+        self.options.extend(_remap(other.options, option_map))
+        for name in ("quantities", "prices", "times"):
+            getattr(self, name).extend(array(COLUMNS[name], getattr(other, name)))
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the columns"""
+        return sum(len(column) * column.itemsize for column in self._columns().values())
+
+    def _columns(self) -> dict[str, array]:
+        return {name: getattr(self, name) for name in COLUMNS}
+
+    def _labels(self, by: str) -> tuple[list, array | list]:
+        """`(labels, key of each line)` for a grouping: line keys index into labels"""
+        if by == "item":
+            return self.item_ids, self.items
+        if by == "discount":
+            return self.discount_types, self.discounts
+        if by == "category":
+            labels = sorted({parse_item_code(item_id).category for item_id in self.item_ids})
+            positions = {label: i for i, label in enumerate(labels)}
+            category_of_item = array("I", (positions[parse_item_code(item_id).category] for item_id in self.item_ids))
+            return labels, category_of_item
+        raise ValueError(f"Unknown grouping '{by}', expected one of {', '.join(GROUPS)}")
+
+    def select(self, item_ids=None, categories=None, discount_types=None, start: datetime | None = None, end: datetime | None = None):
+        """
+        Mask of the lines matching every filter given: item IDs, category codes, discount types (with `None` for no discount)
+        and local time from `start` (inclusive) to `end` (exclusive).
+        A NumPy bool array, or a list of bools without NumPy; pass it as `where` to the sums.
+        """
+        wanted_items = None
+        if item_ids is not None or categories is not None:
+            wanted_items = [
+                (item_ids is None or item_id in item_ids) and (categories is None or parse_item_code(item_id).category in categories)
+                for item_id in self.item_ids
+            ]
+        wanted_discounts = None
+        if discount_types is not None:
+            wanted_discounts = [discount_type in discount_types for discount_type in self.discount_types]
+        low = int((start - EPOCH).total_seconds()) if start is not None else None
+        high = int((end - EPOCH).total_seconds()) if end is not None else None
+        np = _numpy()
+        if np is None:
+            return [
+                (wanted_items is None or wanted_items[item]) and (wanted_discounts is None or wanted_discounts[discount])
+                and (low is None or seconds >= low) and (high is None or seconds < high)
+                for item, discount, seconds in zip(self.items, self.discounts, self.times)
+            ]
+        mask = np.ones(len(self), dtype=bool)
+        if wanted_items is not None:
+            mask &= np.asarray(wanted_items, dtype=bool)[_view(np, self.items)]
+        if wanted_discounts is not None:
+            mask &= np.asarray(wanted_discounts, dtype=bool)[_view(np, self.discounts)]
+        times = _view(np, self.times)
+        if low is not None:
+            mask &= times >= low
+        if high is not None:
+            mask &= times < high
+        return mask
+
+    def group_sum(self, by: str, value: str = "total", where=None) -> dict:
+        """
+        Sums `value` (`"total"`: price x quantity in cents, `"quantity"`, or `"lines"`: a count) per group of lines:
+        `"item"` (item ID), `"category"` (category code), `"discount"` (discount type), `"hour"` (0-23)
+        or `"day"` (`datetime.date`). Only the lines of the `where` mask (see `select`) if given.
+        Returns `{ group: sum }` for the groups with lines.
+        """
+        if value not in VALUES:
+            raise ValueError(f"Unknown value '{value}', expected one of {', '.join(VALUES)}")
+        np = _numpy()
+        if np is None:
+            return self._group_sum_loop(by, value, where)
+        labels = offset = None
+        if by in ("hour", "day"):
+            times = _view(np, self.times)
+            keys = times // 3600 % 24 if by == "hour" else times // SECONDS_PER_DAY
+        else:
+            labels, line_keys = self._labels(by)
+            keys = _view(np, line_keys)
+            if by == "category":
+                keys = keys[_view(np, self.items)]
+        if where is not None:
+            keys = keys[where]
+        if by == "day" and len(keys):
+            offset = int(keys.min())
+            keys = keys - offset
+        counts = np.bincount(keys)
+        if value == "lines":
+            sums = counts
+        else:
+            weights = _view(np, self.quantities).astype(np.int64)
+            if value == "total":
+                weights *= _view(np, self.prices)
+            if where is not None:
+                weights = weights[where]
+            # float64 sums are exact up to 2**53 cents
+            sums = np.rint(np.bincount(keys, weights=weights)).astype(np.int64)
+        groups = np.flatnonzero(counts).tolist()
+        sums = sums.tolist()
+        if by == "hour":
+            return {group: sums[group] for group in groups}
+        if by == "day":
+            return {day_label(group + offset): sums[group] for group in groups}
+        return {labels[group]: sums[group] for group in groups}
+
+    def _group_sum_loop(self, by: str, value: str, where) -> dict:
+        """`group_sum` without NumPy"""
+        if by == "hour":
+            keys = [seconds // 3600 % 24 for seconds in self.times]
+        elif by == "day":
+            keys = [day_label(seconds // SECONDS_PER_DAY) for seconds in self.times]
+        else:
+            labels, line_keys = self._labels(by)
+            if by == "category":
+                keys = [labels[line_keys[item]] for item in self.items]
+            else:
+                keys = [labels[key] for key in line_keys]
+        sums = {}
+        for row, key in enumerate(keys):
+            if where is not None and not where[row]:
+                continue
+            if value == "lines":
+                amount = 1
+            elif value == "quantity":
+                amount = self.quantities[row]
+            else:
+                amount = self.prices[row] * self.quantities[row]
+            sums[key] = sums.get(key, 0) + amount
+        return sums
+
+    def option_sum(self, where=None) -> dict:
+        """
+        Quantity chosen of each combo option, `{ (combo_id, section, item_id): quantity }`,
+        over the combo lines of the `where` mask (see `select`) if given
+        """
+        np = _numpy()
+        if np is None:
+            quantities = [0] * len(self.option_sets)
+            for row, (selection, quantity) in enumerate(zip(self.options, self.quantities)):
+                if where is None or where[row]:
+                    quantities[selection] += quantity
+        else:
+            options = _view(np, self.options)
+            weights = _view(np, self.quantities)
+            if where is not None:
+                options, weights = options[where], weights[where]
+            quantities = np.rint(np.bincount(options, weights=weights, minlength=len(self.option_sets))).astype(np.int64).tolist()
+        sums = {}
+        for selection, quantity in zip(self.option_sets, quantities):
+            if selection is None or not quantity:
+                continue
+            combo_id, choices = selection
+            for section, item_id in choices:
+                key = (combo_id, section, item_id)
+                sums[key] = sums.get(key, 0) + quantity
+        return sums
+
+    def to_bytes(self) -> bytes:
+        """The store in its file format"""
+        columns = {}
+        for name, column in self._columns().items():
+            if sys.byteorder != "little":
+                column = array(column.typecode, column)
+                column.byteswap()
+            columns[name] = column.tobytes()
+        payload = marshal.dumps({
+            "item_ids": self.item_ids, "discount_types": self.discount_types, "option_sets": self.option_sets, "columns": columns
+        }, MARSHAL_VERSION)
+        return STORE_MAGIC + STORE_HEADER.pack(FORMAT_VERSION, len(self), zlib.crc32(payload)) + payload
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "OrderLineStore":
+        """Reads a store from its file format, raising `ValueError` if it is not one or is corrupt"""
+        start = len(STORE_MAGIC) + STORE_HEADER.size
+        if len(data) < start or data[:len(STORE_MAGIC)] != STORE_MAGIC:
+            raise ValueError("Not an order line store")
+        version, rows, checksum = STORE_HEADER.unpack_from(data, len(STORE_MAGIC))
+        payload = memoryview(data)[start:]
+        if version != FORMAT_VERSION or zlib.crc32(payload) != checksum:
+            raise ValueError("Order line store is corrupt or of another format version")
+        document = marshal.loads(payload)
+        store = cls()
+        store.item_ids, store.discount_types, store.option_sets = document["item_ids"], document["discount_types"], document["option_sets"]
+        store._item_index = {value: i for i, value in enumerate(store.item_ids)}
+        store._discount_index = {value: i for i, value in enumerate(store.discount_types)}
+        store._option_index = {value: i for i, value in enumerate(store.option_sets)}
+        for name, typecode in COLUMNS.items():
+            column = array(typecode)
+            column.frombytes(document["columns"][name])
+            if sys.byteorder != "little":
+                column.byteswap()
+            setattr(store, name, column)
+        if any(len(column) != rows for column in store._columns().values()):
+            raise ValueError("Order line store is corrupt")
+        return store
+
+    def save(self, path: str) -> int:
+        """Writes the store atomically, returns its size in bytes"""
+        data = self.to_bytes()
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        return len(data)
+
+    @classmethod
+    def load(cls, path: str) -> "OrderLineStore":
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+def main(argv: list[str]):
+    if len(argv) != 3:
+        print("Usage: python line_store.py <journal file> <store file>", file=sys.stderr)
+        return 2
+    store = OrderLineStore.from_journal(argv[1])
+    size = store.save(argv[2])
+    print(f"{len(store):,} order lines written to {argv[2]} ({size:,} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -1,14 +1,28 @@
+"""
+Entry point of the ordering system: `python main.py`.
+
+Importing this module (or `interactive` / `legacy`) has no side effects; the chosen UI is only imported
+and started by `main()`.
+"""
 import sys
 
 INTERACTIVE = False
 
-if INTERACTIVE and sys.stdin.isatty():
-    __import__("interactive")
-else:
-    if INTERACTIVE:
-        # User tried to use interactive mode but failed
-        print("=== FALLBACK TO LEGACY MODE")
-        print("Your terminal does not support interactive mode, so we've automatically switched to legacy mode for you.")
+
+def main():
+    """Starts the interactive UI on a real terminal, the legacy UI otherwise"""
+    if INTERACTIVE and sys.stdin.isatty():
+        from interactive import main as run_ui
     else:
-        print("=== SWITCHED TO LEGACY MODE")
-    __import__("legacy")
\ No newline at end of file
+        if INTERACTIVE:
+            # User tried to use interactive mode but failed
+            print("=== FALLBACK TO LEGACY MODE")
+            print("Your terminal does not support interactive mode, so we've automatically switched to legacy mode for you.")
+        else:
+            print("=== SWITCHED TO LEGACY MODE")
+        from legacy import main as run_ui
+    return run_ui()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
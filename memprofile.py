@@ -0,0 +1,214 @@
+"""
+Memory-profiling mode for long-running kiosks, built on `tracemalloc`.
+
+Off by default; `start_from_config` turns it on when `memory_profile.enabled` is set in config.json
+(tracing slows allocations down, so it is meant for a kiosk under investigation, not for every till).
+Every `memory_profile.interval` seconds a snapshot is taken and the memory still allocated is attributed to
+a subsystem (`SUBSYSTEMS`) by the innermost project module on each allocation's traceback, so a list grown
+by `json.loads` in menu_source.py counts for the catalog. The first snapshot is the baseline.
+
+Each snapshot appends a JSON line (`{"time", "pid", "uptime", "traced", "peak", "subsystems", "growth"}`, in bytes,
+`growth` since the baseline; `traced` and `peak` are tracemalloc's totals, the profiler's own snapshots included)
+to `memory-YYYYMMDD.jsonl` in the data directory.
+When the growth since the baseline passes `memory_profile.threshold_mb` (then twice that, and so on),
+an alert is logged to the same file and a report is written next to it, `memory-report-YYYYMMDD-HHMMSS-<pid>.txt`:
+the subsystems at baseline and now, and the source lines and tracebacks that grew the most.
+A report can also be requested with `SIGUSR2`.
+
+Run with: python memprofile.py [YYYYMMDD | file]  (prints each process's memory over time from a log)
+"""
+import json
+import os
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+from config import PROJECT_DIR
+
+INTERVAL = 300.0
+THRESHOLD_MB = 20.0
+# Frames kept per allocation: enough to get from the standard library back to the project module calling it
+FRAMES = 16
+TOP_LINES = 15
+TOP_TRACEBACKS = 5
+REPORT_SIGNAL = getattr(signal, "SIGUSR2", None)
+
+# Project modules of each subsystem; other project code counts as "other", allocations outside it as "python"
+SUBSYSTEMS = {
+    "catalog": ("catalog.py", "menu_data.py", "menu_source.py", "menu_snapshot.py", "search.py"),
+    "cart": ("cart.py", "pricing.py", "order_client.py"),
+    "renderer": ("screen.py", "receipt.py"),
+    "journal": ("journal.py", "archive.py"),
+    "ui": ("interactive.py", "legacy.py", "keyboard.py"),
+    "instrumentation": ("metrics.py",),
+}
+MODULE_SUBSYSTEMS = {os.path.join(PROJECT_DIR, module): name for name, modules in SUBSYSTEMS.items() for module in modules}
+
+
+def subsystem_of(traceback: tracemalloc.Traceback) -> str:
+    """Subsystem of the innermost project frame of a traceback"""
+    for frame in reversed(traceback):
+        if frame.filename.startswith(PROJECT_DIR + os.sep):
+            return MODULE_SUBSYSTEMS.get(frame.filename, "other")
+    return "python"
+
+
+def take_snapshot() -> tracemalloc.Snapshot:
+    """A snapshot without the profiler's own allocations (including the source lines cached for its reports)"""
+    return tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__, all_frames=True),
+    ])
+
+
+def subsystem_sizes(snapshot: tracemalloc.Snapshot) -> dict[str, int]:
+    """`{ subsystem: bytes allocated }` of a snapshot"""
+    sizes = dict.fromkeys([*SUBSYSTEMS, "other", "python"], 0)
+    for statistic in snapshot.statistics("traceback"):
+        sizes[subsystem_of(statistic.traceback)] += statistic.size
+    return sizes
+
+
+class MemoryProfiler:
+    """Periodic snapshots of a process's traced memory, compared with the first one"""
+
+    def __init__(self, data_dir: str, threshold: int = int(THRESHOLD_MB * 1e6)):
+        self.data_dir = data_dir
+        self.threshold = threshold
+        self.next_alert = threshold
+        self.baseline = None
+        self.baseline_sizes = None
+        self.started = time.monotonic()
+        self._lock = threading.RLock()
+
+    def log_path(self) -> str:
+        return os.path.join(self.data_dir, f"memory-{datetime.now():%Y%m%d}.jsonl")
+
+    def _log(self, entry: dict):
+        # One append per line, so kiosks sharing the data directory do not interleave
+        fd = os.open(self.log_path(), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, (json.dumps(entry) + "\n").encode("utf-8"))
+        finally:
+            os.close(fd)
+
+    def sample(self) -> dict:
+        """Takes and logs a snapshot (the first becomes the baseline), alerting and reporting past the threshold"""
+        with self._lock:
+            snapshot = take_snapshot()
+            sizes = subsystem_sizes(snapshot)
+            if self.baseline is None:
+                self.baseline, self.baseline_sizes = snapshot, sizes
+            traced, peak = tracemalloc.get_traced_memory()
+            entry = {
+                "time": datetime.now().isoformat(timespec="seconds"), "pid": os.getpid(),
+                "uptime": round(time.monotonic() - self.started, 1), "traced": traced, "peak": peak,
+                "subsystems": sizes, "growth": {name: size - self.baseline_sizes.get(name, 0) for name, size in sizes.items()},
+            }
+            self._log(entry)
+            growth = sum(entry["growth"].values())
+            if growth >= self.next_alert:
+                path = self.write_report(snapshot, sizes)
+                self._log({"time": entry["time"], "pid": entry["pid"], "alert": f"memory grew by {growth / 1e6:,.1f} MB since the baseline", "report": path})
+                while self.next_alert <= growth:
+                    self.next_alert += self.threshold
+            return entry
+
+    def report(self, snapshot: tracemalloc.Snapshot, sizes: dict[str, int]) -> str:
+        """Text report of the growth from the baseline to `snapshot`"""
+        traced, peak = tracemalloc.get_traced_memory()
+        lines = [
+            f"Memory report, pid {os.getpid()}, {datetime.now():%Y-%m-%d %H:%M:%S}, up {time.monotonic() - self.started:,.0f}s",
+            f"Traced: {traced / 1e6:,.1f} MB now, {peak / 1e6:,.1f} MB peak",
+            "",
+            f"{'Subsystem':<16} {'Baseline (KB)':>14} {'Now (KB)':>12} {'Growth (KB)':>12}",
+        ]
+        for name, size in sizes.items():
+            base = self.baseline_sizes.get(name, 0)
+            lines.append(f"{name:<16} {base / 1e3:>14,.1f} {size / 1e3:>12,.1f} {(size - base) / 1e3:>+12,.1f}")
+        lines += ["", f"Top {TOP_LINES} source lines by growth:"]
+        for difference in snapshot.compare_to(self.baseline, "lineno")[:TOP_LINES]:
+            frame = difference.traceback[0]
+            filename = os.path.relpath(frame.filename, PROJECT_DIR) if frame.filename.startswith(PROJECT_DIR + os.sep) else frame.filename
+            lines.append(f"  {difference.size_diff / 1e3:>+10,.1f} KB {difference.count_diff:>+8,} blocks  {filename}:{frame.lineno}")
+        lines += ["", f"Top {TOP_TRACEBACKS} tracebacks by growth:"]
+        for difference in snapshot.compare_to(self.baseline, "traceback")[:TOP_TRACEBACKS]:
+            lines.append(f"  {difference.size_diff / 1e3:+,.1f} KB in {difference.count_diff:+,} blocks ({subsystem_of(difference.traceback)})")
+            lines += ["    " + line for line in difference.traceback.format(most_recent_first=True)]
+        return "\n".join(lines) + "\n"
+
+    def write_report(self, snapshot: tracemalloc.Snapshot | None = None, sizes: dict[str, int] | None = None) -> str:
+        """Writes a report to the data directory (of a new snapshot by default), returns its path"""
+        with self._lock:
+            if snapshot is None:
+                snapshot = take_snapshot()
+                sizes = subsystem_sizes(snapshot)
+            if self.baseline is None:
+                self.baseline, self.baseline_sizes = snapshot, sizes
+            path = os.path.join(self.data_dir, f"memory-report-{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(self.report(snapshot, sizes))
+            return path
+
+    def _loop(self, interval: float):
+        while True:
+            time.sleep(interval)
+            try:
+                self.sample()
+            except OSError:
+                pass
+
+
+def start(data_dir: str, interval: float = INTERVAL, threshold_mb: float = THRESHOLD_MB, frames: int = FRAMES) -> MemoryProfiler:
+    """Starts tracing allocations and sampling them every `interval` seconds in a background thread"""
+    tracemalloc.start(frames)
+    profiler = MemoryProfiler(data_dir, int(threshold_mb * 1e6))
+    if REPORT_SIGNAL is not None and threading.current_thread() is threading.main_thread():
+        # Written from a thread: a snapshot takes a while, the UI should not wait on it
+        signal.signal(REPORT_SIGNAL, lambda *_: threading.Thread(target=profiler.write_report, daemon=True).start())
+    threading.Thread(target=profiler._loop, args=(interval,), daemon=True).start()
+    return profiler
+
+
+def start_from_config(config: dict) -> MemoryProfiler | None:
+    """Starts the profiler if `memory_profile.enabled` is set in the config"""
+    settings = config.get("memory_profile", {})
+    if not settings.get("enabled"):
+        return None
+    from config import get_data_dir
+    return start(
+        get_data_dir(config), settings.get("interval", INTERVAL), settings.get("threshold_mb", THRESHOLD_MB), settings.get("frames", FRAMES)
+    )
+
+
+def main(argv: list[str]):
+    from config import get_data_dir
+    arg = argv[1] if len(argv) > 1 else None
+    if arg and not (len(arg) == 8 and arg.isdigit()):
+        path = arg
+    else:
+        day = datetime.strptime(arg, "%Y%m%d") if arg else datetime.now()
+        path = os.path.join(get_data_dir(), f"memory-{day:%Y%m%d}.jsonl")
+    if not os.path.exists(path):
+        print(f"No memory log at {path}", file=sys.stderr)
+        return 1
+    names = [*SUBSYSTEMS, "other", "python"]
+    with open(path, encoding="utf-8") as f:
+        entries = [json.loads(line) for line in f]
+    for pid in dict.fromkeys(entry["pid"] for entry in entries):
+        print(f"pid {pid} (KB)")
+        print(f"  {'Time':<20} {'Traced':>9} " + " ".join(f"{name[:9]:>9}" for name in names))
+        for entry in entries:
+            if entry["pid"] != pid:
+                continue
+            if "alert" in entry:
+                print(f"  {entry['time']:<20} ALERT: {entry['alert']} ({entry['report']})")
+            else:
+                print(f"  {entry['time']:<20} {entry['traced'] / 1e3:>9,.0f} " + " ".join(f"{entry['subsystems'].get(name, 0) / 1e3:>9,.0f}" for name in names))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
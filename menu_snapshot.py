@@ -0,0 +1,146 @@
+"""
+Precompiled binary snapshot of the menu catalog, for fast kiosk starts.
+
+The snapshot holds the menu items, the category indexes, every combo's resolved sections
+(as item positions, with identical option lists stored once) and the menu settings (GST, discount rates),
+so loading it skips parsing and indexing the menu file. `MenuSource` (menu_source.py) reads it at start-up
+and writes it after building a catalog from `menu.json`; there is no other loader.
+It is stored as `menu.snapshot` next to `menu.json`, in the `database.dir` of config.json:
+- file header: `SNAPSHOT_MAGIC` (8 bytes)
+- `<format version: uint32 LE> <SHA-256 of the bytes of menu.json: 32 bytes> <crc32 of payload: uint32 LE>`
+- payload: `marshal` data
+
+A snapshot is only used if its format version and the hash of the current menu.json match and its checksum
+is intact; otherwise the catalog is built from menu.json and the snapshot rewritten.
+
+Run with: python menu_snapshot.py (builds the snapshot ahead of time)
+"""
+import marshal
+import os
+import struct
+import sys
+import zlib
+
+from catalog import MenuCatalog, parse_item_code
+from config import get_data_dir
+
+SNAPSHOT_MAGIC = b"FFMENU01"
+SNAPSHOT_HEADER = struct.Struct("<I32sI")
+# Bumped whenever the payload layout or the checks of the menu file change, so older snapshots are rebuilt
+FORMAT_VERSION = 3
+# Marshal format readable by every supported Python version
+MARSHAL_VERSION = 4
+SNAPSHOT_FILE = "menu.snapshot"
+
+
+def snapshot_path(data_dir: str | None = None) -> str:
+    """Path of the menu snapshot in a data directory (the configured one by default)"""
+    return os.path.join(data_dir or get_data_dir(), SNAPSHOT_FILE)
+
+
+def compile_snapshot(catalog: MenuCatalog, settings: dict | None = None) -> dict:
+    """
+    Returns the snapshot payload of a catalog (resolving every combo, so an invalid one raises here):
+    - `menu`: the items, without their parsed `"code"`
+    - `categories`: `{ category_code: [item positions...] }`
+    - `option_lists`: distinct option lists of combo sections, as item positions
+    - `combos`: `{ combo_id: [(section, option list number, quantity, locked)...] }`
+    - `settings`: any other marshalable values loaded with the menu
+    """
+    positions = {item["id"]: i for i, item in enumerate(catalog.menu)}
+    option_lists = []
+    # Sections listing the same item IDs/category codes resolve to the same options (e.g. every "B" wildcard)
+    option_list_numbers = {}
+    combos = {}
+    for item in catalog.menu:
+        if "item_ref_ids" not in item:
+            continue
+        sections = []
+        for section, (options, quantity) in item["item_ref_ids"].items():
+            if quantity > len(options):
+                raise ValueError(f"Quantity for section '{section}' cannot be greater than number of options.")
+            key = tuple(options)
+            number = option_list_numbers.get(key)
+            if number is None:
+                number = option_list_numbers[key] = len(option_lists)
+                option_lists.append([positions[option["id"]] for option in catalog.get_items_by_ids(options)])
+            sections.append((section, number, quantity, quantity == len(option_lists[number])))
+        combos[item["id"]] = sections
+    return {
+        "menu": [{key: value for key, value in item.items() if key != "code"} for item in catalog.menu],
+        "categories": {code: [positions[item["id"]] for item in items] for code, items in catalog.items_by_category.items()},
+        "option_lists": option_lists,
+        "combos": combos,
+        "settings": settings or {},
+    }
+
+
+def catalog_from_snapshot(snapshot: dict) -> MenuCatalog:
+    """Rebuilds a catalog from a snapshot payload, with every combo already resolved"""
+    menu = snapshot["menu"]
+    for item in menu:
+        item["code"] = parse_item_code(item["id"])
+    items_by_category = {code: [menu[i] for i in positions] for code, positions in snapshot["categories"].items()}
+    option_lists = [[menu[i] for i in positions] for positions in snapshot["option_lists"]]
+    option_ids = [frozenset(option["id"] for option in options) for options in option_lists]
+    combos = {
+        combo_id: [
+            {"section": section, "options": option_lists[number], "quantity": quantity, "locked": locked, "option_ids": option_ids[number]}
+            for section, number, quantity, locked in sections
+        ]
+        for combo_id, sections in snapshot["combos"].items()
+    }
+    return MenuCatalog.from_indexes(menu, items_by_category, combos)
+
+
+def encode_snapshot(catalog: MenuCatalog, source_hash: bytes, settings: dict | None = None) -> bytes:
+    """Returns the snapshot file contents of a catalog"""
+    payload = marshal.dumps(compile_snapshot(catalog, settings), MARSHAL_VERSION)
+    return SNAPSHOT_MAGIC + SNAPSHOT_HEADER.pack(FORMAT_VERSION, source_hash, zlib.crc32(payload)) + payload
+
+
+def write_snapshot(path: str, data: bytes) -> int:
+    """Writes snapshot contents (atomically replacing any older snapshot), returns their size in bytes"""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, path)
+    return len(data)
+
+
+def read_snapshot(path: str, source_hash: bytes) -> dict | None:
+    """
+    Reads a snapshot in a single read and returns its payload,
+    or `None` if it is missing, corrupt, of another format version or built from another source
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    start = len(SNAPSHOT_MAGIC) + SNAPSHOT_HEADER.size
+    if len(data) < start or data[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+        return None
+    version, built_from, checksum = SNAPSHOT_HEADER.unpack_from(data, len(SNAPSHOT_MAGIC))
+    payload = memoryview(data)[start:]
+    if version != FORMAT_VERSION or built_from != source_hash or zlib.crc32(payload) != checksum:
+        return None
+    return marshal.loads(payload)
+
+
+def main():
+    from menu_source import MenuSource
+
+    try:
+        source = MenuSource()
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    size = source.save_snapshot()
+    combo_count = sum(1 for item in source.current.catalog.menu if "item_ref_ids" in item)
+    print(f"Menu snapshot written to {source.snapshot_path}: {len(source.current.catalog)} items, {combo_count} combos, {size} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
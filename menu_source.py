@@ -0,0 +1,230 @@
+"""
+Menu, GST and discount rates loaded from `menu.json` in the `database.dir` of config.json, reloaded while running.
+
+The file is created from the defaults of menu_data.py on first start:
+```json
+{
+    "gst": 0.09,
+    "discount_rates": { "student": 0.10, ... },
+    "menu": [ { "id": "B01", "name": "Classic Beef Burger", "price": 5.50 }, ... ]
+}
+```
+(a combo's `item_ref_ids` sections are written as `[[options...], quantity]`).
+
+`MenuSource.current` is an immutable `MenuState`. A watcher thread polls the file's modification time
+and size; when they change, it parses the file in the background, builds the new catalog with
+`MenuCatalog.updated` (re-indexing only the categories that changed), checks every combo and only then
+replaces `current` in one assignment. A file that fails to parse or check leaves `current` as it was
+and is reported in `error` (and to `on_error`, e.g. to log it). Screens take `current` once when they open,
+so they never see a menu change under them. A file that is invalid at start-up raises `ValueError` naming it.
+"""
+import hashlib
+import json
+import os
+import threading
+from typing import NamedTuple
+
+from catalog import MenuCatalog, parse_item_code
+from config import get_data_dir
+from menu_data import MENU_ITEM_IDS
+from menu_snapshot import catalog_from_snapshot, encode_snapshot, read_snapshot, snapshot_path, write_snapshot
+
+MENU_FILE = "menu.json"
+# Seconds between two checks of the menu file
+POLL_INTERVAL = 1.0
+
+
+class MenuState(NamedTuple):
+    """One consistent version of the menu file"""
+    catalog: MenuCatalog
+    gst: float
+    discount_rates: dict[str, float]
+    source_hash: bytes
+
+
+def menu_file_path(data_dir: str | None = None) -> str:
+    """Path of the menu file in a data directory (the configured one by default)"""
+    return os.path.join(data_dir or get_data_dir(), MENU_FILE)
+
+
+def write_default_menu(path: str):
+    """Writes the menu file from the defaults in menu_data.py"""
+    from menu_data import DISCOUNT_RATES, GST, MENU
+
+    menu = [{key: value for key, value in item.items() if key != "code"} for item in MENU]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"gst": GST, "discount_rates": DISCOUNT_RATES, "menu": menu}, f, indent=4, ensure_ascii=False)
+        f.write("\n")
+
+
+def parse_menu_file(data: bytes) -> tuple[list[dict], dict]:
+    """
+    Parses the menu file, returning the menu items and the settings (`gst`, `discount_rates`).
+    Raises `ValueError` if the file is not a valid menu: every item must be of a category of `MENU_ITEM_IDS`,
+    and every option of a combo an item of the menu or a category code.
+    """
+    document = json.loads(data)
+    if not isinstance(document, dict):
+        raise ValueError("Menu file must be a JSON object")
+    menu = document.get("menu")
+    if not isinstance(menu, list):
+        raise ValueError("'menu' must be a list of items")
+    for i, item in enumerate(menu, 1):
+        if type(item) is not dict or type(item.get("id")) is not str or type(item.get("name")) is not str:
+            raise ValueError(f"Item {i}: 'id' and 'name' must be strings")
+        price = item.get("price")
+        if type(price) is not float and type(price) is not int or price < 0:
+            raise ValueError(f"Item {i}: 'price' must be a non-negative number")
+        if parse_item_code(item["id"]).category not in MENU_ITEM_IDS:
+            raise ValueError(f"Item {i} ({item['id']}): unknown category code '{parse_item_code(item['id']).category}'")
+    item_ids = {item["id"] for item in menu}
+    for i, item in enumerate(menu, 1):
+        if "item_ref_ids" in item:
+            check_item_ref_ids(item["item_ref_ids"], item_ids, f"Item {i} ({item['id']})")
+    gst = document.get("gst")
+    if type(gst) not in (int, float) or not 0 <= gst < 1:
+        raise ValueError("'gst' must be a rate from 0 to 1")
+    discount_rates = document.get("discount_rates")
+    if not isinstance(discount_rates, dict) or not all(type(rate) in (int, float) and 0 <= rate < 1 for rate in discount_rates.values()):
+        raise ValueError("'discount_rates' must map discount types to rates from 0 to 1")
+    return menu, {"gst": gst, "discount_rates": discount_rates}
+
+
+def check_item_ref_ids(item_ref_ids, item_ids: set[str], where: str):
+    """Raises `ValueError` unless a combo's sections are `{ section: [[options...], quantity] }` of existing items"""
+    if not isinstance(item_ref_ids, dict):
+        raise ValueError(f"{where}: 'item_ref_ids' must map sections to [options, quantity]")
+    for section, value in item_ref_ids.items():
+        if not isinstance(value, (list, tuple)) or len(value) != 2 or not isinstance(value[0], list) or type(value[1]) is not int:
+            raise ValueError(f"{where}: section '{section}' must be [options, quantity]")
+        options, quantity = value
+        for option in options:
+            if type(option) is not str:
+                raise ValueError(f"{where}: options of section '{section}' must be item IDs")
+            code = parse_item_code(option)
+            if code.is_category and code.category not in MENU_ITEM_IDS or not code.is_category and option not in item_ids:
+                raise ValueError(f"{where}: section '{section}' refers to '{option}', which is not on the menu")
+        if quantity < 1 or quantity > len(options) and not any(parse_item_code(option).is_category for option in options):
+            raise ValueError(f"{where}: quantity of section '{section}' must be from 1 to its number of options")
+
+
+class MenuSource:
+    """
+    The menu file and the latest valid `MenuState` loaded from it (`current`).
+    At start-up the state comes from the menu snapshot when it matches the file (see menu_snapshot.py).
+    `on_error` is called with `error` when a reload is refused (from the watcher thread).
+    """
+
+    def __init__(self, path: str | None = None, poll_interval: float = POLL_INTERVAL, on_error=None):
+        self.path = path or menu_file_path()
+        self.snapshot_path = snapshot_path(os.path.dirname(self.path))
+        self.poll_interval = poll_interval
+        self.error: str | None = None
+        self.on_error = on_error
+        self.reload_count = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        # Stamp of a file that failed to load, so it is not parsed again on every poll
+        self._rejected_stamp = None
+        if not os.path.exists(self.path):
+            write_default_menu(self.path)
+        data, self._file_stamp = self._read()
+        try:
+            self.current = self._load(data)
+        except ValueError as e:
+            raise ValueError(f"{self.path} is not a valid menu: {e}") from e
+
+    def _read(self) -> tuple[bytes, tuple[int, int]]:
+        with open(self.path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            return f.read(), (stat.st_mtime_ns, stat.st_size)
+
+    def _load(self, data: bytes) -> MenuState:
+        source_hash = hashlib.sha256(data).digest()
+        snapshot = read_snapshot(self.snapshot_path, source_hash)
+        if snapshot is not None:
+            settings = snapshot["settings"]
+            return MenuState(catalog_from_snapshot(snapshot), settings["gst"], settings["discount_rates"], source_hash)
+        menu, settings = parse_menu_file(data)
+        state = MenuState(MenuCatalog(menu), settings["gst"], settings["discount_rates"], source_hash)
+        self._save(encode_snapshot(state.catalog, source_hash, settings))
+        return state
+
+    def _save(self, data: bytes) -> int:
+        try:
+            return write_snapshot(self.snapshot_path, data)
+        except OSError:
+            # Read-only data directory: run from the menu file, without a snapshot for the next start
+            return 0
+
+    def save_snapshot(self) -> int:
+        """Writes the snapshot of the current state, returns its size in bytes"""
+        state = self.current
+        settings = {"gst": state.gst, "discount_rates": state.discount_rates}
+        return self._save(encode_snapshot(state.catalog, state.source_hash, settings))
+
+    def reload(self) -> bool:
+        """
+        Loads the menu file again if it changed since it was last read, returns True if `current` was replaced.
+        Only one reload runs at a time; a file that is invalid is reported in `error` and ignored until it changes again.
+        """
+        with self._lock:
+            try:
+                stat = os.stat(self.path)
+            except OSError as e:
+                self.error = f"Cannot read {self.path}: {e}"
+                return False
+            if (stat.st_mtime_ns, stat.st_size) in (self._file_stamp, self._rejected_stamp):
+                return False
+            data, stamp = self._read()
+            source_hash = hashlib.sha256(data).digest()
+            if source_hash == self.current.source_hash:
+                self._file_stamp = stamp
+                self._rejected_stamp = None
+                self.error = None
+                return False
+            try:
+                menu, settings = parse_menu_file(data)
+                catalog, _ = self.current.catalog.updated(menu)
+                # Resolves every combo, so a broken one keeps the previous menu in place
+                snapshot = encode_snapshot(catalog, source_hash, settings)
+            except Exception as e:
+                self.error = f"{self.path} was not loaded: {e}"
+                self._rejected_stamp = stamp
+                if self.on_error is not None:
+                    self.on_error(self.error)
+                return False
+            self.current = MenuState(catalog, settings["gst"], settings["discount_rates"], source_hash)
+            # The stamp only moves once the menu it describes is in place
+            self._file_stamp = stamp
+            self._rejected_stamp = None
+            self.error = None
+            self.reload_count += 1
+        self._save(snapshot)
+        return True
+
+    def start_watching(self):
+        """Starts the background thread reloading the menu file when it changes"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name="menu-watcher", daemon=True)
+            self._thread.start()
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            self.reload()
+
+    def close(self):
+        """Stops the watcher thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def open_menu_source(watch: bool = False) -> MenuSource:
+    """Loads the menu file of the configured data directory, watching it for changes if `watch` is set"""
+    source = MenuSource()
+    if watch:
+        source.start_watching()
+    return source
@@ -0,0 +1,237 @@
+"""
+Opt-in instrumentation of the kiosk UI: counters and fixed-bucket latency histograms kept in memory.
+
+Off by default; `start_from_config` turns it on when `metrics.enabled` is set in config.json.
+While off, `timer()` returns a shared do-nothing context manager and `count`, `mark` and `since` return
+straight away, so the instrumented code paths cost one flag check.
+
+Each histogram counts observations (in seconds) in the buckets `BUCKET_BOUNDS` (upper bounds, 1-2-5 steps from
+10 µs to 10 s, plus one overflow bucket), along with their count, sum and maximum: recording one is a `bisect`,
+whatever the number of observations. Values are cumulative since the process started.
+
+Snapshots are appended as JSON lines (`{"time", "pid", "uptime", "counters", "histograms"}`) to
+`metrics-YYYYMMDD.jsonl` in the data directory, every `metrics.interval` seconds, on `SIGUSR1` and at exit.
+Kiosks sharing a data directory append to the same file; their lines are told apart by `pid`.
+
+The UI records:
+- `input.decode`: decoding a chunk of terminal input into keys (keyboard.py)
+- `state.update`: from the last key handed to the UI to the start of the next frame (the handler's work)
+- `frame.render`: diffing and writing a frame (screen.py), with counters `frame.count` and `frame.bytes`
+- `input.to_frame`: from the last input arriving to the end of the frame drawn after it
+(Menus and modals printed without `FrameRenderer` are not timed.)
+- `receipt.render`: building and writing a receipt (receipt.py)
+- `checkout.save`, `checkout.total`: saving the order, and the whole checkout (interactive.py), counter `checkout.orders`
+
+Run with: python metrics.py [YYYYMMDD | file]  (prints the last snapshot of each process in a dump)
+"""
+import atexit
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime
+
+BUCKET_BOUNDS = tuple(step * 10.0 ** exponent for exponent in range(-5, 1) for step in (1, 2, 5)) + (10.0,)
+DUMP_INTERVAL = 60.0
+DUMP_SIGNAL = getattr(signal, "SIGUSR1", None)
+
+enabled = False
+counters: dict[str, int] = {}
+histograms: dict[str, "Histogram"] = {}
+marks: dict[str, float] = {}
+started = time.monotonic()
+data_dir = None
+
+
+class Histogram:
+    """Observation counts per bucket of `BUCKET_BOUNDS` (the last bucket holds everything above them)"""
+    __slots__ = ("buckets", "count", "sum", "max")
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.buckets[bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def to_dict(self) -> dict:
+        return {"count": self.count, "sum": self.sum, "max": self.max, "buckets": list(self.buckets)}
+
+
+def bucket_percentile(buckets: list[int], fraction: float) -> float:
+    """Upper bound of the bucket holding the given fraction of the observations (`inf` in the overflow bucket)"""
+    target = sum(buckets) * fraction
+    seen = 0
+    for i, count in enumerate(buckets):
+        seen += count
+        if count and seen >= target:
+            return BUCKET_BOUNDS[i] if i < len(BUCKET_BOUNDS) else float("inf")
+    return 0.0
+
+
+def observe(name: str, seconds: float):
+    """Records a duration in the histogram `name`"""
+    if not enabled:
+        return
+    histogram = histograms.get(name)
+    if histogram is None:
+        histogram = histograms[name] = Histogram()
+    histogram.observe(seconds)
+
+
+def count(name: str, amount: int = 1):
+    """Adds to the counter `name`"""
+    if enabled:
+        counters[name] = counters.get(name, 0) + amount
+
+
+def mark(name: str):
+    """Remembers the current time under `name`, for a later `since`"""
+    if enabled:
+        marks[name] = time.perf_counter()
+
+
+def since(name: str, histogram: str):
+    """Records the time elapsed since `mark(name)` in `histogram`, once per mark"""
+    if enabled:
+        start = marks.pop(name, None)
+        if start is not None:
+            observe(histogram, time.perf_counter() - start)
+
+
+class _Timer:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *_):
+        observe(self.name, time.perf_counter() - self.start)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+def timer(name: str):
+    """Context manager recording the time spent in its block in the histogram `name`"""
+    return _Timer(name) if enabled else NULL_TIMER
+
+
+def snapshot() -> dict:
+    """The current counters and histograms"""
+    return {
+        "time": datetime.now().isoformat(timespec="seconds"), "pid": os.getpid(), "uptime": round(time.monotonic() - started, 3),
+        "counters": dict(counters), "histograms": {name: histogram.to_dict() for name, histogram in list(histograms.items())},
+    }
+
+
+def dump_path(directory: str, day: datetime | None = None) -> str:
+    return os.path.join(directory, f"metrics-{day or datetime.now():%Y%m%d}.jsonl")
+
+
+def dump():
+    """Appends a snapshot to the day's metrics file of the data directory"""
+    if data_dir is None:
+        return
+    data = (json.dumps(snapshot()) + "\n").encode("utf-8")
+    # One append per snapshot, so lines of kiosks sharing the file do not interleave
+    fd = os.open(dump_path(data_dir), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+
+
+def _dump_loop(interval: float):
+    while True:
+        time.sleep(interval)
+        try:
+            dump()
+        except OSError:
+            pass
+
+
+def enable(directory: str, interval: float | None = DUMP_INTERVAL):
+    """Starts recording, dumping snapshots to `directory` every `interval` seconds (if set), on `DUMP_SIGNAL` and at exit"""
+    global enabled, data_dir
+    data_dir = directory
+    enabled = True
+    atexit.register(dump)
+    if DUMP_SIGNAL is not None and threading.current_thread() is threading.main_thread():
+        signal.signal(DUMP_SIGNAL, lambda *_: dump())
+    if interval:
+        threading.Thread(target=_dump_loop, args=(interval,), daemon=True).start()
+
+
+def start_from_config(config: dict):
+    """Enables the instrumentation if `metrics.enabled` is set in the config"""
+    settings = config.get("metrics", {})
+    if settings.get("enabled"):
+        from config import get_data_dir
+        enable(get_data_dir(config), settings.get("interval", DUMP_INTERVAL))
+
+
+def read_dump(path: str) -> dict:
+    """`{ pid: last snapshot }` of a metrics file"""
+    latest = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            entry = json.loads(line)
+            latest[entry["pid"]] = entry
+    return latest
+
+
+def format_snapshot(entry: dict) -> str:
+    lines = [f"pid {entry['pid']} at {entry['time']} (up {entry['uptime']:,.0f}s)"]
+    lines.append(f"  {'Histogram':<16} {'Count':>8} {'Mean (ms)':>10} {'p50 (ms)':>9} {'p99 (ms)':>9} {'Max (ms)':>9}")
+    for name, histogram in sorted(entry["histograms"].items()):
+        mean = histogram["sum"] / histogram["count"] if histogram["count"] else 0.0
+        p50, p99 = (bucket_percentile(histogram["buckets"], fraction) for fraction in (0.5, 0.99))
+        lines.append(
+            f"  {name:<16} {histogram['count']:>8,} {mean * 1000:>10.3f} {p50 * 1000:>9.3f} {p99 * 1000:>9.3f} {histogram['max'] * 1000:>9.3f}"
+        )
+    for name, value in sorted(entry["counters"].items()):
+        lines.append(f"  {name:<16} {value:>8,}")
+    return "\n".join(lines)
+
+
+def main(argv: list[str]):
+    from config import get_data_dir
+    arg = argv[1] if len(argv) > 1 else None
+    if arg and not (len(arg) == 8 and arg.isdigit()):
+        path = arg
+    else:
+        path = dump_path(get_data_dir(), datetime.strptime(arg, "%Y%m%d") if arg else None)
+    if not os.path.exists(path):
+        print(f"No metrics at {path}", file=sys.stderr)
+        return 1
+    for entry in read_dump(path).values():
+        print(format_snapshot(entry))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,175 @@
+"""
+Client side of the order server (see order_server.py), for kiosks running as thin clients.
+
+`RemoteCart` offers the methods of `Cart` that the UIs use, but every change is made by the server, and the
+cart it keeps is the copy the server sent back with each response. `RemoteMenu` offers `current` like
+`MenuSource`, fetching the menu again whenever a response reports another menu version.
+"""
+import json
+import os
+import socket
+
+from cart import order_signature
+from catalog import MenuCatalog, parse_item_code
+from config import PROJECT_DIR
+from menu_source import MenuState
+
+
+class OrderServerError(ValueError):
+    """Raised when the order server refuses a request"""
+
+
+def parse_address(address: str) -> tuple[int, str | tuple[str, int]]:
+    """
+    Parses a server address into `(socket family, address)`:
+    `host:port` for TCP, anything else is a Unix socket path (relative paths are from the project directory)
+    """
+    host, _, port = address.rpartition(":")
+    if host and port.isdigit():
+        return socket.AF_INET, (host, int(port))
+    return socket.AF_UNIX, os.path.join(PROJECT_DIR, address)
+
+
+class OrderClient:
+    """One kiosk session on the order server: requests are sent one at a time, each waiting for its response"""
+
+    def __init__(self, address: str, timeout: float | None = 10.0):
+        family, target = parse_address(address)
+        self._socket = socket.socket(family, socket.SOCK_STREAM)
+        self._socket.settimeout(timeout)
+        self._socket.connect(target)
+        if family == socket.AF_INET:
+            self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._file = self._socket.makefile("rwb")
+        self.menu_version = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def request(self, op: str, **fields) -> dict:
+        """Sends a request and returns the server's response, raising `OrderServerError` if it was refused"""
+        fields["op"] = op
+        self._file.write(json.dumps(fields, separators=(",", ":")).encode("utf-8") + b"\n")
+        self._file.flush()
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Order server closed the connection")
+        response = json.loads(line)
+        if "menu_version" in response:
+            self.menu_version = response["menu_version"]
+        if not response["ok"]:
+            raise OrderServerError(response["error"])
+        return response
+
+    def close(self):
+        self._file.close()
+        self._socket.close()
+
+
+class RemoteMenu:
+    """The server's menu, as a `MenuState` in `current` (fetched again when the server reports a new version)"""
+
+    def __init__(self, client: OrderClient):
+        self.client = client
+        self._state = None
+        self._version = None
+        # Menu files the server refuses are reported by the server
+        self.error = None
+
+    @property
+    def current(self) -> MenuState:
+        if self._state is None or self.client.menu_version != self._version:
+            response = self.client.request("menu")
+            self._version = response["menu_version"]
+            self._state = MenuState(
+                MenuCatalog(response["menu"]), response["gst"], response["discount_rates"], bytes.fromhex(self._version)
+            )
+        return self._state
+
+
+class RemoteCart:
+    """
+    The session cart held by the order server, with the interface of `Cart` used by the UIs.
+    Orders are copies of the server's lines (prices in dollars, as in `Cart`); change them through the methods.
+    """
+
+    def __init__(self, client: OrderClient):
+        self.client = client
+        self._load(client.request("cart")["cart"])
+
+    def _load(self, payload: dict):
+        self._lines = payload["lines"]
+        self.orders = []
+        for line in self._lines:
+            order = {
+                "id": line["id"], "code": parse_item_code(line["id"]), "name": line["name"],
+                "price": line["price"] / 100, "quantity": line["quantity"], "total": line["total"] / 100
+            }
+            if "options" in line:
+                order["options"] = line["options"]
+            self.orders.append(order)
+        self._index = {order_signature(order): order for order in self.orders}
+        self.item_count = sum(order["quantity"] for order in self.orders)
+        self._subtotal_cents = payload["subtotal"]
+
+    @property
+    def subtotal_cents(self) -> int:
+        return self._subtotal_cents
+
+    @property
+    def subtotal(self) -> float:
+        return self._subtotal_cents / 100
+
+    def __len__(self):
+        return len(self.orders)
+
+    def __getitem__(self, index):
+        return self.orders[index]
+
+    def __iter__(self):
+        return iter(self.orders)
+
+    def find(self, order: dict):
+        """Returns the cart order identical to `order` (same item and combo options), or `None`"""
+        return self._index.get(order_signature(order))
+
+    def add(self, order: dict) -> dict:
+        """Adds an order (merged by the server into an identical one), returns the order stored in the cart"""
+        item = {"id": order["id"], "quantity": order["quantity"]}
+        if "options" in order:
+            item["options"] = order["options"]
+        response = self.client.request("add", item=item)
+        self._load(response["cart"])
+        return self.orders[response["index"]]
+
+    def set_quantity(self, index: int, quantity: int):
+        self._load(self.client.request("set_quantity", index=index, quantity=quantity)["cart"])
+
+    def set_options(self, index: int, options: dict) -> int:
+        response = self.client.request("set_options", index=index, options=options)
+        self._load(response["cart"])
+        return response["index"]
+
+    def pop(self, index: int = -1) -> dict:
+        order = self.orders[index]
+        self._load(self.client.request("remove", index=index % len(self.orders))["cart"])
+        return order
+
+    def to_lines(self) -> list[dict]:
+        return [dict(line) for line in self._lines]
+
+    def checkout(self, discount_type: str | None) -> dict:
+        """
+        Checks the cart out on the server and returns the order's journal record.
+        The server empties its cart; this copy keeps the lines (for the receipt) until the next change.
+        """
+        return self.client.request("checkout", discount=discount_type)["order"]
+
+
+def connect_kiosk(address: str) -> tuple[RemoteMenu, RemoteCart]:
+    """Opens a kiosk session on the order server, returning its menu and cart"""
+    client = OrderClient(address)
+    return RemoteMenu(client), RemoteCart(client)
@@ -0,0 +1,288 @@
+"""
+Asyncio order server: owns the menu, the carts and order numbering for any number of kiosks.
+
+Kiosks connect over a Unix or TCP socket (see `order_client.parse_address`); each connection is one session
+with its own cart. Requests and responses are JSON objects, one per line, answered in order:
+- `{"op": "menu"}` -> `menu` (items), `gst`, `discount_rates`
+- `{"op": "cart"}` -> `cart`
+- `{"op": "add", "item": {"id", "quantity"?, "options"?}}` -> `cart`, `index` of the line holding the item
+- `{"op": "set_quantity", "index", "quantity"}` -> `cart`
+- `{"op": "set_options", "index", "options"}` (edit a combo) -> `cart`, `index`
+- `{"op": "remove", "index"}` -> `cart`
+- `{"op": "checkout", "discount": <discount type or null>}` -> `order` (the journal record); the cart is emptied
+
+Responses are `{"ok": true, "menu_version": ..., ...}` or `{"ok": false, "menu_version": ..., "error": "..."}`.
+`cart` is `{"lines": Cart.to_lines(), "subtotal": cents}`. Items are checked like headless orders.
+`menu_version` changes whenever the menu file is reloaded (see menu_source.py).
+
+Everything runs on one event loop thread except checkouts, which wait for the journal's group commit
+in a thread pool, so one slow fsync never holds up the other sessions. When the business day changes,
+new checkouts go to the new day's journal; the previous one is closed in the pool once its last checkout is done.
+
+Run with: python order_server.py [address] [--data-dir DIR]
+(default address: `kiosk.sock` in the data directory)
+"""
+import asyncio
+import json
+import os
+import socket
+import sys
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from cart import Cart
+from config import get_data_dir
+from headless import OrderError, build_order
+from journal import OrderJournal, journal_path
+from menu_data import ALLOWED_ORDERS_PER_ITEM
+from menu_source import MenuSource, menu_file_path
+from order_client import parse_address
+
+SOCKET_FILE = "kiosk.sock"
+# Checkouts waiting on the journal at once (the group commit syncs them together)
+CHECKOUT_WORKERS = 64
+# Longest request line accepted
+MAX_REQUEST_SIZE = 1024 * 1024
+# Connections waiting to be accepted, so a burst of kiosks connecting at once is not refused
+BACKLOG = 1024
+
+
+class RequestError(ValueError):
+    """Raised when a request cannot be carried out, its message is sent back to the client"""
+
+
+def encode(response: dict) -> bytes:
+    return json.dumps(response, separators=(",", ":"), ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def cart_payload(cart: Cart) -> dict:
+    return {"lines": cart.to_lines(), "subtotal": cart.subtotal_cents}
+
+
+def line_index(cart: Cart, request: dict) -> int:
+    """The cart line a request refers to"""
+    index = request.get("index")
+    if type(index) is not int or not 0 <= index < len(cart):
+        raise RequestError(f"No cart line {index}")
+    return index
+
+
+class OrderServer:
+    """
+    Serves kiosk sessions from one menu source, writing checked-out orders to the data directory's journal.
+    `session_count`, `active_sessions` and `request_count` record the load.
+    """
+
+    def __init__(self, menu_source: MenuSource, data_dir: str, checkout_workers: int = CHECKOUT_WORKERS):
+        self.menu_source = menu_source
+        self.data_dir = data_dir
+        self._executor = ThreadPoolExecutor(checkout_workers, thread_name_prefix="checkout")
+        self._journal = None
+        # Checkouts running in the pool per journal, so a past day's journal is only closed once they are done
+        self._checkouts: dict[OrderJournal, int] = {}
+        self._menu_response = (None, None)
+        self.session_count = 0
+        self.active_sessions = 0
+        self.request_count = 0
+        self.handlers = {
+            "cart": self.get_cart,
+            "add": self.add,
+            "set_quantity": self.set_quantity,
+            "set_options": self.set_options,
+            "remove": self.remove,
+        }
+
+    def journal(self) -> OrderJournal:
+        """Journal of the current business day (a new one is opened when the day changes)"""
+        path = journal_path(self.data_dir)
+        if self._journal is None or self._journal.path != path:
+            previous = self._journal
+            self._journal = OrderJournal(path)
+            if previous is not None:
+                self._release(previous)
+        return self._journal
+
+    def _release(self, journal: OrderJournal):
+        """Closes a past day's journal in the thread pool (never on the event loop) once no checkout uses it"""
+        if journal is not self._journal and not self._checkouts.get(journal):
+            self._checkouts.pop(journal, None)
+            self._executor.submit(journal.close)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Runs one kiosk session until the client disconnects"""
+        self.session_count += 1
+        self.active_sessions += 1
+        cart = Cart(ALLOWED_ORDERS_PER_ITEM)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                writer.write(await self.handle_line(cart, line))
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            # Disconnected, or a request line over MAX_REQUEST_SIZE
+            pass
+        finally:
+            self.active_sessions -= 1
+            writer.close()
+
+    async def handle_line(self, cart: Cart, line: bytes) -> bytes:
+        """Answers one request line of a session"""
+        self.request_count += 1
+        state = self.menu_source.current
+        version = state.source_hash.hex()[:16]
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise RequestError("Request must be a JSON object")
+            op = request.get("op")
+            if op == "menu":
+                return self.menu_response(state, version)
+            if op == "checkout":
+                result = await self.checkout(cart, state, request)
+            elif op in self.handlers:
+                result = self.handlers[op](cart, state, request)
+            else:
+                raise RequestError(f"Unknown op '{op}'")
+        except (RequestError, OrderError, json.JSONDecodeError) as e:
+            return encode({"ok": False, "menu_version": version, "error": str(e)})
+        except (TypeError, KeyError, AttributeError, UnicodeDecodeError) as e:
+            # Fields of the wrong type that a check above missed: the request is refused, the session goes on
+            return encode({"ok": False, "menu_version": version, "error": f"Malformed request: {e}"})
+        except Exception:
+            # A bug must not end the kiosk's session: log it and answer this request with an error
+            print(f"Error handling request {line[:200]!r}:\n{traceback.format_exc()}", file=sys.stderr)
+            return encode({"ok": False, "menu_version": version, "error": "Internal server error"})
+        return encode({"ok": True, "menu_version": version, **result})
+
+    def menu_response(self, state, version: str) -> bytes:
+        """The `menu` response, encoded once per menu version"""
+        cached_version, response = self._menu_response
+        if cached_version != version:
+            menu = [{key: value for key, value in item.items() if key != "code"} for item in state.catalog.menu]
+            response = encode({"ok": True, "menu_version": version, "menu": menu, "gst": state.gst, "discount_rates": state.discount_rates})
+            self._menu_response = (version, response)
+        return response
+
+    def get_cart(self, cart: Cart, state, request: dict) -> dict:
+        return {"cart": cart_payload(cart)}
+
+    def add(self, cart: Cart, state, request: dict) -> dict:
+        item = request.get("item")
+        if not isinstance(item, dict) or "id" not in item:
+            raise RequestError("'item' must be an object with an 'id'")
+        try:
+            order = cart.add(build_order(state.catalog, item))
+        except ValueError as e:
+            raise RequestError(str(e))
+        return {"cart": cart_payload(cart), "index": cart.orders.index(order)}
+
+    def set_quantity(self, cart: Cart, state, request: dict) -> dict:
+        index = line_index(cart, request)
+        quantity = request.get("quantity")
+        if type(quantity) is not int:
+            raise RequestError("'quantity' must be an integer")
+        try:
+            cart.set_quantity(index, quantity)
+        except ValueError as e:
+            raise RequestError(str(e))
+        return {"cart": cart_payload(cart)}
+
+    def set_options(self, cart: Cart, state, request: dict) -> dict:
+        index = line_index(cart, request)
+        options = request.get("options")
+        combo_id = cart[index]["id"]
+        if "options" not in cart[index]:
+            raise RequestError(f"{combo_id} is not a combo")
+        if not isinstance(options, dict):
+            raise RequestError("'options' must be an object")
+        if combo_id not in state.catalog:
+            raise RequestError(f"{combo_id} is no longer on the menu")
+        errors = state.catalog.validate_combo_options(combo_id, options)
+        if errors:
+            raise RequestError("; ".join(errors))
+        try:
+            index = cart.set_options(index, options)
+        except ValueError as e:
+            raise RequestError(str(e))
+        return {"cart": cart_payload(cart), "index": index}
+
+    def remove(self, cart: Cart, state, request: dict) -> dict:
+        cart.pop(line_index(cart, request))
+        return {"cart": cart_payload(cart)}
+
+    async def checkout(self, cart: Cart, state, request: dict) -> dict:
+        if len(cart) == 0:
+            raise RequestError("Cart is empty")
+        discount_type = request.get("discount")
+        if discount_type is not None and not isinstance(discount_type, str):
+            raise RequestError("'discount' must be a string or null")
+        if discount_type is None:
+            discount_rate = 0.0
+        elif discount_type in state.discount_rates:
+            discount_rate = state.discount_rates[discount_type]
+        else:
+            raise RequestError(f"Unknown discount '{discount_type}'")
+        journal = self.journal()
+        loop = asyncio.get_running_loop()
+        self._checkouts[journal] = self._checkouts.get(journal, 0) + 1
+        try:
+            # The session sends nothing else until this is answered, so its cart stays as it is meanwhile
+            record = await loop.run_in_executor(self._executor, journal.append_order, cart, discount_type, discount_rate, state.gst)
+        finally:
+            self._checkouts[journal] -= 1
+            self._release(journal)
+        cart.clear()
+        return {"order": record}
+
+    async def serve(self, address: str):
+        """Accepts kiosk connections on an address until cancelled"""
+        family, target = parse_address(address)
+        if family == socket.AF_UNIX:
+            if os.path.exists(target):
+                os.unlink(target)
+            server = await asyncio.start_unix_server(self.handle_connection, target, limit=MAX_REQUEST_SIZE, backlog=BACKLOG)
+        else:
+            server = await asyncio.start_server(self.handle_connection, *target, limit=MAX_REQUEST_SIZE, backlog=BACKLOG)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        """Waits for pending checkouts and closes the journals"""
+        self._executor.shutdown()
+        for journal in [*self._checkouts, self._journal]:
+            if journal is not None:
+                journal.close()
+
+
+def main(argv: list[str]):
+    args = argv[1:]
+    data_dir = None
+    if "--data-dir" in args:
+        position = args.index("--data-dir")
+        data_dir = os.path.abspath(args[position + 1])
+        os.makedirs(data_dir, exist_ok=True)
+        del args[position:position + 2]
+    data_dir = data_dir or get_data_dir()
+    address = args[0] if args else os.path.join(data_dir, SOCKET_FILE)
+    try:
+        menu_source = MenuSource(menu_file_path(data_dir), on_error=lambda error: print(error, file=sys.stderr))
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    menu_source.start_watching()
+    server = OrderServer(menu_source, data_dir)
+    print(f"Order server listening on {address}", file=sys.stderr)
+    try:
+        asyncio.run(server.serve(address))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        menu_source.close()
+        server.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,115 @@
+"""
+Integer-cent pricing engine.
+
+Menu prices stay in dollars (`5.50`) for display, but every calculation here is done on integer cents,
+with rates as integer basis points (`0.09` => `900`), so receipts and end-of-day sums agree to the cent.
+"""
+from typing import NamedTuple
+
+# Rounding policies for discount and GST amounts that land between two cents
+ROUND_HALF_UP = "half_up"       # 0.5 cent rounds up (default, usual for receipts)
+ROUND_HALF_EVEN = "half_even"   # 0.5 cent rounds to the even cent
+ROUNDING_POLICIES = (ROUND_HALF_UP, ROUND_HALF_EVEN)
+
+BASIS_POINTS = 10_000
+
+
+class PriceBreakdown(NamedTuple):
+    """Amounts of a priced cart, all in integer cents"""
+    subtotal: int
+    discount: int
+    discounted_subtotal: int
+    gst: int
+    total: int
+
+
+def to_cents(price: float) -> int:
+    """Converts a menu price in dollars to integer cents"""
+    return round(price * 100)
+
+
+def to_basis_points(rate: float) -> int:
+    """Converts a rate such as `0.09` to integer basis points (`900`)"""
+    return round(rate * BASIS_POINTS)
+
+
+def format_cents(cents: int) -> str:
+    """Formats integer cents as a dollar amount, e.g. `1234` => `"12.34"`"""
+    sign = "-" if cents < 0 else ""
+    return f"{sign}{abs(cents) // 100}.{abs(cents) % 100:02d}"
+
+
+def apply_rate(cents: int, rate_bp: int, rounding: str = ROUND_HALF_UP) -> int:
+    """Returns `cents * rate` rounded to a whole cent with the given rounding policy"""
+    if rounding not in ROUNDING_POLICIES:
+        raise ValueError(f"Unknown rounding policy '{rounding}'")
+    quotient, remainder = divmod(cents * rate_bp, BASIS_POINTS)
+    half = BASIS_POINTS // 2
+    if remainder > half or (remainder == half and (rounding == ROUND_HALF_UP or quotient % 2 == 1)):
+        return quotient + 1
+    return quotient
+
+
+def price_cart(subtotal_cents: int, discount_rate: float, gst_rate: float, rounding: str = ROUND_HALF_UP) -> PriceBreakdown:
+    """
+    Prices one cart from its subtotal:
+    the discount is taken off the subtotal first, then GST is charged on the discounted subtotal.
+    """
+    discount = apply_rate(subtotal_cents, to_basis_points(discount_rate), rounding)
+    discounted_subtotal = subtotal_cents - discount
+    gst = apply_rate(discounted_subtotal, to_basis_points(gst_rate), rounding)
+    return PriceBreakdown(subtotal_cents, discount, discounted_subtotal, gst, discounted_subtotal + gst)
+
+
+def _apply_rate_array(np, cents, rate_bp, rounding):
+    """Vectorized `apply_rate` over int64 arrays"""
+    quotient, remainder = np.divmod(cents * rate_bp, BASIS_POINTS)
+    half = BASIS_POINTS // 2
+    if rounding == ROUND_HALF_UP:
+        round_up = remainder >= half
+    elif rounding == ROUND_HALF_EVEN:
+        round_up = (remainder > half) | ((remainder == half) & (quotient % 2 == 1))
+    else:
+        raise ValueError(f"Unknown rounding policy '{rounding}'")
+    return quotient + round_up
+
+
+def batch_subtotals(cart_indices, unit_cents, quantities, cart_count: int):
+    """
+    Sums order lines into one subtotal per cart.
+    `cart_indices[i]` is the cart of line `i` (0 to `cart_count - 1`), priced `unit_cents[i] * quantities[i]`.
+    Returns an int64 NumPy array (or a list if NumPy is not installed).
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        subtotals = [0] * cart_count
+        for cart_index, cents, quantity in zip(cart_indices, unit_cents, quantities):
+            subtotals[cart_index] += cents * quantity
+        return subtotals
+    line_cents = np.asarray(unit_cents, dtype=np.int64) * np.asarray(quantities, dtype=np.int64)
+    subtotals = np.zeros(cart_count, dtype=np.int64)
+    np.add.at(subtotals, np.asarray(cart_indices, dtype=np.intp), line_cents)
+    return subtotals
+
+
+def price_batch(subtotals_cents, discount_rates, gst_rate: float, rounding: str = ROUND_HALF_UP) -> PriceBreakdown:
+    """
+    Prices many carts at once, giving the same cents as `price_cart` for each cart.
+    `discount_rates` is either one rate for every cart or one rate per cart.
+    Returns a `PriceBreakdown` of int64 NumPy arrays (or of lists if NumPy is not installed).
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        if isinstance(discount_rates, (int, float)):
+            discount_rates = [discount_rates] * len(subtotals_cents)
+        priced = [price_cart(s, d, gst_rate, rounding) for s, d in zip(subtotals_cents, discount_rates)]
+        return PriceBreakdown(*(list(column) for column in zip(*priced))) if priced else PriceBreakdown([], [], [], [], [])
+
+    subtotals = np.asarray(subtotals_cents, dtype=np.int64)
+    discount_bp = np.rint(np.asarray(discount_rates, dtype=np.float64) * BASIS_POINTS).astype(np.int64)
+    discount = _apply_rate_array(np, subtotals, discount_bp, rounding)
+    discounted_subtotal = subtotals - discount
+    gst = _apply_rate_array(np, discounted_subtotal, to_basis_points(gst_rate), rounding)
+    return PriceBreakdown(subtotals, discount, discounted_subtotal, gst, discounted_subtotal + gst)
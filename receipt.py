@@ -0,0 +1,203 @@
+"""
+Receipt rendering shared by the UIs, order reprints and the journal.
+
+The layout is precompiled once from the width constants into `ReceiptRenderer`,
+and each receipt is built into a single string, so it can go to stdout, a file or a printer device in one write.
+"""
+import sys
+from datetime import datetime
+
+import metrics
+from pricing import PriceBreakdown
+
+# Restaurant Details
+RESTAURANT_NAME = "Obama Fried Chicken"
+ADDRESS = "#01-234 Serangoon Central, 23, Singapore 556083"
+PHONE_NUMBER = "+65 9012 3456"
+WEBSITE = "https://obama-fried-chicken.com.sg"
+
+# Print Receipt Details
+WIDTH_RECEIPT_TABLE_COLUMN_ID = 5
+WIDTH_RECEIPT_TABLE_COLUMN_NAME = 17    # name field display width
+WIDTH_RECEIPT_TABLE_COLUMN_TYPE = 12
+WIDTH_RECEIPT_TABLE_COLUMN_PRICE = 9
+WIDTH_RECEIPT_TABLE_COLUMN_QUANTITY = 4
+WIDTH_RECEIPT_TABLE_COLUMN_DESCRIPTION = 20
+
+
+def condense(text, max_len):
+    """Truncates text for better display on screen to prevent misalignment"""
+    return text if len(text) <= max_len else text[:max_len-3] + "..."
+
+
+class ReceiptRenderer:
+    """
+    Receipt layout compiled once: the header block, table header, rules and row/total format strings
+    are built in the constructor, so rendering a receipt only fills in the order's values.
+    """
+
+    def __init__(
+            self,
+            col_id: int = WIDTH_RECEIPT_TABLE_COLUMN_ID,
+            col_name: int = WIDTH_RECEIPT_TABLE_COLUMN_NAME,
+            col_type: int = WIDTH_RECEIPT_TABLE_COLUMN_TYPE,
+            col_price: int = WIDTH_RECEIPT_TABLE_COLUMN_PRICE,
+            col_qty: int = WIDTH_RECEIPT_TABLE_COLUMN_QUANTITY,
+            col_desc: int = WIDTH_RECEIPT_TABLE_COLUMN_DESCRIPTION
+        ):
+        self.col_name = col_name
+        self.col_desc = col_desc
+        header_fields = (
+            f"{'No.':<3} {'ID':<{col_id}} {'Name':<{col_name}} "
+            f"{'Description':<{col_desc}} {'Type':>{col_type}} "
+            f"{'Price':>{col_price}} {'Qty':>{col_qty}}"
+        )
+        width = len(header_fields)
+        self.width = width
+        rule = "-" * width + "\n"
+        self.rule = rule
+        self.header = (
+            f"\n{RESTAURANT_NAME:^{width}}\n"
+            f"{ADDRESS:^{width}}\n"
+            f"{'Tel: ' + PHONE_NUMBER:^{width}}\n"
+            f"{WEBSITE:^{width}}\n"
+            + rule
+        )
+        self.table_header = rule + header_fields + "\n" + rule
+        self.row_format = f"{{:<3}} {{:<{col_id}}} {{:<{col_name}}} {{:<{col_desc}}} {{:>{col_type}}} {{:>{col_price}.2f}} {{:>{col_qty}}}\n"
+        self.option_indent = " " * (col_id + col_name + 6)
+        self.subtotal_label = f"{'Subtotal:':<{width - 10}}"
+        self.total_label = f"{'TOTAL:':<{width - 10}}"
+        self.footer = (
+            "\n"
+            f"{'Thank you for dining with us!':^{width}}\n"
+            f"{'We hope to see you again.':^{width}}\n\n"
+        )
+        # Labels that depend on a rate, built on first use
+        self._discount_labels = {}
+        self._gst_labels = {}
+
+    def _discount_label(self, discount: float) -> str:
+        label = self._discount_labels.get(discount)
+        if label is None:
+            label = self._discount_labels[discount] = f"{f'Discount {discount*100:.0f}%:':<{self.width - 10}}"
+        return label
+
+    def _gst_label(self, gst_rate: float) -> str:
+        label = self._gst_labels.get(gst_rate)
+        if label is None:
+            label = self._gst_labels[gst_rate] = f"{f'GST {gst_rate*100:.0f}%:':<{self.width - 10}}"
+        return label
+
+    def render(
+            self,
+            lines: list[dict],
+            priced: PriceBreakdown,
+            discount: float,
+            gst_rate: float,
+            now: datetime,
+            item_name,
+            order_number: int | None = None,
+            option_names: dict | None = None
+        ) -> str:
+        """
+        Returns the receipt text containing the items ordered as well as calculation
+        - `lines`: cart lines as stored by `Cart.to_lines()` (prices in cents)
+        - `priced`: amounts from the pricing engine
+        - `item_name`: function returning the name of an item ID (for combo options)
+        - `option_names`: optional `{ item_id: name }` cache shared across receipts
+        """
+        if option_names is None:
+            option_names = {}
+        parts = [self.header, "Date: ", now.strftime("%d %b %Y   %H:%M"), "\n"]
+        if order_number is not None:
+            parts.append(f"Order No.: {order_number}\n")
+        parts.append(self.table_header)
+
+        # Table Body
+        row_format = self.row_format
+        col_name = self.col_name
+        indent = self.option_indent
+        for i, item in enumerate(lines, 1):
+            options = item.get("options")
+            parts.append(row_format.format(
+                i, item["id"], condense(item.get("name", ""), col_name), condense(item.get("description", ""), self.col_desc),
+                "Combo" if options is not None else "À la carte", item["price"] / 100, item["quantity"]
+            ))
+            # Options (for combos)
+            if options is not None:
+                for option_name, ids in options.items():
+                    parts.append(f"{indent}{condense(option_name, 12)}:\n")
+                    count = 1
+                    current_id = ""
+                    for item_id in ids:
+                        # Check for similarity to display quantity
+                        if current_id == item_id: count += 1
+                        else:
+                            count = 1
+                            current_id = item_id
+                        name = option_names.get(item_id)
+                        if name is None:
+                            name = option_names[item_id] = item_name(item_id)
+                        parts.append(indent + condense(f"{count} {name}", col_name) + "\n")
+        parts.append(self.rule)
+
+        # Calculations (cents converted to dollars for display)
+        parts.append(f"{self.subtotal_label}{priced.subtotal / 100:>10.2f}\n")
+        if discount > 0.0:
+            parts.append(f"{self._discount_label(discount)}-{priced.discount / 100:>9.2f}\n")
+        parts.append(f"{self._gst_label(gst_rate)}{priced.gst / 100:>10.2f}\n")
+        parts.append(self.rule)
+        parts.append(f"{self.total_label}{priced.total / 100:>10.2f}\n")
+        parts.append(self.rule)
+        parts.append(self.footer)
+        return "".join(parts)
+
+    def render_record(self, record: dict, item_name, option_names: dict | None = None) -> str:
+        """Returns the receipt text of a journal record (see `journal.order_record`)"""
+        priced = PriceBreakdown(record["subtotal"], record["discount"], record["subtotal"] - record["discount"], record["gst"], record["total"])
+        return self.render(
+            record["lines"], priced, record["discount_rate"], record["gst_rate"],
+            datetime.fromisoformat(record["time"]), item_name, record["order_number"], option_names
+        )
+
+    def render_batch(self, records, item_name) -> str:
+        """Returns the receipts of many journal records as one string, looking up each option name once"""
+        option_names = {}
+        return "".join(self.render_record(record, item_name, option_names) for record in records)
+
+
+# Compiled once at import with the width constants above
+RECEIPT_RENDERER = ReceiptRenderer()
+
+
+def write_receipt(text: str, target=None):
+    """
+    Writes receipt text in a single write:
+    - `None`: standard output
+    - a path: appended to that file (a printer device such as `/dev/usb/lp0` works too)
+    - a stream: anything with `write`
+    """
+    if target is None:
+        sys.stdout.write(text)
+        sys.stdout.flush()
+    elif isinstance(target, str):
+        with open(target, "a", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        target.write(text)
+
+
+def print_order_receipt(
+        lines: list[dict],
+        priced: PriceBreakdown,
+        discount: float,
+        gst_rate: float,
+        now: datetime,
+        item_name,
+        order_number: int | None = None,
+        target=None
+    ):
+    """Prints a receipt containing the items ordered as well as calculation (see `ReceiptRenderer.render`)"""
+    with metrics.timer("receipt.render"):
+        write_receipt(RECEIPT_RENDERER.render(lines, priced, discount, gst_rate, now, item_name, order_number), target)
@@ -0,0 +1,242 @@
+"""
+End-of-day report of a day's journal: totals by item, by category (`MENU_ITEM_IDS`), by discount type,
+by combo section choice and by hour.
+
+The orders are split into shards of consecutive order numbers using the journal's offset index
+(see journal.py); a process pool aggregates each shard on its own and the partial reports are merged.
+Every amount is in integer cents and every total a plain sum, so the merged report does not depend on
+how the orders were split: `aggregate_journal` (one pass over the whole journal, no index, no pool)
+gives the same report exactly, and `--check` compares the two.
+
+Run with: python report.py [YYYYMMDD] [--workers N] [--json] [--check]
+"""
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from archive import OrderArchive
+from catalog import parse_item_code
+from config import get_data_dir
+from journal import INDEX_ENTRY, INDEX_MAGIC, JOURNAL_MAGIC, iter_records, journal_path, index_path
+from menu_data import MENU_ITEM_IDS
+from pricing import format_cents
+
+# Shards per worker, so a worker that finishes early takes another one
+SHARDS_PER_WORKER = 4
+# Most orders in one shard (bounds the memory of a worker)
+MAX_SHARD_ORDERS = 100_000
+SCALAR_TOTALS = ("orders", "subtotal", "discount", "gst", "total")
+
+
+def aggregate(records) -> dict:
+    """
+    Partial report of some journal records:
+    - `orders`, `subtotal`, `discount`, `gst`, `total`
+    - `items`: `{ item_id: [quantity, sales] }` (sales before discount, combos count as their combo item)
+    - `discounts`: `{ discount_type or None: [orders, discount, total] }`
+    - `combo_options`: `{ (combo_id, section, item_id): quantity }`
+    - `hours`: `{ hour: [orders, total] }`
+    """
+    orders = subtotal = discount = gst = total = 0
+    items, discounts, combo_options, hours = {}, {}, {}, {}
+    for record in records:
+        orders += 1
+        subtotal += record["subtotal"]
+        discount += record["discount"]
+        gst += record["gst"]
+        total += record["total"]
+        by_discount = discounts.get(record["discount_type"])
+        if by_discount is None:
+            by_discount = discounts[record["discount_type"]] = [0, 0, 0]
+        by_discount[0] += 1
+        by_discount[1] += record["discount"]
+        by_discount[2] += record["total"]
+        hour = int(record["time"][11:13])
+        by_hour = hours.get(hour)
+        if by_hour is None:
+            by_hour = hours[hour] = [0, 0]
+        by_hour[0] += 1
+        by_hour[1] += record["total"]
+        for line in record["lines"]:
+            quantity = line["quantity"]
+            by_item = items.get(line["id"])
+            if by_item is None:
+                by_item = items[line["id"]] = [0, 0]
+            by_item[0] += quantity
+            by_item[1] += line["total"]
+            options = line.get("options")
+            if options:
+                for section, chosen in options.items():
+                    for item_id in chosen:
+                        key = (line["id"], section, item_id)
+                        combo_options[key] = combo_options.get(key, 0) + quantity
+    return {
+        "orders": orders, "subtotal": subtotal, "discount": discount, "gst": gst, "total": total,
+        "items": items, "discounts": discounts, "combo_options": combo_options, "hours": hours
+    }
+
+
+def merge_reports(reports) -> dict:
+    """Adds up partial reports into one"""
+    merged = aggregate([])
+    for report in reports:
+        for key in SCALAR_TOTALS:
+            merged[key] += report[key]
+        for key in ("items", "discounts", "hours"):
+            into = merged[key]
+            for group, values in report[key].items():
+                if group in into:
+                    into[group] = [a + b for a, b in zip(into[group], values)]
+                else:
+                    into[group] = list(values)
+        into = merged["combo_options"]
+        for group, quantity in report["combo_options"].items():
+            into[group] = into.get(group, 0) + quantity
+    return merged
+
+
+def aggregate_journal(path: str) -> dict:
+    """Reference report: one pass over every valid record of the journal, in this process"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:len(JOURNAL_MAGIC)] != JOURNAL_MAGIC:
+        raise ValueError(f"{path} is not an order journal")
+    return aggregate(json.loads(payload) for _, _, payload in iter_records(data))
+
+
+def aggregate_shard(path: str, first: int, stop: int) -> dict:
+    """Partial report of orders `first + 1` to `stop`, read through the index in one contiguous read"""
+    with open(index_path(path), "rb") as f:
+        f.seek(len(INDEX_MAGIC) + first * INDEX_ENTRY.size)
+        entries = f.read((stop - first) * INDEX_ENTRY.size)
+    start, _ = INDEX_ENTRY.unpack_from(entries, 0)
+    last_offset, last_length = INDEX_ENTRY.unpack_from(entries, len(entries) - INDEX_ENTRY.size)
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(last_offset + last_length - start)
+    report = aggregate(json.loads(payload) for _, _, payload in iter_records(data, 0))
+    if report["orders"] != stop - first:
+        raise ValueError(f"{path} is corrupt between orders {first + 1} and {stop}")
+    return report
+
+
+def shard_ranges(count: int, workers: int) -> list[tuple[int, int]]:
+    """Splits order positions `0..count` into `(first, stop)` ranges of about equal size"""
+    shards = min(count, max(workers * SHARDS_PER_WORKER, -(-count // MAX_SHARD_ORDERS)))
+    return [(count * i // shards, count * (i + 1) // shards) for i in range(shards)]
+
+
+def build_report(path: str, workers: int | None = None) -> dict:
+    """Report of a journal aggregated in shards by a pool of `workers` processes (one per CPU by default)"""
+    workers = workers or os.cpu_count() or 1
+    # Checks the index against the journal (rebuilding it if needed) before the workers rely on it
+    with OrderArchive(path) as archive:
+        count = len(archive)
+    ranges = shard_ranges(count, workers)
+    if workers == 1:
+        return merge_reports(aggregate_shard(path, first, stop) for first, stop in ranges)
+    with ProcessPoolExecutor(workers) as pool:
+        return merge_reports(pool.map(aggregate_shard, [path] * len(ranges), *zip(*ranges)))
+
+
+def category_totals(report: dict) -> dict:
+    """`{ category_code: [quantity, sales] }` from the item totals of a report"""
+    categories = {}
+    for item_id, (quantity, sales) in report["items"].items():
+        totals = categories.setdefault(parse_item_code(item_id).category, [0, 0])
+        totals[0] += quantity
+        totals[1] += sales
+    return categories
+
+
+def report_document(report: dict) -> dict:
+    """The report as plain JSON data, groups in a stable order"""
+    combo_options = {}
+    for (combo_id, section, item_id), quantity in sorted(report["combo_options"].items()):
+        combo_options.setdefault(combo_id, {}).setdefault(section, {})[item_id] = quantity
+    return {
+        **{key: report[key] for key in SCALAR_TOTALS},
+        "items": {item_id: {"quantity": quantity, "sales": sales} for item_id, (quantity, sales) in sorted(report["items"].items())},
+        "categories": {code: {"quantity": quantity, "sales": sales} for code, (quantity, sales) in sorted(category_totals(report).items())},
+        "discounts": {
+            discount_type or "none": {"orders": orders, "discount": discount, "total": total}
+            for discount_type, (orders, discount, total) in sorted(report["discounts"].items(), key=lambda entry: entry[0] or "")
+        },
+        "combo_options": combo_options,
+        "hours": {f"{hour:02d}": {"orders": orders, "total": total} for hour, (orders, total) in sorted(report["hours"].items())},
+    }
+
+
+def print_report(document: dict, day: datetime, item_name, target=None):
+    """Prints a report document as tables"""
+    def show(text=""):
+        print(text, file=target)
+
+    show(f"End of day report for {day:%Y-%m-%d}: {document['orders']:,} orders")
+    show(f"Subtotal ${format_cents(document['subtotal'])}  Discounts -${format_cents(document['discount'])}  "
+         f"GST ${format_cents(document['gst'])}  Total ${format_cents(document['total'])}")
+    show(f"\n{'Item':<6} {'Name':<32} {'Qty':>9} {'Sales':>14}")
+    for item_id, totals in document["items"].items():
+        show(f"{item_id:<6} {item_name(item_id):<32} {totals['quantity']:>9,} {format_cents(totals['sales']):>14}")
+    show(f"\n{'Category':<39} {'Qty':>9} {'Sales':>14}")
+    for code, totals in document["categories"].items():
+        name = MENU_ITEM_IDS[code][1] if code in MENU_ITEM_IDS else code
+        show(f"{name:<39} {totals['quantity']:>9,} {format_cents(totals['sales']):>14}")
+    show(f"\n{'Discount':<24} {'Orders':>9} {'Discount':>14} {'Total':>14}")
+    for discount_type, totals in document["discounts"].items():
+        show(f"{discount_type:<24} {totals['orders']:>9,} {format_cents(totals['discount']):>14} {format_cents(totals['total']):>14}")
+    show(f"\n{'Combo choice':<39} {'Qty':>9}")
+    for combo_id, sections in document["combo_options"].items():
+        show(f"{combo_id} {item_name(combo_id)}")
+        for section, chosen in sections.items():
+            for item_id, quantity in chosen.items():
+                show(f"  {section + ':':<10} {item_id:<5} {item_name(item_id):<21} {quantity:>9,}")
+    show(f"\n{'Hour':<24} {'Orders':>9} {'Total':>14}")
+    for hour, totals in document["hours"].items():
+        show(f"{hour + ':00':<24} {totals['orders']:>9,} {format_cents(totals['total']):>14}")
+
+
+def main(argv: list[str]):
+    args = argv[1:]
+    workers = None
+    if "--workers" in args:
+        position = args.index("--workers")
+        workers = int(args[position + 1])
+        del args[position:position + 2]
+    flags = {arg for arg in args if arg.startswith("--")}
+    args = [arg for arg in args if not arg.startswith("--")]
+    day = datetime.strptime(args[0], "%Y%m%d") if args else datetime.now()
+    path = journal_path(get_data_dir(), day)
+    if not os.path.exists(path):
+        print("❌ No orders were saved on that day.", file=sys.stderr)
+        return 1
+    report = build_report(path, workers)
+    if "--check" in flags and aggregate_journal(path) != report:
+        print("❌ The sharded report does not match the single-process reference.", file=sys.stderr)
+        return 1
+    document = report_document(report)
+    if "--json" in flags:
+        json.dump(document, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+        return 0
+
+    from menu_source import MenuSource
+
+    try:
+        catalog = MenuSource().current.catalog
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    def item_name(item_id):
+        # Items removed from the menu since still show with their ID
+        return catalog.items_by_id[item_id]["name"] if item_id in catalog else item_id
+
+    print_report(document, day, item_name)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
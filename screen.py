@@ -0,0 +1,217 @@
+"""
+Differential screen rendering for the interactive UI.
+
+`FrameRenderer` keeps the last frame drawn on the terminal and, for the next one, only rewrites the lines
+that changed (moving the cursor to each with `ESC [ row ; 1 H`), all in one buffered write.
+A full redraw happens on the first frame, after `invalidate()`, or when the frame does not fit the terminal
+(scrolled or wrapped lines would make the row numbers wrong).
+"""
+import contextlib
+import io
+import re
+import shutil
+import sys
+import unicodedata
+
+import metrics
+
+CLEAR_SCREEN = "\033[H\033[2J"
+CLEAR_LINE_END = "\033[K"
+CLEAR_SCREEN_END = "\033[J"
+ESCAPE_SEQUENCE = re.compile(r"\033\[[0-9;?]*[A-Za-z]")
+
+
+def cell_width(text: str) -> int:
+    """
+    Terminal cells a line takes: two for wide characters (East Asian width W or F, e.g. most emoji),
+    none for combining marks, format characters and escape sequences
+    """
+    if "\033" in text:
+        text = ESCAPE_SEQUENCE.sub("", text)
+    if text.isascii():
+        return len(text)
+    width = 0
+    for ch in text:
+        if unicodedata.east_asian_width(ch) in ("W", "F"):
+            width += 2
+        elif unicodedata.category(ch) not in ("Mn", "Me", "Cf"):
+            width += 1
+    return width
+
+
+def move_cursor(row: int) -> str:
+    """Escape sequence moving the cursor to the start of a row (0-based)"""
+    return f"\033[{row + 1};1H"
+
+
+class FrameRenderer:
+    """
+    Draws whole-screen frames by writing only what changed since the previous frame.
+    `last_frame_bytes`, `total_bytes` and `frame_count` record the output volume.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream
+        self._previous: list[str] | None = None
+        self.last_frame_bytes = 0
+        self.total_bytes = 0
+        self.frame_count = 0
+
+    def invalidate(self):
+        """Forgets the previous frame, e.g. after something else wrote to the terminal"""
+        self._previous = None
+
+    def _fits(self, lines: list[str]) -> bool:
+        columns, rows = shutil.get_terminal_size()
+        return len(lines) < rows and all(cell_width(line) < columns for line in lines)
+
+    def diff(self, lines: list[str]) -> str:
+        """Returns the output turning the previous frame into `lines`, and remembers them as the new frame"""
+        previous = self._previous
+        self._previous = lines
+        if previous is None or not self._fits(lines):
+            return CLEAR_SCREEN + "\r\n".join(lines) + "\r\n"
+        parts = []
+        for row, line in enumerate(lines):
+            if row >= len(previous) or previous[row] != line:
+                parts.append(move_cursor(row) + line + CLEAR_LINE_END)
+        if len(lines) < len(previous):
+            parts.append(move_cursor(len(lines)) + CLEAR_SCREEN_END)
+        # Leave the cursor below the frame, where a full redraw would have left it
+        parts.append(move_cursor(len(lines)))
+        return "".join(parts)
+
+    def render(self, text: str) -> int:
+        """Draws a frame of text and returns the number of bytes written"""
+        metrics.since("state", "state.update")
+        with metrics.timer("frame.render"):
+            lines = text.split("\n")
+            if lines and lines[-1] == "":
+                lines.pop()
+            data = self.diff(lines)
+            stream = self.stream or sys.stdout
+            stream.write(data)
+            stream.flush()
+        size = len(data.encode("utf-8"))
+        self.last_frame_bytes = size
+        self.total_bytes += size
+        self.frame_count += 1
+        metrics.count("frame.count")
+        metrics.count("frame.bytes", size)
+        metrics.since("input", "input.to_frame")
+        return size
+
+    @contextlib.contextmanager
+    def frame(self):
+        """Captures everything printed inside the block and draws it as one frame"""
+        buffer = io.StringIO()
+        with contextlib.redirect_stdout(buffer):
+            yield buffer
+        self.render(buffer.getvalue())
+
+
+def available_rows(reserved: int, minimum: int = 3) -> int:
+    """Number of terminal rows left for a table when `reserved` rows of the frame are taken by other content"""
+    return max(shutil.get_terminal_size().lines - reserved, minimum)
+
+
+class TableView:
+    """
+    Bordered table (the layout of `display_table` in interactive.py) that draws only the rows fitting on screen.
+
+    Column widths are kept per column as counts of cell widths, so replacing a row updates them without
+    rescanning the table, and formatted rows are cached until a width changes.
+    With `max_rows`, `lines` scrolls a window of rows to follow the selection, so drawing costs
+    the height of the window, not the length of the table.
+    """
+
+    def __init__(self, headers: list[str] | None = None, rows: list[list] | None = None, tab_space: int = 4):
+        self.headers = [str(cell) for cell in headers] if headers else []
+        self.tab_space = tab_space
+        self.offset = 0                 # first row of the visible window
+        self.page_size = 1              # rows in the last window drawn, for page up/down
+        self.widths = None
+        self.set_rows(rows or [])
+
+    def __len__(self):
+        return len(self.rows)
+
+    def set_rows(self, rows: list[list]):
+        """Replaces every row (recounting the column widths once)"""
+        self.rows = [[str(cell) for cell in row] for row in rows]
+        column_count = len(self.headers) or (len(self.rows[0]) if self.rows else 0)
+        self._width_counts = [{} for _ in range(column_count)]
+        for row in self.rows:
+            self._count_widths(row, 1)
+        self._formatted = {}
+        self._update_widths()
+
+    def set_row(self, index: int, row: list):
+        """Replaces one row, updating the column widths from the cells that changed"""
+        row = [str(cell) for cell in row]
+        old = self.rows[index]
+        if old == row:
+            return
+        self._count_widths(old, -1)
+        self._count_widths(row, 1)
+        self.rows[index] = row
+        self._formatted.pop(index, None)
+        self._update_widths()
+
+    def _count_widths(self, row: list[str], delta: int):
+        for counts, cell in zip(self._width_counts, row):
+            width = len(cell)
+            count = counts.get(width, 0) + delta
+            if count: counts[width] = count
+            else: del counts[width]
+
+    def _update_widths(self):
+        widths = [max(counts, default=0) for counts in self._width_counts]
+        for i, header in enumerate(self.headers):
+            widths[i] = max(widths[i], len(header))
+        if widths != self.widths:
+            self.widths = widths
+            self._row_format = "|" + "|".join(f" {{:<{w}}} " for w in widths) + "|"
+            self._rule = "+" + "+".join("-" * (w + 2) for w in widths) + "+"
+            self._formatted = {}
+
+    def _format(self, index: int) -> str:
+        text = self._formatted.get(index)
+        if text is None:
+            text = self._formatted[index] = self._row_format.format(*self.rows[index])
+        return text
+
+    def lines(self, selected_index: int = -1, max_rows: int | None = None) -> list[str]:
+        """
+        Returns the table lines, with the selected row marked.
+        With `max_rows`, only a window of that many rows around the selection is included,
+        followed by a line telling which rows are shown.
+        """
+        count = len(self.rows)
+        if max_rows is None or count <= max_rows:
+            first, last = 0, count
+        else:
+            offset = self.offset
+            if 0 <= selected_index < offset:
+                offset = selected_index
+            elif selected_index >= offset + max_rows:
+                offset = selected_index - max_rows + 1
+            offset = min(max(offset, 0), count - max_rows)
+            first, last = offset, offset + max_rows
+        self.offset = first
+        self.page_size = max(last - first, 1)
+
+        padding = " " * self.tab_space if selected_index > -1 else ""
+        rule = f"{padding} {self._rule}"
+        lines = []
+        if self.headers:
+            lines.append(rule)
+            lines.append(f"{padding} {self._row_format.format(*self.headers)}")
+        lines.append(rule)
+        for i in range(first, last):
+            if i == selected_index: lines.append(f"{'> ':>{self.tab_space}} {self._format(i)} <")
+            else: lines.append(f"{padding} {self._format(i)}")
+        lines.append(rule)
+        if last - first < count:
+            lines.append(f"{padding} Rows {first + 1}-{last} of {count}  [PgUp/PgDn] Page")
+        return lines
@@ -0,0 +1,200 @@
+"""
+Type-ahead search over menu item IDs and names.
+
+`MenuSearchIndex` is built once per menu:
+- sorted item IDs and the sorted distinct words of item names, searched by prefix with `bisect`
+- for each name word, the items using it
+- a trigram index over the name words, for typo-tolerant matches
+
+A query is split into words. Every word must match a word of the item's name by prefix, or, for words of
+`FUZZY_MIN_LENGTH` characters or more, within `max_typos(word)` edits of one. A one-word query also matches
+item IDs by prefix. Exact (prefix) matches come before typo-tolerant ones.
+
+Query words are first resolved against the (small) vocabulary of name words, and matches are cached,
+so each keystroke only works on the items of the words typed, stopping once `limit` items are found.
+"""
+import bisect
+import heapq
+import re
+
+FUZZY_MIN_LENGTH = 3
+# Query words whose matches are kept between keystrokes
+WORD_CACHE_SIZE = 1024
+# Sorts after any character that can appear in a word, to find the end of a prefix range
+PREFIX_END = "\U0010ffff"
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def normalize_words(text: str) -> list[str]:
+    """Lowercase words of a query or an item name"""
+    return WORD_PATTERN.findall(text.lower())
+
+
+def trigrams(word: str) -> set[str]:
+    """Trigrams of a word, anchored at its start (type-ahead queries are prefixes)"""
+    padded = "$" + word
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def max_typos(word: str) -> int:
+    """Edits tolerated for a query word: one up to 6 characters, two after that"""
+    return 1 if len(word) <= 6 else 2
+
+
+def prefix_distance(word: str, token: str, limit: int) -> int:
+    """
+    Smallest edit distance between `word` and any prefix of `token`
+    (returns `limit + 1` as soon as it is known to be over `limit`)
+    """
+    # Row i holds the distances from word[:i] to every token[:j]
+    previous = list(range(len(token) + 1))
+    for i, ch in enumerate(word, 1):
+        current = [i]
+        for j, other in enumerate(token, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ch != other)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return min(previous)
+
+
+class MenuSearchIndex:
+    """Search index over a menu (a list of item dicts with `"id"` and `"name"`)"""
+
+    def __init__(self, menu: list[dict]):
+        self.items = menu
+        self._item_words = [normalize_words(item["name"]) for item in menu]
+        # Sorted (key, item index) pairs, kept as two lists so keys can be bisected
+        ids = sorted((item["id"].lower(), i) for i, item in enumerate(menu))
+        self._id_keys = [key for key, _ in ids]
+        self._id_items = [i for _, i in ids]
+        # Distinct name words with the items using them (in menu order), and trigram -> word numbers
+        self._vocabulary_items: dict[str, list[int]] = {}
+        for i, words in enumerate(self._item_words):
+            for word in set(words):
+                self._vocabulary_items.setdefault(word, []).append(i)
+        self._vocabulary = sorted(self._vocabulary_items)
+        self._vocabulary_sets = {word: set(items) for word, items in self._vocabulary_items.items()}
+        self._trigram_words: dict[str, list[int]] = {}
+        for number, word in enumerate(self._vocabulary):
+            for gram in trigrams(word):
+                self._trigram_words.setdefault(gram, []).append(number)
+        self._word_cache: dict[tuple[str, bool], WordMatches] = {}
+
+    def __len__(self):
+        return len(self.items)
+
+    def _fuzzy_words(self, word: str) -> list[str]:
+        """Distinct name words within `max_typos(word)` edits of `word` (as a prefix), closest first"""
+        grams = trigrams(word)
+        limit = max_typos(word)
+        # Each edit changes at most 3 trigrams, so candidates share the rest
+        needed = max(len(grams) - 3 * limit, 1)
+        counts = {}
+        for gram in grams:
+            for number in self._trigram_words.get(gram, ()):
+                counts[number] = counts.get(number, 0) + 1
+        vocabulary = self._vocabulary
+        matches = []
+        for number, count in counts.items():
+            if count >= needed:
+                distance = prefix_distance(word, vocabulary[number], limit)
+                if distance <= limit:
+                    matches.append((distance, vocabulary[number]))
+        return [token for _, token in sorted(matches)]
+
+    def _word_matches(self, word: str, fuzzy: bool) -> "WordMatches":
+        """Name words matching a query word, cached as the query is typed out"""
+        key = (word, fuzzy)
+        matches = self._word_cache.get(key)
+        if matches is None:
+            start = bisect.bisect_left(self._vocabulary, word)
+            end = bisect.bisect_left(self._vocabulary, word + PREFIX_END, start)
+            tokens = self._vocabulary[start:end]
+            if fuzzy and len(word) >= FUZZY_MIN_LENGTH:
+                tokens += [token for token in self._fuzzy_words(word) if not token.startswith(word)]
+            if len(self._word_cache) >= WORD_CACHE_SIZE:
+                self._word_cache.clear()
+            matches = self._word_cache[key] = WordMatches(self, tokens)
+        return matches
+
+    def _candidates(self, words: list[str], fuzzy: bool, limit: int, exclude: set[int]) -> list[int]:
+        """
+        Up to `limit` items (in menu order, not in `exclude`) matching every query word.
+        Query words matching a single name word are intersected as sets; the items left are then walked
+        in menu order, checking the other query words on each item's own words, until `limit` items pass.
+        """
+        matches = sorted((self._word_matches(word, fuzzy) for word in words), key=lambda m: m.item_count)
+        if matches[0].item_count == 0:
+            return []
+        singles = [match for match in matches if len(match.tokens) == 1]
+        if len(singles) > 1:
+            sets = sorted((self._vocabulary_sets[match.tokens_in_order[0]] for match in singles), key=len)
+            ordered = sorted(sets[0].intersection(*sets[1:]))
+            rest = [match for match in matches if len(match.tokens) > 1]
+        elif singles:
+            ordered = self._vocabulary_items[singles[0].tokens_in_order[0]]
+            rest = [match for match in matches if match is not singles[0]]
+        else:
+            # Items using any of the name words, merged back into menu order
+            ordered = heapq.merge(*(self._vocabulary_items[token] for token in matches[0].tokens_in_order))
+            rest = matches[1:]
+        checks = [match.tokens for match in rest]
+        item_words = self._item_words
+        found = []
+        previous = None
+        for i in ordered:
+            if i == previous or i in exclude:
+                continue
+            previous = i
+            if all(not tokens.isdisjoint(item_words[i]) for tokens in checks):
+                found.append(i)
+                if len(found) == limit:
+                    break
+        return found
+
+    def search(self, query: str, limit: int = 10) -> list[dict]:
+        """Returns up to `limit` menu items matching a (partial) query, best matches first"""
+        words = normalize_words(query)
+        if not words or limit <= 0:
+            return []
+        found = []
+        seen = set()
+
+        def collect(item_indices) -> bool:
+            """Adds items in order, returning True once `limit` is reached"""
+            for i in item_indices:
+                if i not in seen:
+                    seen.add(i)
+                    found.append(self.items[i])
+                    if len(found) == limit:
+                        return True
+            return False
+
+        if len(words) == 1:
+            # Any item in the ranges matches, so stop as soon as there are enough
+            word = words[0]
+            start = bisect.bisect_left(self._id_keys, word)
+            end = bisect.bisect_left(self._id_keys, word + PREFIX_END, start)
+            if collect(self._id_items[n] for n in range(start, end)):
+                return found
+            for token in self._word_matches(word, True).tokens_in_order:
+                if collect(self._vocabulary_items[token]):
+                    return found
+            return found
+
+        # Several words (IDs have no spaces): exact prefix matches in menu order, then typo-tolerant ones
+        collect(self._candidates(words, False, limit, seen))
+        if len(found) < limit and any(len(word) >= FUZZY_MIN_LENGTH for word in words):
+            collect(self._candidates(words, True, limit - len(found), seen))
+        return found
+
+
+class WordMatches:
+    """Name words matching one query word, and how many items use them"""
+
+    def __init__(self, index: MenuSearchIndex, tokens: list[str]):
+        self.tokens_in_order = tokens
+        self.tokens = set(tokens)
+        self.item_count = sum(len(index._vocabulary_items[token]) for token in tokens)
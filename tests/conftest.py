@@ -0,0 +1,26 @@
+"""
+Shared fixtures. The project is a flat directory of modules, so it is put on `sys.path` for plain `pytest` runs.
+
+Run with: python -m pytest tests
+"""
+import copy
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog import MenuCatalog  # noqa: E402
+from menu_data import MENU  # noqa: E402
+
+
+@pytest.fixture
+def menu() -> list[dict]:
+    """A copy of the default menu, free to edit"""
+    return copy.deepcopy(MENU)
+
+
+@pytest.fixture
+def catalog(menu) -> MenuCatalog:
+    return MenuCatalog(menu)
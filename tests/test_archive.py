@@ -0,0 +1,84 @@
+import pytest
+
+from archive import OrderArchive
+from journal import INDEX_ENTRY, INDEX_MAGIC, JOURNAL_MAGIC, OrderJournal, index_path
+
+ORDERS = 5
+
+
+@pytest.fixture
+def journal_file(tmp_path) -> str:
+    path = str(tmp_path / "orders.journal")
+    with OrderJournal(path) as journal:
+        for order_number in range(1, ORDERS + 1):
+            journal.append({"order_number": order_number, "total": order_number * 100})
+    return path
+
+
+def swap_index_entries(path: str, first: int, second: int):
+    """Points the index entries of two order numbers at each other's records"""
+    with open(index_path(path), "r+b") as f:
+        data = bytearray(f.read())
+        a = len(INDEX_MAGIC) + (first - 1) * INDEX_ENTRY.size
+        b = len(INDEX_MAGIC) + (second - 1) * INDEX_ENTRY.size
+        data[a:a + INDEX_ENTRY.size], data[b:b + INDEX_ENTRY.size] = data[b:b + INDEX_ENTRY.size], data[a:a + INDEX_ENTRY.size]
+        f.seek(0)
+        f.write(data)
+
+
+def test_orders_are_found_by_number(journal_file):
+    with OrderArchive(journal_file) as archive:
+        assert len(archive) == ORDERS
+        for order_number in range(1, ORDERS + 1):
+            assert archive.get_record(order_number) == {"order_number": order_number, "total": order_number * 100}
+
+
+@pytest.mark.parametrize("order_number", [0, ORDERS + 1, -1])
+def test_unknown_order_number_raises_key_error(journal_file, order_number):
+    with OrderArchive(journal_file) as archive:
+        with pytest.raises(KeyError):
+            archive.get_record(order_number)
+
+
+def test_wrong_index_entry_never_returns_another_order(journal_file):
+    swap_index_entries(journal_file, 2, 4)
+    with OrderArchive(journal_file) as archive:
+        # The swapped entries still end inside the journal, so the index is not rebuilt
+        assert archive.get_record(2)["order_number"] == 2
+        assert archive.get_record(4)["order_number"] == 4
+        assert archive.get_record(3)["order_number"] == 3
+
+
+def test_order_missing_from_the_journal_is_reported(journal_file):
+    swap_index_entries(journal_file, 1, 5)
+    data = bytearray(open(journal_file, "rb").read())
+    # Corrupt the last record: order 5 is no longer in the journal, and its index entry points at order 1
+    data[-2] ^= 0xFF
+    open(journal_file, "wb").write(data)
+    with OrderArchive(journal_file) as archive:
+        with pytest.raises(ValueError):
+            archive.get_record(5)
+
+
+def test_missing_index_is_rebuilt(journal_file, tmp_path):
+    (tmp_path / "orders.idx").unlink()
+    with OrderArchive(journal_file) as archive:
+        assert len(archive) == ORDERS
+        assert archive.get_record(3)["order_number"] == 3
+
+
+@pytest.mark.parametrize("content", [b"", JOURNAL_MAGIC[:4], JOURNAL_MAGIC])
+def test_empty_journal_has_no_orders(tmp_path, content):
+    path = tmp_path / "orders.journal"
+    path.write_bytes(content)
+    with OrderArchive(str(path)) as archive:
+        assert len(archive) == 0
+        with pytest.raises(KeyError):
+            archive.get_record(1)
+
+
+def test_other_files_are_refused(tmp_path):
+    path = tmp_path / "orders.journal"
+    path.write_bytes(b"not a journal at all")
+    with pytest.raises(ValueError):
+        OrderArchive(str(path))
@@ -0,0 +1,107 @@
+import random
+
+import pytest
+
+from cart import Cart, order_signature
+from pricing import to_cents
+
+MAX_QUANTITY = 10
+
+
+def make_order(catalog, item_id: str, quantity: int, rng: random.Random | None = None) -> dict:
+    """A cart order for an item, with a random valid selection if it is a combo"""
+    item = catalog.get_item_by_id(item_id)
+    order = {"id": item_id, "code": item["code"], "name": item["name"], "price": item["price"], "quantity": quantity}
+    if "item_ref_ids" in item:
+        rng = rng or random.Random(0)
+        order["options"] = {
+            section["section"]: [option["id"] for option in rng.sample(section["options"], section["quantity"])]
+            for section in catalog.resolve_combo(item_id)
+        }
+    return order
+
+
+def check_invariants(cart: Cart):
+    """The running totals and the index agree with the orders, as stored by `to_lines`"""
+    lines = cart.to_lines()
+    assert cart.subtotal_cents == sum(line["total"] for line in lines)
+    assert cart.item_count == sum(line["quantity"] for line in lines)
+    for order, line in zip(cart, lines):
+        assert line["total"] == to_cents(order["price"]) * order["quantity"]
+        assert to_cents(order["total"]) == line["total"]
+        assert 1 <= order["quantity"] <= MAX_QUANTITY
+    by_category = {}
+    for order, line in zip(cart, lines):
+        by_category[order["code"].category] = by_category.get(order["code"].category, 0) + line["total"]
+    assert cart.category_totals == {code: cents / 100 for code, cents in by_category.items() if cents}
+    signatures = [order_signature(order) for order in cart]
+    assert len(set(signatures)) == len(signatures), "identical orders must be merged"
+    for order in cart:
+        assert cart.find(order) is order
+
+
+def test_identical_orders_merge(catalog):
+    cart = Cart(MAX_QUANTITY)
+    first = cart.add(make_order(catalog, "B01", 2))
+    assert cart.add(make_order(catalog, "B01", 3)) is first
+    assert len(cart) == 1 and first["quantity"] == 5
+    check_invariants(cart)
+
+
+def test_combo_selection_order_does_not_matter(catalog):
+    cart = Cart(MAX_QUANTITY)
+    order = make_order(catalog, "C01", 1)
+    cart.add(order)
+    same = dict(make_order(catalog, "C01", 1), options={section: list(reversed(ids)) for section, ids in reversed(order["options"].items())})
+    assert cart.add(same) is order
+    assert order["quantity"] == 2
+    check_invariants(cart)
+
+
+def test_merge_over_the_limit_is_refused_and_changes_nothing(catalog):
+    cart = Cart(MAX_QUANTITY)
+    cart.add(make_order(catalog, "B01", MAX_QUANTITY - 1))
+    before = cart.to_lines()
+    with pytest.raises(ValueError):
+        cart.add(make_order(catalog, "B01", 2))
+    assert cart.to_lines() == before
+    check_invariants(cart)
+
+
+def test_editing_a_combo_into_another_line_merges_them(catalog):
+    cart = Cart(MAX_QUANTITY)
+    first = make_order(catalog, "C01", 2, random.Random(1))
+    second = make_order(catalog, "C01", 3, random.Random(2))
+    assert order_signature(first) != order_signature(second)
+    cart.add(first)
+    cart.add(second)
+    index = cart.set_options(1, dict(first["options"]))
+    assert len(cart) == 1 and index == 0
+    assert cart[0]["quantity"] == 5
+    check_invariants(cart)
+
+
+def test_random_edits_keep_totals_in_step(catalog):
+    rng = random.Random(42)
+    item_ids = list(catalog.items_by_id)
+    cart = Cart(MAX_QUANTITY)
+    for _ in range(2_000):
+        action = rng.random()
+        try:
+            if action < 0.4 or not len(cart):
+                cart.add(make_order(catalog, rng.choice(item_ids), rng.randint(1, 4), rng))
+            elif action < 0.6:
+                cart.set_quantity(rng.randrange(len(cart)), rng.randint(1, MAX_QUANTITY))
+            elif action < 0.75:
+                combos = [i for i, order in enumerate(cart) if "options" in order]
+                if combos:
+                    index = rng.choice(combos)
+                    cart.set_options(index, make_order(catalog, cart[index]["id"], 1, rng)["options"])
+            elif action < 0.95:
+                cart.pop(rng.randrange(len(cart)))
+            else:
+                cart.clear()
+        except ValueError:
+            # Over the quantity limit: refused without changing the cart
+            pass
+        check_invariants(cart)
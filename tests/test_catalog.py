@@ -0,0 +1,138 @@
+import copy
+import random
+
+import pytest
+
+from benchmarks.menu_gen import generate_menu
+from catalog import MenuCatalog
+
+
+def resolved(catalog: MenuCatalog, combo_id: str) -> list:
+    """A combo's sections as plain values, to compare catalogs built different ways"""
+    return [
+        (section["section"], [option["id"] for option in section["options"]], section["quantity"], section["locked"])
+        for section in catalog.resolve_combo(combo_id)
+    ]
+
+
+def assert_same_catalog(updated: MenuCatalog, rebuilt: MenuCatalog):
+    assert [item["id"] for item in updated.menu] == [item["id"] for item in rebuilt.menu]
+    assert updated.items_by_id == rebuilt.items_by_id
+    assert {code: [item["id"] for item in items] for code, items in updated.items_by_category.items() if items} == \
+        {code: [item["id"] for item in items] for code, items in rebuilt.items_by_category.items()}
+    for item in rebuilt.menu:
+        assert updated.get_item_by_id(item["id"]) == item
+        if "item_ref_ids" in item:
+            assert resolved(updated, item["id"]) == resolved(rebuilt, item["id"])
+
+
+def change_price(menu, item_id="B02"):
+    next(item for item in menu if item["id"] == item_id)["price"] += 1
+
+
+def add_drink(menu):
+    menu.append({"id": "D99", "name": "Lemonade", "price": 2.10})
+
+
+def remove_drink(menu):
+    # Offered through the "D" wildcard of C01 and C02 only
+    menu.remove(next(item for item in menu if item["id"] == "D03"))
+
+
+def rename_combo(menu):
+    next(item for item in menu if item["id"] == "C02")["name"] = "Nugget Meal"
+
+
+def swap_combo_option(menu):
+    next(item for item in menu if item["id"] == "C03")["item_ref_ids"]["Main"] = [["B01"], 1]
+
+
+def move_combo(menu):
+    # C01 moves to the top of the menu but stays the first combo
+    menu.insert(0, menu.pop(next(i for i, item in enumerate(menu) if item["id"] == "C01")))
+
+
+EDITS = {
+    "price": (change_price, {"B"}),
+    "add": (add_drink, {"D"}),
+    "remove": (remove_drink, {"D"}),
+    "combo name": (rename_combo, {"C"}),
+    "combo option": (swap_combo_option, {"C"}),
+    # Same items in each category: nothing changed, but the menu order follows the file
+    "order": (move_combo, set()),
+}
+
+
+@pytest.mark.parametrize("name", EDITS)
+def test_updated_matches_a_full_rebuild(menu, name):
+    edit, expected_changed = EDITS[name]
+    catalog = MenuCatalog(copy.deepcopy(menu))
+    for item in catalog.menu:
+        if "item_ref_ids" in item:
+            catalog.resolve_combo(item["id"])
+    edit(menu)
+
+    updated, changed = catalog.updated(copy.deepcopy(menu))
+    assert changed == expected_changed
+    assert updated.version == catalog.version + 1
+    assert_same_catalog(updated, MenuCatalog(copy.deepcopy(menu)))
+
+
+def test_updated_leaves_the_old_catalog_alone(menu):
+    catalog = MenuCatalog(copy.deepcopy(menu))
+    before = resolved(catalog, "C01")
+    prices = {item["id"]: item["price"] for item in catalog.menu}
+    remove_drink(menu)
+    change_price(menu, "B01")
+
+    updated, _ = catalog.updated(copy.deepcopy(menu))
+    assert "D03" in catalog and "D03" not in updated
+    assert {item["id"]: item["price"] for item in catalog.menu} == prices
+    assert resolved(catalog, "C01") == before
+    assert "D03" in resolved(catalog, "C01")[2][1]
+    assert "D03" not in resolved(updated, "C01")[2][1]
+
+
+def test_unchanged_categories_and_combos_are_reused(menu):
+    catalog = MenuCatalog(copy.deepcopy(menu))
+    sections = {item["id"]: catalog.resolve_combo(item["id"]) for item in catalog.menu if "item_ref_ids" in item}
+    change_price(menu, "DS01")
+
+    updated, changed = catalog.updated(copy.deepcopy(menu))
+    assert changed == {"DS"}
+    assert updated.items_by_category["B"] is catalog.items_by_category["B"]
+    assert updated.get_item_by_id("B01") is catalog.get_item_by_id("B01")
+    # Only C04 offers desserts: every other resolved combo is carried over as it is
+    for combo_id, combo_sections in sections.items():
+        assert (updated.resolve_combo(combo_id) is combo_sections) == (combo_id != "C04")
+
+
+def test_combo_referring_to_a_changed_category_is_resolved_again(menu):
+    catalog = MenuCatalog(copy.deepcopy(menu))
+    old_sections = catalog.resolve_combo("C01")
+    change_price(menu, "B02")
+
+    updated, _ = catalog.updated(copy.deepcopy(menu))
+    new_sections = updated.resolve_combo("C01")
+    assert new_sections is not old_sections
+    assert next(option for option in new_sections[0]["options"] if option["id"] == "B02")["price"] == \
+        next(option for option in old_sections[0]["options"] if option["id"] == "B02")["price"] + 1
+
+
+def test_duplicate_item_ids_are_refused(menu):
+    catalog = MenuCatalog(copy.deepcopy(menu))
+    menu.append(dict(menu[0]))
+    with pytest.raises(ValueError):
+        catalog.updated(copy.deepcopy(menu))
+
+
+def test_random_edits_of_a_large_menu_match_a_full_rebuild():
+    rng = random.Random(7)
+    menu = generate_menu(2_000, seed=3)
+    catalog = MenuCatalog(copy.deepcopy(menu))
+    for _ in range(20):
+        plain = [i for i, item in enumerate(menu) if "item_ref_ids" not in item]
+        for index in rng.sample(plain, 5):
+            menu[index] = dict(menu[index], price=round(menu[index]["price"] + 0.5, 2))
+        catalog, _ = catalog.updated(copy.deepcopy(menu))
+        assert_same_catalog(catalog, MenuCatalog(copy.deepcopy(menu)))
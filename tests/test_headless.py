@@ -0,0 +1,35 @@
+import io
+import json
+
+from headless import process_stream
+
+
+def run(catalog, data) -> tuple[tuple[int, int], list[dict]]:
+    output = io.StringIO()
+    counts = process_stream(catalog, io.BytesIO(data) if isinstance(data, bytes) else io.StringIO(data), output)
+    return counts, [json.loads(line) for line in output.getvalue().splitlines()]
+
+
+def test_orders_are_priced(catalog):
+    counts, results = run(catalog, '{"order_id": 1, "items": [{"id": "B01", "quantity": 2}]}\n\n{"order_id": 2, "items": [{"id": "D01"}]}\n')
+    assert counts == (2, 0)
+    assert [result["order_id"] for result in results] == [1, 2]
+    assert all(result["status"] == "ok" and result["total"] == result["subtotal"] - result["discount"] + result["gst"] for result in results)
+
+
+def test_bad_lines_are_reported_and_the_stream_goes_on(catalog):
+    lines = [
+        b'{"order_id": 1, "items": [{"id": "B01"}]}',
+        b'{"order_id": 2, "items": [{"id": "\xff"}]}',
+        b"[" * 100_000 + b"]" * 100_000,
+        b"not json",
+        b'["not", "an", "object"]',
+        b'{"order_id": 6, "items": [{"id": "X99"}]}',
+        b'{"order_id": 7, "discount": "Nobody", "items": [{"id": "B01"}]}',
+        b'{"order_id": 8, "items": [{"id": "B01"}]}',
+    ]
+    counts, results = run(catalog, b"\n".join(lines) + b"\n")
+    assert counts == (2, 6)
+    assert [result["status"] for result in results] == ["ok"] + ["error"] * 6 + ["ok"]
+    assert [result["line"] for result in results[1:-1]] == [2, 3, 4, 5, 6, 7]
+    assert results[-1]["order_id"] == 8
@@ -0,0 +1,134 @@
+import multiprocessing
+import os
+import threading
+
+import pytest
+
+from cart import Cart
+from journal import INDEX_ENTRY, INDEX_MAGIC, JOURNAL_MAGIC, OrderJournal, encode_record, index_path, scan_journal
+
+WRITERS = 4
+APPENDS_PER_WRITER = 25
+
+
+def order_numbers(path: str) -> list[int]:
+    return [record["order_number"] for record in scan_journal(path).records]
+
+
+def checkout(journal: OrderJournal) -> dict:
+    """Appends the order of a one-burger cart, numbered by the journal"""
+    cart = Cart(10)
+    cart.add({"id": "B01", "name": "Classic Beef Burger", "price": 5.50, "quantity": 1})
+    return journal.append_order(cart, None, 0.0, 0.09)
+
+
+def append_numbered(path: str, count: int):
+    """Appends `count` orders (also run in other processes)"""
+    with OrderJournal(path) as journal:
+        for _ in range(count):
+            checkout(journal)
+
+
+def index_entries(path: str) -> list[tuple[int, int]]:
+    with open(index_path(path), "rb") as f:
+        data = f.read()
+    assert data[:len(INDEX_MAGIC)] == INDEX_MAGIC
+    return [INDEX_ENTRY.unpack_from(data, offset) for offset in range(len(INDEX_MAGIC), len(data), INDEX_ENTRY.size)]
+
+
+def test_new_journal_numbers_from_one(tmp_path):
+    path = str(tmp_path / "orders.journal")
+    with OrderJournal(path) as journal:
+        assert [checkout(journal)["order_number"] for _ in range(3)] == [1, 2, 3]
+    assert order_numbers(path) == [1, 2, 3]
+    assert index_entries(path) == scan_journal(path).entries
+
+
+def test_torn_tail_is_truncated_and_numbering_continues(tmp_path):
+    path = str(tmp_path / "orders.journal")
+    append_numbered(path, 3)
+    intact_size = os.path.getsize(path)
+    with open(path, "ab") as f:
+        # A crash in the middle of the fourth record
+        f.write(encode_record({"order_number": 4})[:-5])
+
+    state = scan_journal(path)
+    assert len(state.records) == 3 and state.torn_bytes > 0
+
+    with OrderJournal(path) as journal:
+        assert journal.order_count == 3
+        assert os.path.getsize(path) == intact_size
+        checkout(journal)
+    assert order_numbers(path) == [1, 2, 3, 4]
+    assert scan_journal(path).torn_bytes == 0
+    assert index_entries(path) == scan_journal(path).entries
+
+
+def test_corrupt_record_ends_the_valid_journal(tmp_path):
+    path = str(tmp_path / "orders.journal")
+    append_numbered(path, 3)
+    data = bytearray(open(path, "rb").read())
+    # Flip a byte of the last payload: its checksum no longer matches
+    data[-2] ^= 0xFF
+    open(path, "wb").write(data)
+
+    with OrderJournal(path) as journal:
+        assert journal.order_count == 2
+        checkout(journal)
+    assert order_numbers(path) == [1, 2, 3]
+
+
+def test_header_cut_short_by_a_crash_is_written_again(tmp_path):
+    path = str(tmp_path / "orders.journal")
+    open(path, "wb").write(JOURNAL_MAGIC[:3])
+    append_numbered(path, 2)
+    assert open(path, "rb").read(len(JOURNAL_MAGIC)) == JOURNAL_MAGIC
+    assert order_numbers(path) == [1, 2]
+
+
+def test_index_is_rebuilt_when_out_of_step(tmp_path):
+    path = str(tmp_path / "orders.journal")
+    append_numbered(path, 3)
+    os.remove(index_path(path))
+    with OrderJournal(path) as journal:
+        checkout(journal)
+    assert index_entries(path) == scan_journal(path).entries
+
+
+def test_writers_in_one_process_number_without_gaps(tmp_path):
+    path = str(tmp_path / "orders.journal")
+    journals = [OrderJournal(path) for _ in range(WRITERS)]
+
+    def run(journal):
+        for _ in range(APPENDS_PER_WRITER):
+            checkout(journal)
+
+    threads = [threading.Thread(target=run, args=(journal,)) for journal in journals]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for journal in journals:
+        journal.close()
+    assert order_numbers(path) == list(range(1, WRITERS * APPENDS_PER_WRITER + 1))
+    assert index_entries(path) == scan_journal(path).entries
+
+
+def test_writer_processes_number_without_gaps(tmp_path):
+    path = str(tmp_path / "orders.journal")
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=append_numbered, args=(path, APPENDS_PER_WRITER)) for _ in range(WRITERS)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+    assert order_numbers(path) == list(range(1, WRITERS * APPENDS_PER_WRITER + 1))
+    assert index_entries(path) == scan_journal(path).entries
+
+
+def test_closed_journal_refuses_appends(tmp_path):
+    journal = OrderJournal(str(tmp_path / "orders.journal"))
+    journal.close()
+    with pytest.raises(ValueError):
+        journal.append({"order_number": 1})
@@ -0,0 +1,122 @@
+import json
+import os
+
+import pytest
+
+from menu_source import MenuSource, parse_menu_file, write_default_menu
+
+
+@pytest.fixture
+def menu_path(tmp_path) -> str:
+    path = str(tmp_path / "menu.json")
+    write_default_menu(path)
+    return path
+
+
+def read_document(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_document(path: str, document):
+    data = document if isinstance(document, str) else json.dumps(document)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(data)
+    # Another size or a later mtime, so the change is seen even within the clock's resolution
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def item(document: dict, item_id: str) -> dict:
+    return next(item for item in document["menu"] if item["id"] == item_id)
+
+
+def test_default_menu_parses(menu_path):
+    menu, settings = parse_menu_file(open(menu_path, "rb").read())
+    assert len(menu) == len(read_document(menu_path)["menu"])
+    assert 0 <= settings["gst"] < 1
+
+
+INVALID = {
+    "not an object": lambda document: [],
+    "negative price": lambda document: item(document, "B01").update(price=-1),
+    "unknown category": lambda document: document["menu"].append({"id": "X01", "name": "Mystery", "price": 1}),
+    "dangling option": lambda document: item(document, "C01")["item_ref_ids"].update(Fries=[["S99"], 1]),
+    "unknown wildcard": lambda document: item(document, "C01")["item_ref_ids"].update(Fries=[["Q"], 1]),
+    "quantity over options": lambda document: item(document, "C03")["item_ref_ids"].update(Main=[["B03"], 2]),
+    "malformed section": lambda document: item(document, "C03")["item_ref_ids"].update(Main="B03"),
+    "gst": lambda document: document.update(gst=1.5),
+}
+
+
+@pytest.mark.parametrize("name", INVALID)
+def test_invalid_menus_are_refused(menu_path, name):
+    document = read_document(menu_path)
+    result = INVALID[name](document)
+    with pytest.raises(ValueError):
+        parse_menu_file(json.dumps(document if result is None else result).encode())
+
+
+def test_invalid_menu_at_start_up_names_the_file_and_item(menu_path):
+    document = read_document(menu_path)
+    document["menu"] = [entry for entry in document["menu"] if entry["id"] != "S01"]
+    write_document(menu_path, document)
+    with pytest.raises(ValueError, match=r"menu\.json.*C01.*S01"):
+        MenuSource(menu_path)
+
+
+def test_reload_replaces_the_menu(menu_path):
+    source = MenuSource(menu_path)
+    old = source.current
+    document = read_document(menu_path)
+    item(document, "B01")["price"] = 9.99
+    write_document(menu_path, document)
+
+    assert source.reload()
+    assert source.current is not old
+    assert source.current.catalog.get_item_by_id("B01")["price"] == 9.99
+    assert old.catalog.get_item_by_id("B01")["price"] != 9.99
+    assert source.error is None and source.reload_count == 1
+    assert not source.reload()
+
+
+def test_refused_reload_keeps_the_menu_and_reports_once(menu_path):
+    errors = []
+    source = MenuSource(menu_path, on_error=errors.append)
+    old = source.current
+    original = open(menu_path, encoding="utf-8").read()
+    write_document(menu_path, "{broken")
+
+    assert not source.reload()
+    assert source.current is old
+    assert source.error and menu_path in source.error
+    assert errors == [source.error]
+    # The same broken file is not parsed or reported again
+    assert not source.reload()
+    assert len(errors) == 1
+
+    # Put back as it was: nothing to replace, and the error is cleared
+    write_document(menu_path, original)
+    assert not source.reload()
+    assert source.current is old and source.error is None
+
+
+def test_menu_fixed_after_a_refused_reload_is_loaded(menu_path):
+    source = MenuSource(menu_path)
+    write_document(menu_path, "{broken")
+    source.reload()
+    write_default_menu(menu_path)
+    document = read_document(menu_path)
+    item(document, "D01")["price"] = 3.33
+    write_document(menu_path, document)
+    assert source.reload()
+    assert source.error is None
+    assert source.current.catalog.get_item_by_id("D01")["price"] == 3.33
+
+
+def test_snapshot_is_used_on_the_next_start(menu_path):
+    first = MenuSource(menu_path)
+    second = MenuSource(menu_path)
+    assert second.current.source_hash == first.current.source_hash
+    assert [entry["id"] for entry in second.current.catalog.menu] == [entry["id"] for entry in first.current.catalog.menu]
+    assert second.current.catalog.resolve_combo("C01")[0]["section"] == "Burger"
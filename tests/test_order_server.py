@@ -0,0 +1,77 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+import order_server
+from cart import Cart
+from journal import OrderJournal
+from menu_data import ALLOWED_ORDERS_PER_ITEM
+from menu_source import MenuSource, write_default_menu
+from order_server import OrderServer
+
+
+@pytest.fixture
+def server(tmp_path):
+    menu_path = str(tmp_path / "menu.json")
+    write_default_menu(menu_path)
+    server = OrderServer(MenuSource(menu_path), str(tmp_path), checkout_workers=4)
+    yield server
+    server.close()
+
+
+async def request(server: OrderServer, cart: Cart, **fields) -> dict:
+    return json.loads(await server.handle_line(cart, json.dumps(fields).encode()))
+
+
+def test_session_requests(server):
+    async def session():
+        cart = Cart(ALLOWED_ORDERS_PER_ITEM)
+        assert (await request(server, cart, op="add", item={"id": "B01", "quantity": 2}))["ok"]
+        assert (await request(server, cart, op="add", item={"id": "B01"}))["cart"]["lines"][0]["quantity"] == 3
+        assert not (await request(server, cart, op="add", item={"id": "X99"}))["ok"]
+        assert not (await request(server, cart, op="set_quantity", index=5, quantity=1))["ok"]
+        assert (await server.handle_line(cart, b"{not json\n")).startswith(b'{"ok":false')
+        response = await request(server, cart, op="checkout")
+        assert response["ok"] and response["order"]["order_number"] == 1
+        assert len(cart) == 0
+        assert not (await request(server, cart, op="checkout"))["ok"]
+
+    asyncio.run(session())
+
+
+def test_day_change_waits_for_the_previous_days_checkouts(server, tmp_path, monkeypatch):
+    day = ["20260101"]
+    monkeypatch.setattr(order_server, "journal_path", lambda data_dir: str(tmp_path / f"orders-{day[0]}.journal"))
+    append_order = OrderJournal.append_order
+    started = threading.Semaphore(0)
+
+    def slow_append_order(self, *args):
+        started.release()
+        time.sleep(0.1)
+        return append_order(self, *args)
+
+    monkeypatch.setattr(OrderJournal, "append_order", slow_append_order)
+
+    async def checkout() -> dict:
+        cart = Cart(ALLOWED_ORDERS_PER_ITEM)
+        await request(server, cart, op="add", item={"id": "B01"})
+        return await request(server, cart, op="checkout")
+
+    async def rollover() -> list[dict]:
+        first_day = [asyncio.create_task(checkout()) for _ in range(3)]
+        # Every checkout of the first day is writing before the day changes
+        for _ in first_day:
+            await asyncio.to_thread(started.acquire)
+        day[0] = "20260102"
+        second_day = [asyncio.create_task(checkout()) for _ in range(3)]
+        return await asyncio.gather(*first_day, *second_day)
+
+    responses = asyncio.run(rollover())
+    assert all(response["ok"] for response in responses), responses
+    server.close()
+    for name in ("20260101", "20260102"):
+        with OrderJournal(str(tmp_path / f"orders-{name}.journal")) as journal:
+            assert journal.order_count == 3
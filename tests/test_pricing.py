@@ -0,0 +1,93 @@
+import random
+import sys
+from fractions import Fraction
+
+import pytest
+
+from pricing import (
+    BASIS_POINTS, ROUND_HALF_EVEN, ROUND_HALF_UP, ROUNDING_POLICIES, PriceBreakdown, apply_rate, batch_subtotals, format_cents,
+    price_batch, price_cart
+)
+
+GST_RATES = [0.0, 0.07, 0.09, 0.0825, 0.15]
+DISCOUNT_RATES = [0.0, 0.05, 0.1, 0.125, 0.2, 0.333]
+
+
+def random_subtotals(count: int, seed: int = 0) -> list[int]:
+    rng = random.Random(seed)
+    # Small amounts land on half cents often; the large ones check int64 headroom
+    return [rng.choice([rng.randint(0, 200), rng.randint(0, 100_000), rng.randint(0, 10**12)]) for _ in range(count)]
+
+
+def as_list(values) -> list[int]:
+    return [int(value) for value in values]
+
+
+@pytest.mark.parametrize("rounding", ROUNDING_POLICIES)
+def test_apply_rate_matches_exact_arithmetic(rounding):
+    for cents in range(0, 2_000, 7):
+        for rate_bp in (0, 1, 5_000, 825, 900, 1_250, 9_999):
+            exact = Fraction(cents * rate_bp, BASIS_POINTS)
+            floor = exact.numerator // exact.denominator
+            remainder = exact - floor
+            if remainder > Fraction(1, 2) or remainder == Fraction(1, 2) and (rounding == ROUND_HALF_UP or floor % 2):
+                floor += 1
+            assert apply_rate(cents, rate_bp, rounding) == floor
+
+
+def test_half_cents_round_by_policy():
+    # 50 cents at 1% is exactly half a cent
+    assert apply_rate(50, 100, ROUND_HALF_UP) == 1
+    assert apply_rate(50, 100, ROUND_HALF_EVEN) == 0
+    assert apply_rate(150, 100, ROUND_HALF_EVEN) == 2
+
+
+def test_price_cart_adds_up():
+    priced = price_cart(1_000, 0.1, 0.09)
+    assert priced == (1_000, 100, 900, 81, 981)
+    assert priced.discounted_subtotal == priced.subtotal - priced.discount
+    assert priced.total == priced.discounted_subtotal + priced.gst
+
+
+@pytest.mark.parametrize("rounding", ROUNDING_POLICIES)
+@pytest.mark.parametrize("gst_rate", GST_RATES)
+def test_price_batch_matches_price_cart_per_cart_rates(rounding, gst_rate):
+    subtotals = random_subtotals(500)
+    rng = random.Random(1)
+    discount_rates = [rng.choice(DISCOUNT_RATES) for _ in subtotals]
+    batch = price_batch(subtotals, discount_rates, gst_rate, rounding)
+    expected = [price_cart(s, d, gst_rate, rounding) for s, d in zip(subtotals, discount_rates)]
+    for field, column in zip(PriceBreakdown._fields, batch):
+        assert as_list(column) == [getattr(priced, field) for priced in expected], field
+
+
+@pytest.mark.parametrize("discount_rate", DISCOUNT_RATES)
+def test_price_batch_matches_price_cart_one_rate(discount_rate):
+    subtotals = random_subtotals(200, seed=2)
+    batch = price_batch(subtotals, discount_rate, 0.09)
+    assert as_list(batch.total) == [price_cart(s, discount_rate, 0.09).total for s in subtotals]
+
+
+def test_price_batch_without_numpy(monkeypatch):
+    # `import numpy` fails when its sys.modules entry is None: the pure Python path is used
+    monkeypatch.setitem(sys.modules, "numpy", None)
+    subtotals = random_subtotals(100, seed=3)
+    batch = price_batch(subtotals, 0.1, 0.09)
+    assert batch == tuple(list(column) for column in zip(*(price_cart(s, 0.1, 0.09) for s in subtotals)))
+    assert price_batch([], 0.1, 0.09) == ([], [], [], [], [])
+    assert batch_subtotals([0, 1, 0], [100, 250, 5], [2, 1, 3], 2) == [215, 250]
+
+
+def test_batch_subtotals_sums_lines_per_cart():
+    assert as_list(batch_subtotals([0, 1, 0, 2], [100, 250, 5, 0], [2, 1, 3, 9], 4)) == [215, 250, 0, 0]
+
+
+def test_format_cents():
+    assert [format_cents(cents) for cents in (0, 5, 1234, -1234, -5)] == ["0.00", "0.05", "12.34", "-12.34", "-0.05"]
+
+
+def test_unknown_rounding_policy_is_refused():
+    with pytest.raises(ValueError):
+        apply_rate(100, 900, "down")
+    with pytest.raises(ValueError):
+        price_batch([100], 0.1, 0.09, "down")
@@ -0,0 +1,67 @@
+import random
+from datetime import datetime
+
+import pytest
+
+from benchmarks.order_gen import random_order, write_journal
+from journal import OrderJournal, encode_record
+from report import aggregate, aggregate_journal, build_report, merge_reports, shard_ranges
+
+DAY = datetime(2026, 1, 2)
+
+
+@pytest.fixture
+def day_journal(tmp_path, catalog) -> str:
+    path = str(tmp_path / "orders-20260102.journal")
+    write_journal(path, catalog, 500, seed=11, day=DAY)
+    return path
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_sharded_report_matches_the_reference(day_journal, workers):
+    assert build_report(day_journal, workers) == aggregate_journal(day_journal)
+
+
+def test_reference_report_adds_up(day_journal):
+    report = aggregate_journal(day_journal)
+    assert report["orders"] == 500
+    assert report["total"] == report["subtotal"] - report["discount"] + report["gst"]
+    assert sum(sales for _, sales in report["items"].values()) == report["subtotal"]
+    assert sum(orders for orders, _, _ in report["discounts"].values()) == report["orders"]
+    assert sum(total for _, total in report["hours"].values()) == report["total"]
+
+
+def test_merging_does_not_depend_on_the_split(catalog):
+    rng = random.Random(5)
+    records = [random_order(catalog, i + 1, rng, DAY.replace(hour=10 + i % 12)) for i in range(200)]
+    whole = aggregate(records)
+    for count, workers in ((200, 1), (200, 4), (200, 64)):
+        parts = [aggregate(records[first:stop]) for first, stop in shard_ranges(count, workers)]
+        assert merge_reports(parts) == whole
+
+
+def test_shard_ranges_cover_every_order_once():
+    for count in (1, 7, 100, 12_345):
+        for workers in (1, 2, 8):
+            ranges = shard_ranges(count, workers)
+            assert ranges[0][0] == 0 and ranges[-1][1] == count
+            assert all(stop == next_first for (_, stop), (next_first, _) in zip(ranges, ranges[1:]))
+
+
+def test_report_after_a_torn_tail_and_more_orders(tmp_path, catalog):
+    path = str(tmp_path / "orders-20260102.journal")
+    write_journal(path, catalog, 50, seed=2, day=DAY)
+    with open(path, "ab") as f:
+        f.write(encode_record(random_order(catalog, 51, random.Random(0), DAY))[:-7])
+    with OrderJournal(path) as journal:
+        # Recovery truncates the torn record; the next order takes its number
+        journal.append(random_order(catalog, journal.order_count + 1, random.Random(1), DAY))
+    report = build_report(path, 2)
+    assert report == aggregate_journal(path)
+    assert report["orders"] == 51
+
+
+def test_empty_day(tmp_path):
+    path = str(tmp_path / "orders-20260102.journal")
+    OrderJournal(path).close()
+    assert build_report(path, 2) == aggregate_journal(path) == aggregate([])